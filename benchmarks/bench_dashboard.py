@@ -0,0 +1,98 @@
+#!/usr/bin/env python3
+"""Dashboard query cost and page size: full Message rows vs summaries.
+
+Fills every day of a scratch database with a full-length (4096 character)
+message and compares:
+
+- "full rows": get_all_messages, which the dashboard used to load, with
+  the content of every day leaving the database
+- "summaries": get_message_summaries for one dashboard page, with the
+  preview cut in SQL
+
+It then fetches the dashboard HTML with everything on one page and with the
+default page size, to show the response size per page.
+
+Usage:
+    python benchmarks/bench_dashboard.py
+    python benchmarks/bench_dashboard.py --url postgresql://user:pw@localhost/bench
+"""
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--url", default="sqlite:///./bench_dashboard.db")
+    parser.add_argument("--repeat", type=int, default=50)
+    return parser.parse_args()
+
+
+def main() -> None:
+    args = parse_args()
+    if args.url.startswith("sqlite:///"):
+        path = args.url[len("sqlite:///"):]
+        for suffix in ("", "-wal", "-shm", "-journal"):
+            if os.path.exists(path + suffix):
+                os.remove(path + suffix)
+    os.environ["DATABASE_URL"] = args.url
+
+    from sqlalchemy import update
+
+    from src.config import config
+    from src.database import init_db, engine, get_db
+    from src.database import queries
+    from src.database.models import Message
+    from src.web import create_app
+
+    init_db()
+    with engine.begin() as conn:
+        conn.execute(update(Message).values(content="Ж" * config.MAX_MESSAGE_LENGTH))
+
+    def best_ms(fn) -> float:
+        times = []
+        for _ in range(args.repeat):
+            started = time.perf_counter()
+            fn()
+            times.append((time.perf_counter() - started) * 1000)
+        return min(times)
+
+    def full_rows() -> int:
+        with get_db() as db:
+            return sum(len(m.content) for m in queries.get_all_messages(db))
+
+    def summaries() -> int:
+        with get_db() as db:
+            rows, _ = queries.get_message_summaries(db, 0, config.DASHBOARD_PAGE_SIZE)
+            return sum(len(r.preview) for r in rows)
+
+    print(f"Database: {args.url.split('://')[0]}, {config.TOTAL_DAYS} days of "
+          f"{config.MAX_MESSAGE_LENGTH} characters (best of {args.repeat})")
+    for name, fn in (("full rows", full_rows), ("summaries", summaries)):
+        ms = best_ms(fn)
+        print(f"{name:10} {ms:8.2f} ms   content loaded {fn():>9} characters")
+
+    app = create_app()
+    client = app.test_client()
+    with client.session_transaction() as s:
+        s["logged_in"] = True
+    page_size = config.DASHBOARD_PAGE_SIZE
+    for size in (config.TOTAL_DAYS, page_size):
+        config.DASHBOARD_PAGE_SIZE = size
+        ms = best_ms(lambda: client.get("/"))
+        print(f"dashboard, {size:3} days per page: {ms:8.2f} ms   "
+              f"{len(client.get('/').data):>7} bytes")
+    config.DASHBOARD_PAGE_SIZE = page_size
+
+    engine.dispose()
+    if args.url.startswith("sqlite:///"):
+        for suffix in ("", "-wal", "-shm", "-journal"):
+            if os.path.exists(path + suffix):
+                os.remove(path + suffix)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,119 @@
+#!/usr/bin/env python3
+"""Compare query plans and timings for the hot user queries before and after
+the delivery indexes (migration 0002).
+
+Fills a scratch database with users, most of them inactive as in a long-running
+bot, then runs each query at revision 0001 (no partial indexes) and at head.
+
+Usage:
+    python benchmarks/bench_delivery_indexes.py --url sqlite:///./bench_indexes.db
+    python benchmarks/bench_delivery_indexes.py --url postgresql://user:pw@localhost/bench
+"""
+import argparse
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+ZONES = ["UTC", "Europe/Berlin", "Europe/Moscow", "America/New_York", "Asia/Tokyo"]
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--url", default="sqlite:///./bench_indexes.db")
+    parser.add_argument("--users", type=int, default=200000)
+    parser.add_argument("--active-ratio", type=float, default=0.2)
+    parser.add_argument("--repeat", type=int, default=20)
+    return parser.parse_args()
+
+
+def main() -> None:
+    args = parse_args()
+    os.environ["DATABASE_URL"] = args.url
+
+    from alembic import command
+    from sqlalchemy import insert, text
+
+    from src.database import init_db, engine
+    from src.database.models import User
+    from src.database.session import ALEMBIC_INI, AlembicConfig
+
+    init_db()
+    with engine.begin() as conn:
+        conn.execute(text("DELETE FROM users"))
+        rng = random.Random(42)
+        rows = [
+            {
+                "telegram_id": 800000000 + i,
+                "timezone": rng.choice(ZONES),
+                "current_day": rng.randint(1, 365),
+                "is_active": rng.random() < args.active_ratio,
+            }
+            for i in range(args.users)
+        ]
+        for start in range(0, len(rows), 10000):
+            conn.execute(insert(User), rows[start:start + 10000])
+    deep_id = args.users * 9 // 10
+
+    queries = {
+        "delivery scan": "SELECT id, telegram_id, timezone, current_day, last_message_date "
+        "FROM users WHERE is_active = {true}",
+        "broadcast batch": "SELECT id, telegram_id FROM users "
+        f"WHERE is_active = {{true}} AND id > {deep_id} ORDER BY id LIMIT 200",
+        "active per day": "SELECT current_day, count(id) FROM users "
+        "WHERE is_active = {true} GROUP BY current_day",
+        "timezone + day": "SELECT id, telegram_id FROM users "
+        "WHERE is_active = {true} AND timezone = 'Europe/Berlin' AND current_day = 100",
+    }
+    is_pg = engine.dialect.name == "postgresql"
+    true = "true" if is_pg else "1"
+    explain = "EXPLAIN" if is_pg else "EXPLAIN QUERY PLAN"
+
+    def measure(label: str) -> dict:
+        results = {}
+        print(f"\n--- {label} ---")
+        with engine.connect() as conn:
+            if is_pg:
+                conn.execute(text("ANALYZE users"))
+            else:
+                conn.execute(text("ANALYZE"))
+            for name, sql in queries.items():
+                sql = sql.format(true=true)
+                plan = conn.execute(text(f"{explain} {sql}")).fetchall()
+                started = time.perf_counter()
+                for _ in range(args.repeat):
+                    conn.execute(text(sql)).fetchall()
+                elapsed = (time.perf_counter() - started) / args.repeat * 1000
+                results[name] = elapsed
+                print(f"{name:16} {elapsed:9.2f} ms")
+                for row in plan:
+                    print(f"{'':16}   {row[-1]}")
+        return results
+
+    alembic_cfg = AlembicConfig(ALEMBIC_INI)
+    with engine.connect() as conn:
+        alembic_cfg.attributes["connection"] = conn
+        command.downgrade(alembic_cfg, "0001")
+        conn.commit()
+    before = measure("without delivery indexes (0001)")
+
+    with engine.connect() as conn:
+        alembic_cfg.attributes["connection"] = conn
+        command.upgrade(alembic_cfg, "head")
+        conn.commit()
+    after = measure("with delivery indexes (head)")
+
+    print(f"\nDatabase: {args.url.split('://')[0]}, {args.users} users, "
+          f"{args.active_ratio:.0%} active")
+    for name in queries:
+        print(f"{name:16} {before[name]:9.2f} ms -> {after[name]:9.2f} ms "
+              f"({before[name] / after[name]:.1f}x)")
+
+    with engine.begin() as conn:
+        conn.execute(text("DELETE FROM users"))
+
+
+if __name__ == "__main__":
+    main()
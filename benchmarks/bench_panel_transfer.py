@@ -0,0 +1,143 @@
+#!/usr/bin/env python3
+"""Bytes transferred during a typical admin session in the web panel.
+
+Replays one session against a scratch database where every day has a few
+hundred characters of content. The session opens the dashboard, pages
+through it, edits a day, opens the welcome message, broadcasts and a search,
+calls /api/messages, then comes back to the dashboard. It is replayed like a
+browser with an HTTP cache, sending If-None-Match for pages it has seen, in
+two modes:
+
+- "inline CSS, uncompressed": how the panel was served before. Each HTML
+  page is counted with the stylesheets it links added to it, as they used
+  to be inlined, and nothing is compressed.
+- "static CSS, compressed": what the panel sends now. Stylesheets are
+  fetched once (they are cached for a year), and responses are compressed
+  with gzip, or brotli if the Brotli package is installed.
+
+Only response bodies are counted.
+
+Usage:
+    python benchmarks/bench_panel_transfer.py
+"""
+import argparse
+import os
+import random
+import re
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+WORDS = (
+    "сегодня завтра шаг цель привычка время утро вечер день неделя сила "
+    "внимание отдых дыхание вода прогулка книга мысль план итог вопрос "
+    "today small step goal habit morning focus rest walk read write plan"
+).split()
+
+SESSION = [
+    "/",
+    "/?page=2",
+    "/?show=empty",
+    "/message/1",
+    "/",
+    "/welcome",
+    "/broadcasts",
+    "/search?q=день",
+    "/api/messages?limit=200",
+    "/message/1",
+    "/",
+]
+
+STYLESHEET = re.compile(rb'<link rel="stylesheet" href="([^"]+)">')
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--url", default="sqlite:///./bench_panel_transfer.db")
+    return parser.parse_args()
+
+
+def main() -> None:
+    args = parse_args()
+    if args.url.startswith("sqlite:///"):
+        path = args.url[len("sqlite:///"):]
+        for suffix in ("", "-wal", "-shm", "-journal"):
+            if os.path.exists(path + suffix):
+                os.remove(path + suffix)
+    os.environ["DATABASE_URL"] = args.url
+
+    from src.database import init_db, engine, get_db
+    from src.database import queries
+    from src.web import create_app
+    from src.web.assets import brotli
+
+    init_db()
+    rng = random.Random(365)
+    with get_db() as db:
+        queries.apply_message_import(db, {
+            day: (f"День {day}. " + " ".join(rng.choices(WORDS, k=rng.randint(40, 120))), None)
+            for day in range(1, 366)
+        })
+
+    app = create_app()
+
+    def replay(compressed: bool) -> list[tuple[str, int, int]]:
+        """(url, status, body bytes) per request, stylesheets included."""
+        client = app.test_client()
+        with client.session_transaction() as s:
+            s["logged_in"] = True
+        etags: dict[str, str] = {}
+        stylesheets: dict[bytes, int] = {}
+        transfers = []
+        for url in SESSION:
+            headers = {}
+            if compressed:
+                headers["Accept-Encoding"] = "br, gzip" if brotli else "gzip"
+            if url in etags:
+                headers["If-None-Match"] = etags[url]
+            response = client.get(url, headers=headers)
+            if "ETag" in response.headers:
+                etags[url] = response.headers["ETag"]
+            size = len(response.data)
+            body = response.data
+            if response.headers.get("Content-Encoding") == "gzip":
+                import gzip
+                body = gzip.decompress(body)
+            elif response.headers.get("Content-Encoding") == "br":
+                body = brotli.decompress(body)
+            for href in STYLESHEET.findall(body):
+                if compressed:
+                    if href in stylesheets:
+                        continue
+                    css = client.get(href.decode(), headers=headers)
+                    stylesheets[href] = len(css.data)
+                    transfers.append((href.decode().split("?")[0], css.status_code, len(css.data)))
+                else:
+                    # Formerly inlined into the page itself
+                    size += len(client.get(href.decode()).get_data())
+            transfers.append((url, response.status_code, size))
+        return transfers
+
+    results = {
+        "inline CSS, uncompressed": replay(compressed=False),
+        "static CSS, compressed": replay(compressed=True),
+    }
+    encoding = "brotli" if brotli else "gzip"
+    print(f"Admin session of {len(SESSION)} page loads ({encoding} for compressed)")
+    for name, transfers in results.items():
+        print(f"\n{name}")
+        for url, status, size in transfers:
+            print(f"  {status} {url:32} {size:>8} bytes")
+        print(f"  {'total':36} {sum(size for _, _, size in transfers):>8} bytes")
+    before, after = (sum(s for _, _, s in t) for t in results.values())
+    print(f"\n{before} -> {after} bytes ({after / before:.0%})")
+
+    engine.dispose()
+    if args.url.startswith("sqlite:///"):
+        for suffix in ("", "-wal", "-shm", "-journal"):
+            if os.path.exists(path + suffix):
+                os.remove(path + suffix)
+
+
+if __name__ == "__main__":
+    main()
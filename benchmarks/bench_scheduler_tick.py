@@ -0,0 +1,150 @@
+#!/usr/bin/env python3
+"""Per-tick CPU time and memory of the delivery scan: User objects vs rows.
+
+Fills a scratch database with active users spread over a few timezones and
+runs the scheduler's "who is due now" check the way a tick does, without
+sending anything:
+
+- "ORM objects": get_users_for_delivery (full User instances), a
+  pytz lookup and datetime.now per user, and one message query per user
+  that has not been sent today, as the scheduler did before.
+- "ORM + schedule": the same User objects, with the messages loaded once
+  via get_message_schedule, to separate the two changes.
+- "rows": get_delivery_rows and get_message_schedule, with the local time
+  computed once per timezone, as send_daily_messages does now.
+
+CPU time is process time. Memory is the tracemalloc peak during one extra
+tick (tracing slows the tick down, so it is not timed).
+
+Usage:
+    python benchmarks/bench_scheduler_tick.py
+    python benchmarks/bench_scheduler_tick.py --users 100000 --url postgresql://user:pw@localhost/bench
+"""
+import argparse
+import os
+import random
+import sys
+import time
+import tracemalloc
+from datetime import datetime
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+ZONES = ["UTC", "Europe/Berlin", "Europe/Moscow", "America/New_York", "Asia/Tokyo"]
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--url", default="sqlite:///./bench_scheduler_tick.db")
+    parser.add_argument("--users", type=int, default=100000)
+    parser.add_argument("--repeat", type=int, default=3)
+    return parser.parse_args()
+
+
+def main() -> None:
+    args = parse_args()
+    if args.url.startswith("sqlite:///"):
+        path = args.url[len("sqlite:///"):]
+        for suffix in ("", "-wal", "-shm", "-journal"):
+            if os.path.exists(path + suffix):
+                os.remove(path + suffix)
+    os.environ["DATABASE_URL"] = args.url
+
+    import pytz
+    from sqlalchemy import insert, text
+
+    from src.database import init_db, engine, get_db
+    from src.database import queries
+    from src.database.models import User
+
+    init_db()
+    with engine.begin() as conn:
+        conn.execute(text("DELETE FROM users"))
+        rng = random.Random(42)
+        rows = [
+            {
+                "telegram_id": 900000000 + i,
+                "timezone": rng.choice(ZONES),
+                "current_day": rng.randint(1, 365),
+                "is_active": True,
+            }
+            for i in range(args.users)
+        ]
+        for start in range(0, len(rows), 10000):
+            conn.execute(insert(User), rows[start:start + 10000])
+
+    def orm_tick() -> int:
+        due = 0
+        with get_db() as db:
+            for user in queries.get_users_for_delivery(db):
+                user_now = datetime.now(pytz.timezone(user.timezone or "UTC"))
+                if user.last_message_date == user_now.date():
+                    continue
+                message = queries.get_message_by_day(db, user.current_day)
+                send_time = message.send_time
+                due += user_now.hour == send_time.hour and user_now.minute == send_time.minute
+        return due
+
+    def orm_schedule_tick() -> int:
+        due = 0
+        with get_db() as db:
+            messages = queries.get_message_schedule(db)
+            for user in queries.get_users_for_delivery(db):
+                user_now = datetime.now(pytz.timezone(user.timezone or "UTC"))
+                if user.last_message_date == user_now.date():
+                    continue
+                send_time = messages[user.current_day].send_time
+                due += user_now.hour == send_time.hour and user_now.minute == send_time.minute
+        return due
+
+    def row_tick() -> int:
+        due = 0
+        with get_db() as db:
+            users = queries.get_delivery_rows(db)
+            messages = queries.get_message_schedule(db)
+        now_by_zone: dict[str, datetime] = {}
+        for user in users:
+            zone = user.timezone or "UTC"
+            user_now = now_by_zone.get(zone)
+            if user_now is None:
+                user_now = now_by_zone[zone] = datetime.now(pytz.timezone(zone))
+            if user.last_message_date == user_now.date():
+                continue
+            send_time = messages[user.current_day].send_time
+            due += user_now.hour == send_time.hour and user_now.minute == send_time.minute
+        return due
+
+    def measure(tick) -> tuple[float, float, float]:
+        """Best CPU ms and wall ms over the repeats, then the peak MB of one tick."""
+        cpu, wall = [], []
+        for _ in range(args.repeat):
+            started_cpu, started_wall = time.process_time(), time.perf_counter()
+            tick()
+            cpu.append((time.process_time() - started_cpu) * 1000)
+            wall.append((time.perf_counter() - started_wall) * 1000)
+        tracemalloc.start()
+        tick()
+        peak = tracemalloc.get_traced_memory()[1] / 1024 / 1024
+        tracemalloc.stop()
+        return min(cpu), min(wall), peak
+
+    print(f"Database: {args.url.split('://')[0]}, {args.users} active users "
+          f"(best of {args.repeat})")
+    variants = (
+        ("ORM objects", orm_tick),
+        ("ORM + schedule", orm_schedule_tick),
+        ("rows", row_tick),
+    )
+    for name, tick in variants:
+        cpu, wall, peak = measure(tick)
+        print(f"{name:15} cpu {cpu:8.0f} ms   wall {wall:8.0f} ms   peak {peak:7.1f} MB")
+
+    engine.dispose()
+    if args.url.startswith("sqlite:///"):
+        for suffix in ("", "-wal", "-shm", "-journal"):
+            if os.path.exists(path + suffix):
+                os.remove(path + suffix)
+
+
+if __name__ == "__main__":
+    main()
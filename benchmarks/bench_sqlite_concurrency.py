@@ -0,0 +1,163 @@
+#!/usr/bin/env python3
+"""Mixed read/write load on SQLite: default profile vs WAL + single writer.
+
+Reader threads run the dashboard and delivery queries while writer threads
+update users, the way the Flask thread, the scheduler and the bot overlap in
+one process. The "default" run uses a plain engine with the rollback journal
+and every thread committing on its own; the "profile" run uses the app's
+engine (WAL, synchronous=NORMAL, busy_timeout, mmap) with all writes queued
+on the writer thread.
+
+Usage:
+    python benchmarks/bench_sqlite_concurrency.py
+    python benchmarks/bench_sqlite_concurrency.py --readers 8 --writers 4 --seconds 5
+"""
+import argparse
+import os
+import sys
+import threading
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--path", default="./bench_sqlite.db")
+    parser.add_argument("--users", type=int, default=20000)
+    parser.add_argument("--readers", type=int, default=4)
+    parser.add_argument("--writers", type=int, default=4)
+    parser.add_argument("--seconds", type=float, default=3.0)
+    return parser.parse_args()
+
+
+def run_load(args, read_session, write, user_ids: list[int]) -> dict:
+    """Run readers and writers for a fixed time and count completed operations."""
+    from src.database import queries
+
+    stop = threading.Event()
+    counts = {"reads": 0, "writes": 0, "errors": 0}
+    lock = threading.Lock()
+    write_latencies: list[float] = []
+
+    def reader() -> None:
+        while not stop.is_set():
+            try:
+                db = read_session()
+                try:
+                    queries.get_stats(db)
+                    queries.get_active_user_batch(db, 0, 200)
+                finally:
+                    db.close()
+                with lock:
+                    counts["reads"] += 1
+            except Exception:
+                with lock:
+                    counts["errors"] += 1
+
+    def writer_thread(offset: int) -> None:
+        i = offset
+        while not stop.is_set():
+            user_id = user_ids[i % len(user_ids)]
+            i += args.writers
+            started = time.perf_counter()
+            try:
+                write(user_id)
+                with lock:
+                    counts["writes"] += 1
+                    write_latencies.append(time.perf_counter() - started)
+            except Exception:
+                with lock:
+                    counts["errors"] += 1
+
+    threads = [threading.Thread(target=reader) for _ in range(args.readers)]
+    threads += [
+        threading.Thread(target=writer_thread, args=(n,)) for n in range(args.writers)
+    ]
+    for thread in threads:
+        thread.start()
+    time.sleep(args.seconds)
+    stop.set()
+    for thread in threads:
+        thread.join()
+
+    write_latencies.sort()
+    counts["write_p99_ms"] = (
+        write_latencies[int(len(write_latencies) * 0.99)] * 1000 if write_latencies else 0
+    )
+    return counts
+
+
+def main() -> None:
+    args = parse_args()
+    path = os.path.abspath(args.path)
+    for suffix in ("", "-wal", "-shm", "-journal"):
+        if os.path.exists(path + suffix):
+            os.remove(path + suffix)
+    url = f"sqlite:///{path}"
+    os.environ["DATABASE_URL"] = url
+
+    from sqlalchemy import create_engine, insert, update
+    from sqlalchemy.orm import sessionmaker
+
+    from src.database import init_db, engine, SessionLocal
+    from src.database.models import User
+    from src.database.writer import writer, apply_write_sync
+
+    init_db()
+    with engine.begin() as conn:
+        conn.execute(
+            insert(User),
+            [{"telegram_id": 600000000 + i, "is_active": True, "current_day": 1}
+             for i in range(args.users)],
+        )
+        user_ids = [row[0] for row in conn.execute(User.__table__.select().with_only_columns(User.id))]
+    engine.dispose()
+
+    def bump(db, user_id: int) -> None:
+        db.execute(
+            update(User)
+            .where(User.id == user_id)
+            .values(current_day=User.current_day % 365 + 1)
+        )
+
+    # Default profile: separate engine, rollback journal, every thread commits
+    plain = create_engine(url, connect_args={"check_same_thread": False, "timeout": 5})
+    with plain.connect() as conn:
+        conn.exec_driver_sql("PRAGMA journal_mode=DELETE")
+    PlainSession = sessionmaker(bind=plain)
+
+    def plain_write(user_id: int) -> None:
+        db = PlainSession()
+        try:
+            bump(db, user_id)
+            db.commit()
+        finally:
+            db.close()
+
+    default = run_load(args, PlainSession, plain_write, user_ids)
+    plain.dispose()
+
+    # Production profile: WAL pragmas from the app engine, single writer queue
+    writer.start()
+    profile = run_load(
+        args, SessionLocal, lambda user_id: apply_write_sync(lambda s: bump(s, user_id)), user_ids
+    )
+    writer.stop()
+    engine.dispose()
+
+    print(f"{args.readers} readers, {args.writers} writers, {args.seconds:g}s, {args.users} users")
+    for name, result in (("default", default), ("WAL + writer", profile)):
+        print(
+            f"{name:13} reads {result['reads'] / args.seconds:8.0f}/s   "
+            f"writes {result['writes'] / args.seconds:7.0f}/s   "
+            f"write p99 {result['write_p99_ms']:7.1f} ms   errors {result['errors']}"
+        )
+
+    for suffix in ("", "-wal", "-shm", "-journal"):
+        if os.path.exists(path + suffix):
+            os.remove(path + suffix)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,229 @@
+#!/usr/bin/env python3
+"""Count statements and time per write helper against the previous query layer.
+
+The previous helpers read rows before changing them, updated each statistics
+counter with its own UPDATE, ran ``refresh()`` after every commit, and used
+sessions with ``expire_on_commit=True``, so the first attribute read after a
+commit loaded the row again. Those helpers are reproduced here as
+``legacy_*`` and run in such a session. Every operation reads one attribute
+of its result afterwards, like the handlers do.
+
+Usage:
+    python benchmarks/bench_write_round_trips.py
+    python benchmarks/bench_write_round_trips.py --url postgresql://user:pw@localhost/bench
+"""
+import argparse
+import os
+import statistics
+import sys
+import time
+from datetime import date, datetime
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--url", default="sqlite:///./bench_round_trips.db")
+    parser.add_argument("--repeat", type=int, default=200)
+    return parser.parse_args()
+
+
+def main() -> None:
+    args = parse_args()
+    if args.url.startswith("sqlite:///"):
+        path = args.url[len("sqlite:///"):]
+        for suffix in ("", "-wal", "-shm", "-journal"):
+            if os.path.exists(path + suffix):
+                os.remove(path + suffix)
+    os.environ["DATABASE_URL"] = args.url
+
+    from sqlalchemy import event, update
+    from sqlalchemy.orm import sessionmaker
+
+    from src.config import config
+    from src.database import init_db, engine, SessionLocal
+    from src.database import queries
+    from src.database.models import Admin, Broadcast, Message, Setting, StatCounter, User
+
+    init_db()
+    LegacySession = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+
+    def legacy_bump_counters(db, deltas):
+        for name, delta in deltas.items():
+            if not delta:
+                continue
+            result = db.execute(
+                update(StatCounter)
+                .where(StatCounter.name == name)
+                .values(value=StatCounter.value + delta)
+                .execution_options(synchronize_session=False)
+            )
+            if result.rowcount == 0:
+                db.add(StatCounter(name=name, value=delta))
+                db.flush()
+
+    def legacy_create_user(db, telegram_id):
+        user = User(telegram_id=telegram_id, timezone="UTC", current_day=1, is_active=True)
+        db.add(user)
+        legacy_bump_counters(
+            db,
+            {queries.USERS_TOTAL: 1, queries.USERS_ACTIVE: 1, queries.active_day_counter(1): 1},
+        )
+        db.commit()
+        db.refresh(user)
+        return user
+
+    def legacy_update_user_day(db, user):
+        user.last_message_date = date.today()
+        old_day = user.current_day
+        user.current_day = old_day % config.TOTAL_DAYS + 1
+        legacy_bump_counters(
+            db,
+            {
+                queries.delivered_counter(datetime.utcnow().date()): 1,
+                queries.active_day_counter(old_day): -1,
+                queries.active_day_counter(user.current_day): 1,
+            },
+        )
+        db.commit()
+        db.refresh(user)
+        return user
+
+    def legacy_set_user_active(db, user, is_active):
+        if bool(user.is_active) != is_active:
+            delta = 1 if is_active else -1
+            legacy_bump_counters(
+                db,
+                {queries.USERS_ACTIVE: delta, queries.active_day_counter(user.current_day): delta},
+            )
+        user.is_active = is_active
+        db.commit()
+        db.refresh(user)
+        return user
+
+    def legacy_update_message(db, day, content):
+        message = db.query(Message).filter(Message.day_number == day).first()
+        message.content = content
+        db.commit()
+        db.refresh(message)
+        return message
+
+    def legacy_set_setting(db, key, value):
+        setting = db.query(Setting).filter(Setting.key == key).first()
+        if setting:
+            setting.value = value
+        else:
+            setting = Setting(key=key, value=value)
+            db.add(setting)
+        db.commit()
+        db.refresh(setting)
+        return setting
+
+    def legacy_add_admin(db, telegram_id):
+        admin = Admin(telegram_id=telegram_id)
+        db.add(admin)
+        db.commit()
+        db.refresh(admin)
+        return admin
+
+    def legacy_create_broadcast(db, text):
+        total = queries.get_stats(db)["active_users"]
+        broadcast = Broadcast(text=text, status="done", total=total)
+        db.add(broadcast)
+        db.commit()
+        db.refresh(broadcast)
+        return broadcast
+
+    statements = [0]
+
+    @event.listens_for(engine, "before_cursor_execute")
+    def _count(conn, cursor, statement, parameters, context, executemany):
+        statements[0] += 1
+
+    def measure(session_factory, op) -> tuple[float, float]:
+        """Median statements and microseconds for op(db, i), one session each."""
+        counts, samples = [], []
+        for i in range(args.repeat):
+            db = session_factory()
+            try:
+                statements[0] = 0
+                started = time.perf_counter()
+                op(db, i)
+                samples.append((time.perf_counter() - started) * 1e6)
+                counts.append(statements[0])
+            finally:
+                db.close()
+        return statistics.median(counts), statistics.median(samples)
+
+    def user_at(db, i, base):
+        return db.query(User).filter(User.telegram_id == base + i).one()
+
+    # The scheduler delivers from rows it already has, so the current helper
+    # gets user ids; they are looked up once, on the first call
+    user_ids: dict[int, int] = {}
+
+    def user_id_at(db, i, base):
+        if not user_ids:
+            user_ids.update(
+                db.query(User.telegram_id, User.id)
+                .filter(User.telegram_id.between(base, base + args.repeat))
+                .all()
+            )
+        return user_ids[base + i]
+
+    operations = {
+        "create_user": (
+            lambda db, i: legacy_create_user(db, 700000000 + i).current_day,
+            lambda db, i: queries.create_user(db, 710000000 + i).current_day,
+        ),
+        "update_user_day": (
+            lambda db, i: legacy_update_user_day(db, user_at(db, i, 700000000)).current_day,
+            lambda db, i: queries.update_user_day(db, user_id_at(db, i, 710000000)).current_day,
+        ),
+        "set_user_active": (
+            lambda db, i: legacy_set_user_active(db, user_at(db, i, 700000000), False).is_active,
+            lambda db, i: queries.set_user_active(db, user_at(db, i, 710000000), False).is_active,
+        ),
+        "update_message": (
+            lambda db, i: legacy_update_message(db, i % 365 + 1, f"legacy {i}").content,
+            lambda db, i: queries.update_message(db, i % 365 + 1, f"current {i}").content,
+        ),
+        "set_setting": (
+            lambda db, i: legacy_set_setting(db, "bench", str(i)).value,
+            lambda db, i: queries.set_setting(db, "bench", str(i)).value,
+        ),
+        "add_admin": (
+            lambda db, i: legacy_add_admin(db, 800000000 + i).granted_at,
+            lambda db, i: queries.add_admin(db, 810000000 + i).granted_at,
+        ),
+        "create_broadcast": (
+            lambda db, i: legacy_create_broadcast(db, "bench").total,
+            lambda db, i: queries.create_broadcast(db, "bench").total,
+        ),
+    }
+
+    print(f"Database: {args.url.split('://')[0]} (median of {args.repeat})")
+    print(f"{'operation':18} {'legacy':>16} {'current':>16}")
+    for name, (legacy, current) in operations.items():
+        legacy_count, legacy_us = measure(LegacySession, legacy)
+        count, us = measure(SessionLocal, current)
+        print(
+            f"{name:18} {legacy_count:3.0f} stmts {legacy_us:6.0f} us "
+            f"{count:3.0f} stmts {us:6.0f} us"
+        )
+    print(
+        "set_user_active includes the SELECT that loads the user in both columns; "
+        "update_user_day only in the legacy column."
+    )
+
+    event.remove(engine, "before_cursor_execute", _count)
+    engine.dispose()
+    if args.url.startswith("sqlite:///"):
+        for suffix in ("", "-wal", "-shm", "-journal"):
+            if os.path.exists(path + suffix):
+                os.remove(path + suffix)
+
+
+if __name__ == "__main__":
+    main()
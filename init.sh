@@ -68,6 +68,18 @@ echo ""
 echo "Initializing database..."
 python3 -c "from src.database import init_db; init_db()"
 
+# Build the offline timezone grid (shared locations fall back to the
+# nearest reference city without it)
+echo ""
+echo "Building timezone grid..."
+GRID_PATH="${TIMEZONE_GRID_PATH:-data/timezones.grid}"
+if [ -f "$GRID_PATH" ]; then
+    echo "Timezone grid already exists"
+elif ! python3 tools/build_timezone_grid.py --download "$GRID_PATH"; then
+    echo "WARNING: Could not build the timezone grid, using reference cities"
+    echo "Retry later with: python3 tools/build_timezone_grid.py --download $GRID_PATH"
+fi
+
 # Print information
 echo ""
 echo "========================================"
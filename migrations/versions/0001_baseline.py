@@ -0,0 +1,71 @@
+"""Baseline schema
+
+The four tables the bot shipped with (users, messages, settings, admins),
+as created by Base.metadata.create_all before migrations were introduced.
+Databases created that way are stamped at this revision by init_db instead
+of running it, so later tables belong in later migrations.
+
+Revision ID: 0001
+Revises:
+Create Date: 2026-10-19
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = "0001"
+down_revision = None
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "users",
+        sa.Column("id", sa.Integer(), primary_key=True),
+        sa.Column("telegram_id", sa.BigInteger(), nullable=False),
+        sa.Column("username", sa.String(255), nullable=True),
+        sa.Column("timezone", sa.String(50), nullable=True),
+        sa.Column("current_day", sa.Integer(), nullable=True),
+        sa.Column("started_at", sa.DateTime(), nullable=True),
+        sa.Column("last_message_date", sa.Date(), nullable=True),
+        sa.Column("is_active", sa.Boolean(), nullable=True),
+        sa.Column("created_at", sa.DateTime(), nullable=True),
+        sa.Column("updated_at", sa.DateTime(), nullable=True),
+    )
+    op.create_index("ix_users_telegram_id", "users", ["telegram_id"], unique=True)
+
+    op.create_table(
+        "messages",
+        sa.Column("id", sa.Integer(), primary_key=True),
+        sa.Column("day_number", sa.Integer(), nullable=False),
+        sa.Column("content", sa.Text(), nullable=True),
+        sa.Column("send_time", sa.Time(), nullable=True),
+        sa.Column("created_at", sa.DateTime(), nullable=True),
+        sa.Column("updated_at", sa.DateTime(), nullable=True),
+    )
+    op.create_index("ix_messages_day_number", "messages", ["day_number"], unique=True)
+
+    op.create_table(
+        "settings",
+        sa.Column("id", sa.Integer(), primary_key=True),
+        sa.Column("key", sa.String(100), nullable=False),
+        sa.Column("value", sa.Text(), nullable=True),
+        sa.Column("updated_at", sa.DateTime(), nullable=True),
+    )
+    op.create_index("ix_settings_key", "settings", ["key"], unique=True)
+
+    op.create_table(
+        "admins",
+        sa.Column("id", sa.Integer(), primary_key=True),
+        sa.Column("telegram_id", sa.BigInteger(), nullable=False),
+        sa.Column("granted_at", sa.DateTime(), nullable=True),
+    )
+    op.create_index("ix_admins_telegram_id", "admins", ["telegram_id"], unique=True)
+
+
+def downgrade() -> None:
+    op.drop_table("admins")
+    op.drop_table("settings")
+    op.drop_table("messages")
+    op.drop_table("users")
@@ -0,0 +1,64 @@
+"""Indexes for the delivery and broadcast queries
+
+- ix_users_active_id: partial index on users(id) WHERE is_active. Serves the
+  delivery scan and the keyset-paginated broadcast batches without touching
+  inactive users, and stays small as users churn.
+- ix_users_active_timezone_day: partial composite index on
+  users(timezone, current_day) WHERE is_active, for per-timezone delivery
+  and the per-day statistics.
+
+On PostgreSQL the indexes are built with CREATE INDEX CONCURRENTLY, which
+does not block writes but cannot run inside a transaction. A build that
+fails leaves an INVALID index behind; drop it before running the upgrade
+again.
+
+Revision ID: 0002
+Revises: 0001
+Create Date: 2026-10-19
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = "0002"
+down_revision = "0001"
+branch_labels = None
+depends_on = None
+
+INDEXES = (
+    ("ix_users_active_id", ["id"]),
+    ("ix_users_active_timezone_day", ["timezone", "current_day"]),
+)
+
+
+def upgrade() -> None:
+    if op.get_bind().dialect.name == "postgresql":
+        with op.get_context().autocommit_block():
+            for name, columns in INDEXES:
+                op.create_index(
+                    name,
+                    "users",
+                    columns,
+                    postgresql_where=sa.text("is_active = true"),
+                    postgresql_concurrently=True,
+                    if_not_exists=True,
+                )
+        return
+
+    for name, columns in INDEXES:
+        op.create_index(
+            name, "users", columns, sqlite_where=sa.text("is_active = 1")
+        )
+
+
+def downgrade() -> None:
+    if op.get_bind().dialect.name == "postgresql":
+        with op.get_context().autocommit_block():
+            for name, _ in INDEXES:
+                op.drop_index(
+                    name, table_name="users", postgresql_concurrently=True, if_exists=True
+                )
+        return
+
+    for name, _ in INDEXES:
+        op.drop_index(name, table_name="users")
@@ -0,0 +1,37 @@
+"""Cold table for long-inactive users
+
+Revision ID: 0003
+Revises: 0002
+Create Date: 2026-10-19
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = "0003"
+down_revision = "0002"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "archived_users",
+        sa.Column("id", sa.Integer(), primary_key=True),
+        sa.Column("telegram_id", sa.BigInteger(), nullable=False),
+        sa.Column("username", sa.String(255), nullable=True),
+        sa.Column("timezone", sa.String(50), nullable=True),
+        sa.Column("current_day", sa.Integer(), nullable=True),
+        sa.Column("started_at", sa.DateTime(), nullable=True),
+        sa.Column("last_message_date", sa.Date(), nullable=True),
+        sa.Column("created_at", sa.DateTime(), nullable=True),
+        sa.Column("deactivated_at", sa.DateTime(), nullable=True),
+        sa.Column("archived_at", sa.DateTime(), nullable=True),
+    )
+    op.create_index(
+        "ix_archived_users_telegram_id", "archived_users", ["telegram_id"], unique=True
+    )
+
+
+def downgrade() -> None:
+    op.drop_table("archived_users")
@@ -0,0 +1,51 @@
+"""Full-text index over day message content
+
+- SQLite: messages_fts, an FTS5 table keyed by messages.id (rowid) holding
+  the content of non-empty days. It is kept up to date by the message
+  write queries (update_message, apply_message_import).
+- PostgreSQL: ix_messages_content_fts, a GIN index on
+  to_tsvector('simple', content), which the database maintains itself.
+  Built with CREATE INDEX CONCURRENTLY; see 0002 about failed builds.
+
+The 'simple' configuration and unicode61 tokenizer fold case but do not
+stem, so search behaves the same for Russian and English content.
+
+Revision ID: 0004
+Revises: 0003
+Create Date: 2026-10-19
+"""
+from alembic import op
+
+
+revision = "0004"
+down_revision = "0003"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    if op.get_bind().dialect.name == "postgresql":
+        with op.get_context().autocommit_block():
+            op.execute(
+                "CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_messages_content_fts "
+                "ON messages USING gin (to_tsvector('simple', content))"
+            )
+        return
+
+    op.execute(
+        "CREATE VIRTUAL TABLE messages_fts USING fts5("
+        "content, tokenize='unicode61 remove_diacritics 2')"
+    )
+    op.execute(
+        "INSERT INTO messages_fts (rowid, content) "
+        "SELECT id, content FROM messages WHERE content != ''"
+    )
+
+
+def downgrade() -> None:
+    if op.get_bind().dialect.name == "postgresql":
+        with op.get_context().autocommit_block():
+            op.execute("DROP INDEX CONCURRENTLY IF EXISTS ix_messages_content_fts")
+        return
+
+    op.execute("DROP TABLE messages_fts")
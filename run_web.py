@@ -15,10 +15,13 @@ os.environ.setdefault('DATABASE_URL', 'sqlite:///./app.db')
 
 from src.web import create_app
 from src.database import init_db
+from src.database.writer import writer, writer_required
 
 if __name__ == "__main__":
     print("Initializing database...")
     init_db()
+    if writer_required():
+        writer.start()
 
     print("Starting web panel on http://127.0.0.1:5000")
     app = create_app()
@@ -0,0 +1,104 @@
+"""One-off broadcasts to all active users for Telegram 365 Bot.
+
+A broadcast row stores its keyset cursor (the last users.id processed) and
+is updated after every batch, so pausing, resuming and restarting the
+process all continue from where sending stopped. Sending goes through the
+shared rate-limited sender at low priority, alongside daily deliveries.
+"""
+import asyncio
+import logging
+import time
+
+from src.bot.sender import sender
+from src.config import config
+from src.database import get_db
+from src.database import queries
+from src.database.profiling import query_scoped
+from src.database.writer import apply_write
+from src.metrics import metrics
+
+logger = logging.getLogger(__name__)
+
+# broadcast id -> task sending it in this process
+_tasks: dict[int, asyncio.Task] = {}
+
+
+async def run_broadcast(broadcast_id: int) -> None:
+    """Send a broadcast batch by batch until it is done or no longer running."""
+    while True:
+        with get_db() as db:
+            broadcast = queries.get_broadcast(db, broadcast_id)
+            if broadcast is None or broadcast.status != "running":
+                return
+            text = broadcast.text
+            batch = queries.get_active_user_batch(
+                db, broadcast.cursor_user_id, config.BROADCAST_BATCH_SIZE
+            )
+            sent, failed = broadcast.sent, broadcast.failed
+        if not batch:
+            await apply_write(
+                lambda s: queries.set_broadcast_status(
+                    s, queries.get_broadcast(s, broadcast_id), "done"
+                ),
+                group=False,
+            )
+            logger.info(f"Broadcast {broadcast_id} done: {sent} sent, {failed} failed")
+            return
+
+        started = time.perf_counter()
+        report = await sender.send_many(
+            ((telegram_id, text) for _, telegram_id in batch), low_priority=True
+        )
+        elapsed = time.perf_counter() - started
+
+        def save_progress(s) -> None:
+            queries.deactivate_users_bulk(s, report["blocked"])
+            queries.record_broadcast_progress(
+                s,
+                broadcast_id,
+                cursor_user_id=batch[-1][0],
+                sent=report["sent"],
+                failed=report["failed"],
+                seconds=elapsed,
+            )
+
+        await apply_write(save_progress, group=False)
+        metrics.incr("bot.broadcast.sent", report["sent"])
+        metrics.incr("bot.broadcast.failed", report["failed"])
+
+
+def start_broadcast(broadcast_id: int) -> bool:
+    """Start sending a broadcast in the background unless it already is.
+
+    Returns:
+        True if a new task was started.
+    """
+    task = _tasks.get(broadcast_id)
+    if task is not None and not task.done():
+        return False
+
+    task = asyncio.create_task(run_broadcast(broadcast_id))
+    _tasks[broadcast_id] = task
+
+    def _finished(done: asyncio.Task) -> None:
+        if _tasks.get(broadcast_id) is done:
+            del _tasks[broadcast_id]
+        if not done.cancelled() and done.exception() is not None:
+            logger.error(f"Broadcast {broadcast_id} failed: {done.exception()}")
+
+    task.add_done_callback(_finished)
+    return True
+
+
+@query_scoped("scheduler")
+async def resume_broadcasts() -> None:
+    """Start any running broadcast that has no sender in this process.
+
+    Picks up broadcasts created or resumed from the web panel and those
+    interrupted by a restart.
+    """
+    with get_db() as db:
+        running = [b.id for b in queries.get_running_broadcasts(db)]
+    for broadcast_id in running:
+        if start_broadcast(broadcast_id):
+            logger.info(f"Broadcast {broadcast_id} started")
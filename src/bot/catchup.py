@@ -0,0 +1,151 @@
+"""Startup catch-up for updates that piled up while the bot was down."""
+import asyncio
+import functools
+import logging
+import time
+
+from aiogram import Bot, Dispatcher
+from aiogram.types import Update
+
+from src.bot.onboarding import onboard
+from src.bot.sender import gather_sends, sender
+from src.config import config
+from src.database import get_db
+from src.database import queries
+from src.database.writer import apply_write
+from src.metrics import metrics
+
+logger = logging.getLogger(__name__)
+
+
+def _is_start(update: Update) -> bool:
+    """Check whether an update is a /start command (with or without payload)."""
+    message = update.message
+    if message is None or message.from_user is None or not message.text:
+        return False
+    command = message.text.split(maxsplit=1)[0]
+    return command.split("@", 1)[0] == "/start"
+
+
+async def fetch_backlog(bot: Bot, dp: Dispatcher) -> list[Update]:
+    """Fetch all pending updates in large batches.
+
+    Fetching with an offset confirms everything before it, so once this
+    returns the backlog is acknowledged and polling starts from fresh
+    updates.
+    """
+    updates: list[Update] = []
+    offset = None
+    allowed_updates = dp.resolve_used_update_types()
+    while True:
+        batch = await bot.get_updates(
+            offset=offset,
+            limit=config.CATCHUP_BATCH_SIZE,
+            timeout=0,
+            allowed_updates=allowed_updates,
+        )
+        if not batch:
+            return updates
+        updates.extend(batch)
+        offset = batch[-1].update_id + 1
+
+
+def merge_backlog(updates: list[Update]) -> tuple[dict[int, str], list[Update]]:
+    """Collapse duplicate updates per user.
+
+    Returns:
+        Tuple of (users who sent /start mapped to their username, other
+        updates in arrival order with exact per-user duplicates removed).
+    """
+    starts: dict[int, str] = {}
+    rest: list[Update] = []
+    seen: set[tuple[int, str]] = set()
+    for update in updates:
+        if _is_start(update):
+            user = update.message.from_user
+            starts[user.id] = user.username
+            continue
+        message = update.message
+        if message is not None and message.from_user is not None and message.text:
+            key = (message.from_user.id, message.text)
+            if key in seen:
+                continue
+            seen.add(key)
+        rest.append(update)
+    return starts, rest
+
+
+async def drain_backlog(bot: Bot, dp: Dispatcher) -> dict:
+    """Process the pending backlog in bulk before polling starts.
+
+    /start updates are merged per user, registered or reactivated in a single
+    transaction and onboarded like /start does it, through the rate-limited
+    sender. Everything else goes through the dispatcher as usual.
+
+    Returns:
+        Summary of what was drained and how long it took.
+    """
+    started = time.perf_counter()
+    updates = await fetch_backlog(bot, dp)
+    if not updates:
+        logger.info("No pending updates to catch up on")
+        return {"updates": 0, "seconds": 0.0}
+
+    starts, rest = merge_backlog(updates)
+
+    created: list[int] = []
+    reactivated: list[int] = []
+    report = {"sent": 0, "failed": 0, "blocked": []}
+    if starts:
+        created, reactivated = await apply_write(
+            lambda s: queries.register_users_bulk(s, starts), group=False
+        )
+        with get_db() as db:
+            welcome = queries.get_welcome_message(db)
+        # Restored and reactivated users may have moved since they set their timezone
+        ask_timezone_for = set(created) | set(reactivated)
+        report = await gather_sends(
+            (
+                telegram_id,
+                onboard(
+                    functools.partial(sender.send, telegram_id),
+                    welcome,
+                    ask_timezone=telegram_id in ask_timezone_for,
+                ),
+            )
+            for telegram_id in starts
+        )
+
+    if config.UPDATE_PROCESSING_MODE == "concurrent":
+        results = await asyncio.gather(
+            *(dp.feed_update(bot, update) for update in rest), return_exceptions=True
+        )
+    else:
+        results = []
+        for update in rest:
+            try:
+                results.append(await dp.feed_update(bot, update))
+            except Exception as e:
+                results.append(e)
+    for update, result in zip(rest, results):
+        if isinstance(result, Exception):
+            logger.error(f"Failed to process backlog update {update.update_id}: {result}")
+
+    elapsed = time.perf_counter() - started
+    metrics.observe("bot.catchup.drain_time", elapsed)
+    summary = {
+        "updates": len(updates),
+        "start_users": len(starts),
+        "created": len(created),
+        "reactivated": len(reactivated),
+        "welcomes_sent": report["sent"],
+        "welcomes_failed": report["failed"],
+        "other_updates": len(rest),
+        "seconds": round(elapsed, 3),
+    }
+    logger.info(
+        f"Backlog drained in {elapsed:.2f}s: {len(updates)} updates, "
+        f"{len(starts)} /start users ({len(created)} new, {len(reactivated)} reactivated), "
+        f"{report['sent']} welcomes sent, {len(rest)} other updates"
+    )
+    return summary
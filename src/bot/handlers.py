@@ -1,14 +1,38 @@
 """Telegram bot command handlers for Telegram 365 Bot."""
 import logging
-from datetime import time as dt_time
+from datetime import datetime, time as dt_time
+from typing import Optional
 
+import pytz
 from aiogram import Router, F
-from aiogram.types import Message
+from aiogram.types import (
+    CallbackQuery,
+    InlineKeyboardButton,
+    InlineKeyboardMarkup,
+    Message,
+    ReplyKeyboardRemove,
+)
 from aiogram.filters import Command, CommandStart
-
+from sqlalchemy.orm import Session
+
+from src.bot.broadcast import start_broadcast
+from src.bot.middlewares import (
+    DbSessionMiddleware,
+    ThrottlingMiddleware,
+    UpdateConcurrencyMiddleware,
+)
+from src.bot.onboarding import (
+    CHOOSE_OFFSET_TEXT,
+    TIMEZONE_PROMPT,
+    onboard,
+    timezone_keyboard,
+)
 from src.config import config
-from src.database import get_db
+from src.database import get_read_db, release
 from src.database import queries
+from src.database.writer import apply_write
+from src.importers import content as content_import
+from src.timezone_index import OFFSET_ZONES, has_grid, lookup_timezone
 
 logger = logging.getLogger(__name__)
 
@@ -17,37 +41,151 @@ router = Router()
 
 
 @router.message(CommandStart())
-async def cmd_start(message: Message) -> None:
+async def cmd_start(message: Message, db: Session) -> None:
     """Handle /start command - welcome new users or returning users."""
     telegram_id = message.from_user.id
     username = message.from_user.username
 
-    with get_db() as db:
-        # Check if user exists
-        user = queries.get_user_by_telegram_id(db, telegram_id)
-
-        if user:
-            # Returning user - reactivate if inactive
-            if not user.is_active:
-                queries.set_user_active(db, user, True)
-                logger.info(f"User {telegram_id} reactivated at day {user.current_day}")
-        else:
-            # New user - create account
-            user = queries.create_user(
-                db,
+    # Check if user exists
+    user = queries.get_user_by_telegram_id(db, telegram_id)
+    is_new = user is None
+    needs_reactivation = user is not None and not user.is_active
+    current_day = user.current_day if user else 1
+    welcome = queries.get_welcome_message(db)
+    release(db)
+
+    # Writes go through the group-commit writer when it is enabled
+    if is_new:
+        def register(s: Session) -> Optional[int]:
+            # Long-inactive users live in the archive; bring them back as they were
+            restored = queries.restore_archived_user(s, telegram_id, username, commit=False)
+            if restored is not None:
+                return restored.current_day
+            queries.create_user(
+                s,
                 telegram_id=telegram_id,
                 username=username,
-                timezone="UTC",  # TODO: Implement timezone detection
+                timezone="UTC",  # until the user shares a location or offset
+                commit=False,
             )
+            return None
+
+        restored_day = await apply_write(register)
+        if restored_day is None:
             logger.info(f"New user {telegram_id} registered")
+        else:
+            logger.info(f"User {telegram_id} restored from archive at day {restored_day}")
+    elif needs_reactivation:
+        # Returning user - reactivate if inactive
+        await apply_write(
+            lambda s: queries.set_user_active(
+                s, queries.get_user_by_telegram_id(s, telegram_id), True, commit=False
+            )
+        )
+        logger.info(f"User {telegram_id} reactivated at day {current_day}")
+
+    # Restored and reactivated users may have moved since they set their timezone
+    await onboard(message.answer, welcome, ask_timezone=user is None or needs_reactivation)
+
+
+def _offset_keyboard() -> InlineKeyboardMarkup:
+    """Inline keyboard with one button per supported UTC offset."""
+    def minutes(offset: str) -> int:
+        hours, _, mins = offset.partition(":")
+        sign = -1 if hours.startswith("-") else 1
+        return int(hours) * 60 + sign * int(mins or 0)
+
+    buttons = [
+        InlineKeyboardButton(text=f"UTC{offset}", callback_data=f"tz:{offset}")
+        for offset in sorted(OFFSET_ZONES, key=minutes)
+    ]
+    return InlineKeyboardMarkup(
+        inline_keyboard=[buttons[i:i + 4] for i in range(0, len(buttons), 4)]
+    )
+
+
+async def _apply_timezone(telegram_id: int, timezone: str) -> bool:
+    """Save a user's timezone. Returns False if the user is not registered."""
+    def write(s: Session) -> bool:
+        user = queries.get_user_by_telegram_id(s, telegram_id)
+        if user is None:
+            return False
+        queries.set_user_timezone(s, user, timezone, commit=False)
+        return True
+
+    return await apply_write(write)
+
+
+def _timezone_set_text(timezone: str) -> str:
+    local_now = datetime.now(pytz.timezone(timezone))
+    return f"Timezone set to {timezone} (local time {local_now:%H:%M})."
+
+
+@router.message(Command("timezone"))
+async def cmd_timezone(message: Message, db: Session) -> None:
+    """Handle /timezone command - show and change the delivery timezone."""
+    user = queries.get_user_by_telegram_id(db, message.from_user.id)
+    # Read before release: committing expires the loaded user
+    timezone = user.timezone if user is not None else None
+    release(db)
+    if user is None:
+        await message.answer("Send /start first.")
+        return
+    await message.answer(
+        f"Your timezone: {timezone}\n\n{TIMEZONE_PROMPT}",
+        reply_markup=timezone_keyboard(),
+    )
+
+
+@router.message(F.text == CHOOSE_OFFSET_TEXT)
+async def choose_offset(message: Message) -> None:
+    """Show the UTC offset keyboard."""
+    await message.answer("Choose your UTC offset:", reply_markup=_offset_keyboard())
+
+
+@router.message(F.location)
+async def handle_location(message: Message) -> None:
+    """Set the user's timezone from a shared location."""
+    location = message.location
+    try:
+        timezone = lookup_timezone(location.latitude, location.longitude)
+    except ValueError:
+        await message.answer("Invalid location.", reply_markup=ReplyKeyboardRemove())
+        return
 
-        # Send welcome message
-        welcome = queries.get_welcome_message(db)
-        await message.answer(welcome)
+    if not await _apply_timezone(message.from_user.id, timezone):
+        await message.answer("Send /start first.", reply_markup=ReplyKeyboardRemove())
+        return
+    logger.info(f"User {message.from_user.id} timezone set to {timezone} from location")
+    await message.answer(_timezone_set_text(timezone), reply_markup=ReplyKeyboardRemove())
+    if not has_grid():
+        # The reference-city estimate can be a zone off near borders
+        await message.answer(
+            f"{timezone} was estimated from the nearest large city. "
+            "If it is wrong, choose your UTC offset:",
+            reply_markup=_offset_keyboard(),
+        )
+
+
+@router.callback_query(F.data.startswith("tz:"))
+async def handle_offset(callback: CallbackQuery) -> None:
+    """Set the user's timezone from the UTC offset keyboard."""
+    timezone = OFFSET_ZONES.get(callback.data[3:])
+    if timezone is None:
+        await callback.answer("Unknown offset")
+        return
+
+    if not await _apply_timezone(callback.from_user.id, timezone):
+        await callback.answer("Send /start first.")
+        return
+    logger.info(f"User {callback.from_user.id} timezone set to {timezone} from offset")
+    await callback.answer()
+    if isinstance(callback.message, Message):
+        await callback.message.edit_text(_timezone_set_text(timezone))
 
 
 @router.message(Command("admin"))
-async def cmd_admin(message: Message) -> None:
+async def cmd_admin(message: Message, db: Session) -> None:
     """Handle /admin <password> command - grant admin access."""
     telegram_id = message.from_user.id
 
@@ -60,182 +198,414 @@ async def cmd_admin(message: Message) -> None:
     password = args[1].strip()
 
     if password == config.ADMIN_PASSWORD:
-        with get_db() as db:
-            if not queries.is_admin(db, telegram_id):
-                queries.add_admin(db, telegram_id)
-                logger.info(f"Admin access granted to {telegram_id}")
+        already_admin = queries.is_admin(db, telegram_id)
+        release(db)
+        if not already_admin:
+            await apply_write(
+                lambda s: queries.add_admin(s, telegram_id, commit=False)
+            )
+            logger.info(f"Admin access granted to {telegram_id}")
 
-            await message.answer("Admin access granted.")
+        await message.answer("Admin access granted.")
     else:
         # Log failed attempt but don't reveal it's wrong
         logger.warning(f"Failed admin login attempt from {telegram_id}")
 
 
 @router.message(Command("welcome"))
-async def cmd_welcome(message: Message) -> None:
+async def cmd_welcome(message: Message, db: Session) -> None:
     """Handle /welcome command - view current welcome message (admin only)."""
     telegram_id = message.from_user.id
 
-    with get_db() as db:
-        if not queries.is_admin(db, telegram_id):
-            return
+    if not queries.is_admin(db, telegram_id):
+        return
 
-        welcome = queries.get_welcome_message(db)
-        await message.answer(f"Current welcome message:\n\n{welcome}")
+    welcome = queries.get_welcome_message(db)
+    release(db)
+    await message.answer(f"Current welcome message:\n\n{welcome}")
 
 
 @router.message(Command("setwelcome"))
-async def cmd_setwelcome(message: Message) -> None:
+async def cmd_setwelcome(message: Message, db: Session) -> None:
     """Handle /setwelcome <text> command - update welcome message (admin only)."""
     telegram_id = message.from_user.id
 
-    with get_db() as db:
-        if not queries.is_admin(db, telegram_id):
-            return
+    if not queries.is_admin(db, telegram_id):
+        return
 
-        # Extract new welcome message
-        args = message.text.split(maxsplit=1)
-        if len(args) < 2:
-            await message.answer("Usage: /setwelcome <message text>")
-            return
+    # Extract new welcome message
+    args = message.text.split(maxsplit=1)
+    if len(args) < 2:
+        release(db)
+        await message.answer("Usage: /setwelcome <message text>")
+        return
 
-        new_welcome = args[1].strip()
+    new_welcome = args[1].strip()
 
-        if len(new_welcome) > config.MAX_MESSAGE_LENGTH:
-            await message.answer(
-                f"Message too long. Maximum {config.MAX_MESSAGE_LENGTH} characters."
-            )
-            return
+    if len(new_welcome) > config.MAX_MESSAGE_LENGTH:
+        release(db)
+        await message.answer(
+            f"Message too long. Maximum {config.MAX_MESSAGE_LENGTH} characters."
+        )
+        return
 
-        queries.set_welcome_message(db, new_welcome)
-        logger.info(f"Welcome message updated by admin {telegram_id}")
-        await message.answer("Welcome message updated successfully.")
+    release(db)
+    await apply_write(
+        lambda s: queries.set_welcome_message(s, new_welcome, commit=False)
+    )
+    logger.info(f"Welcome message updated by admin {telegram_id}")
+    await message.answer("Welcome message updated successfully.")
 
 
 @router.message(Command("day"))
-async def cmd_day(message: Message) -> None:
+async def cmd_day(message: Message, db: Session) -> None:
     """Handle /day <number> command - view message for specific day (admin only)."""
     telegram_id = message.from_user.id
 
-    with get_db() as db:
-        if not queries.is_admin(db, telegram_id):
-            return
-
-        # Extract day number
-        args = message.text.split()
-        if len(args) < 2:
-            await message.answer("Usage: /day <number> (1-365)")
-            return
-
-        try:
-            day_number = int(args[1])
-        except ValueError:
-            await message.answer("Please provide a valid day number (1-365).")
-            return
-
-        if day_number < 1 or day_number > config.TOTAL_DAYS:
-            await message.answer(f"Day number must be between 1 and {config.TOTAL_DAYS}.")
-            return
-
-        msg = queries.get_message_by_day(db, day_number)
-        if msg:
-            content = msg.content or "(empty)"
-            send_time = msg.send_time.strftime("%H:%M") if msg.send_time else "09:00"
-            await message.answer(
-                f"Day {day_number} (sends at {send_time}):\n\n{content}"
-            )
-        else:
-            await message.answer(f"No message found for day {day_number}.")
+    if not queries.is_admin(db, telegram_id):
+        return
+
+    # Extract day number
+    args = message.text.split()
+    if len(args) < 2:
+        release(db)
+        await message.answer("Usage: /day <number> (1-365)")
+        return
+
+    try:
+        day_number = int(args[1])
+    except ValueError:
+        release(db)
+        await message.answer("Please provide a valid day number (1-365).")
+        return
+
+    if day_number < 1 or day_number > config.TOTAL_DAYS:
+        release(db)
+        await message.answer(f"Day number must be between 1 and {config.TOTAL_DAYS}.")
+        return
+
+    msg = queries.get_message_by_day(db, day_number)
+    if msg:
+        content = msg.content or "(empty)"
+        send_time = msg.send_time.strftime("%H:%M") if msg.send_time else "09:00"
+        reply = f"Day {day_number} (sends at {send_time}):\n\n{content}"
+    else:
+        reply = f"No message found for day {day_number}."
+
+    release(db)
+    await message.answer(reply)
 
 
 @router.message(Command("setday"))
-async def cmd_setday(message: Message) -> None:
+async def cmd_setday(message: Message, db: Session) -> None:
     """Handle /setday <number> <text> command - update day message (admin only)."""
     telegram_id = message.from_user.id
 
-    with get_db() as db:
-        if not queries.is_admin(db, telegram_id):
-            return
+    if not queries.is_admin(db, telegram_id):
+        return
 
-        # Extract day number and message
-        args = message.text.split(maxsplit=2)
-        if len(args) < 3:
-            await message.answer("Usage: /setday <number> <message text>")
-            return
+    # Extract day number and message
+    args = message.text.split(maxsplit=2)
+    if len(args) < 3:
+        release(db)
+        await message.answer("Usage: /setday <number> <message text>")
+        return
 
-        try:
-            day_number = int(args[1])
-        except ValueError:
-            await message.answer("Please provide a valid day number (1-365).")
-            return
+    try:
+        day_number = int(args[1])
+    except ValueError:
+        release(db)
+        await message.answer("Please provide a valid day number (1-365).")
+        return
 
-        if day_number < 1 or day_number > config.TOTAL_DAYS:
-            await message.answer(f"Day number must be between 1 and {config.TOTAL_DAYS}.")
-            return
+    if day_number < 1 or day_number > config.TOTAL_DAYS:
+        release(db)
+        await message.answer(f"Day number must be between 1 and {config.TOTAL_DAYS}.")
+        return
 
-        new_content = args[2].strip()
+    new_content = args[2].strip()
 
-        if len(new_content) > config.MAX_MESSAGE_LENGTH:
-            await message.answer(
-                f"Message too long. Maximum {config.MAX_MESSAGE_LENGTH} characters."
-            )
-            return
+    if len(new_content) > config.MAX_MESSAGE_LENGTH:
+        release(db)
+        await message.answer(
+            f"Message too long. Maximum {config.MAX_MESSAGE_LENGTH} characters."
+        )
+        return
 
-        queries.update_message(db, day_number, new_content)
-        logger.info(f"Day {day_number} message updated by admin {telegram_id}")
-        await message.answer(f"Day {day_number} message updated successfully.")
+    release(db)
+    await apply_write(
+        lambda s: queries.update_message(s, day_number, new_content), group=False
+    )
+    logger.info(f"Day {day_number} message updated by admin {telegram_id}")
+    await message.answer(f"Day {day_number} message updated successfully.")
 
 
 @router.message(Command("settime"))
-async def cmd_settime(message: Message) -> None:
+async def cmd_settime(message: Message, db: Session) -> None:
     """Handle /settime <day> <HH:MM> command - set send time for a day (admin only)."""
     telegram_id = message.from_user.id
 
-    with get_db() as db:
-        if not queries.is_admin(db, telegram_id):
-            return
-
-        # Extract day number and time
-        args = message.text.split()
-        if len(args) < 3:
-            await message.answer("Usage: /settime <day> <HH:MM>\nExample: /settime 1 14:30")
-            return
-
-        try:
-            day_number = int(args[1])
-        except ValueError:
-            await message.answer("Please provide a valid day number (1-365).")
-            return
-
-        if day_number < 1 or day_number > config.TOTAL_DAYS:
-            await message.answer(f"Day number must be between 1 and {config.TOTAL_DAYS}.")
-            return
-
-        # Parse time
-        time_str = args[2].strip()
-        try:
-            parts = time_str.split(":")
-            if len(parts) != 2:
-                raise ValueError("Invalid format")
-            hour = int(parts[0])
-            minute = int(parts[1])
-            if not (0 <= hour <= 23 and 0 <= minute <= 59):
-                raise ValueError("Invalid time values")
-            send_time = dt_time(hour, minute)
-        except (ValueError, IndexError):
-            await message.answer("Invalid time format. Use HH:MM (e.g., 14:30)")
-            return
-
-        # Get current message content to preserve it
-        msg = queries.get_message_by_day(db, day_number)
-        if msg:
-            queries.update_message(db, day_number, msg.content, send_time)
-            logger.info(f"Day {day_number} time set to {time_str} by admin {telegram_id}")
-            await message.answer(f"Day {day_number} send time set to {time_str}.")
-        else:
-            await message.answer(f"No message found for day {day_number}.")
+    if not queries.is_admin(db, telegram_id):
+        return
+
+    # Extract day number and time
+    args = message.text.split()
+    if len(args) < 3:
+        release(db)
+        await message.answer("Usage: /settime <day> <HH:MM>\nExample: /settime 1 14:30")
+        return
+
+    try:
+        day_number = int(args[1])
+    except ValueError:
+        release(db)
+        await message.answer("Please provide a valid day number (1-365).")
+        return
+
+    if day_number < 1 or day_number > config.TOTAL_DAYS:
+        release(db)
+        await message.answer(f"Day number must be between 1 and {config.TOTAL_DAYS}.")
+        return
+
+    # Parse time
+    time_str = args[2].strip()
+    try:
+        parts = time_str.split(":")
+        if len(parts) != 2:
+            raise ValueError("Invalid format")
+        hour = int(parts[0])
+        minute = int(parts[1])
+        if not (0 <= hour <= 23 and 0 <= minute <= 59):
+            raise ValueError("Invalid time values")
+        send_time = dt_time(hour, minute)
+    except (ValueError, IndexError):
+        release(db)
+        await message.answer("Invalid time format. Use HH:MM (e.g., 14:30)")
+        return
+
+    # Get current message content to preserve it
+    msg = queries.get_message_by_day(db, day_number)
+    content = msg.content if msg else None
+    release(db)
+    if msg:
+        await apply_write(
+            lambda s: queries.update_message(s, day_number, content, send_time),
+            group=False,
+        )
+        logger.info(f"Day {day_number} time set to {time_str} by admin {telegram_id}")
+        reply = f"Day {day_number} send time set to {time_str}."
+    else:
+        reply = f"No message found for day {day_number}."
+
+    await message.answer(reply)
+
+
+@router.message(Command("stats"))
+async def cmd_stats(message: Message, db: Session) -> None:
+    """Handle /stats command - show user and delivery statistics (admin only)."""
+    telegram_id = message.from_user.id
+
+    if not queries.is_admin(db, telegram_id):
+        return
+    release(db)
+
+    # Reporting query: served by the read replica when one is configured
+    with get_read_db() as read_db:
+        stats = queries.get_stats(read_db)
+
+    lines = [
+        f"Users: {stats['total_users']} total, {stats['active_users']} active",
+        f"Delivered today (UTC): {stats['delivered_today']}",
+    ]
+    if stats["active_by_day"]:
+        lines.append("\nActive users by day:")
+        for start, end, count in queries.group_active_by_period(stats["active_by_day"]):
+            lines.append(f"  Days {start}-{end}: {count}")
+
+    await message.answer("\n".join(lines))
+
+
+def _format_broadcast(broadcast) -> str:
+    progress = broadcast.to_dict()
+    return (
+        f"Broadcast #{progress['id']} ({progress['status']}): "
+        f"{progress['sent']} sent, {progress['failed']} failed, "
+        f"{progress['remaining']} remaining, {progress['rate']} msgs/s"
+    )
+
+
+@router.message(Command("broadcast"))
+async def cmd_broadcast(message: Message, db: Session) -> None:
+    """Handle /broadcast <text> command - send an announcement to all active users (admin only)."""
+    telegram_id = message.from_user.id
+
+    if not queries.is_admin(db, telegram_id):
+        return
+
+    args = message.text.split(maxsplit=1)
+    if len(args) < 2:
+        release(db)
+        await message.answer(
+            "Usage: /broadcast <message text>\n"
+            "Then /broadcast_status, /broadcast_pause or /broadcast_resume"
+        )
+        return
+
+    text = args[1].strip()
+    if len(text) > config.MAX_MESSAGE_LENGTH:
+        release(db)
+        await message.answer(
+            f"Message too long. Maximum {config.MAX_MESSAGE_LENGTH} characters."
+        )
+        return
+
+    release(db)
+
+    def create(s: Session) -> tuple[int, int]:
+        broadcast = queries.create_broadcast(s, text)
+        return broadcast.id, broadcast.total
+
+    broadcast_id, total = await apply_write(create, group=False)
+    start_broadcast(broadcast_id)
+    logger.info(f"Broadcast {broadcast_id} started by admin {telegram_id}")
+    await message.answer(
+        f"Broadcast #{broadcast_id} started to {total} active users.\n"
+        f"Check progress with /broadcast_status"
+    )
+
+
+def _broadcast_from_args(db: Session, message: Message):
+    """Get the broadcast named in the command, or the most recent one."""
+    args = message.text.split()
+    if len(args) > 1 and args[1].isdigit():
+        return queries.get_broadcast(db, int(args[1]))
+    recent = queries.get_recent_broadcasts(db, limit=1)
+    return recent[0] if recent else None
+
+
+async def _set_broadcast_status(broadcast_id: int, status: str) -> str:
+    """Change a broadcast's status and return its formatted progress."""
+    return await apply_write(
+        lambda s: _format_broadcast(
+            queries.set_broadcast_status(s, queries.get_broadcast(s, broadcast_id), status)
+        ),
+        group=False,
+    )
+
+
+@router.message(Command("broadcast_status"))
+async def cmd_broadcast_status(message: Message, db: Session) -> None:
+    """Handle /broadcast_status [id] command - show broadcast progress (admin only)."""
+    if not queries.is_admin(db, message.from_user.id):
+        return
+
+    broadcast = _broadcast_from_args(db, message)
+    reply = _format_broadcast(broadcast) if broadcast else "No broadcasts yet."
+    release(db)
+    await message.answer(reply)
+
+
+@router.message(Command("broadcast_pause"))
+async def cmd_broadcast_pause(message: Message, db: Session) -> None:
+    """Handle /broadcast_pause [id] command - pause a running broadcast (admin only)."""
+    if not queries.is_admin(db, message.from_user.id):
+        return
+
+    broadcast = _broadcast_from_args(db, message)
+    release(db)
+    if broadcast is None or broadcast.status != "running":
+        reply = "No running broadcast to pause."
+    else:
+        reply = "Paused. " + await _set_broadcast_status(broadcast.id, "paused")
+    await message.answer(reply)
+
+
+@router.message(Command("broadcast_resume"))
+async def cmd_broadcast_resume(message: Message, db: Session) -> None:
+    """Handle /broadcast_resume [id] command - resume a paused broadcast (admin only)."""
+    if not queries.is_admin(db, message.from_user.id):
+        return
+
+    broadcast = _broadcast_from_args(db, message)
+    release(db)
+    broadcast_id = None
+    if broadcast is None or broadcast.status != "paused":
+        reply = "No paused broadcast to resume."
+    else:
+        broadcast_id = broadcast.id
+        reply = "Resumed. " + await _set_broadcast_status(broadcast_id, "running")
+    if broadcast_id is not None:
+        start_broadcast(broadcast_id)
+    await message.answer(reply)
+
+
+@router.message(Command("import"))
+async def cmd_import(message: Message, db: Session) -> None:
+    """Handle /import - bulk update day messages from a CSV/JSON document (admin only).
+
+    The command goes in the caption of the document, or as a reply to it.
+    """
+    telegram_id = message.from_user.id
+
+    if not queries.is_admin(db, telegram_id):
+        return
+    release(db)
+
+    document = message.document
+    if document is None and message.reply_to_message is not None:
+        document = message.reply_to_message.document
+    if document is None:
+        await message.answer(
+            "Usage: send a .csv or .json document with the caption /import, "
+            "or reply /import to one.\nColumns: day, content, send_time (HH:MM, optional)"
+        )
+        return
+
+    if document.file_size and document.file_size > config.IMPORT_MAX_FILE_SIZE:
+        await message.answer(
+            f"File too large. Maximum {config.IMPORT_MAX_FILE_SIZE // 1024} KB."
+        )
+        return
+
+    stream = await message.bot.download(document)
+    try:
+        rows = content_import.iter_rows(stream, document.file_name)
+        changes, errors = content_import.validate_rows(rows)
+    except content_import.ContentImportError as e:
+        await message.answer(f"Import rejected: {e}")
+        return
+
+    if errors:
+        await message.answer(content_import.format_errors(errors))
+        return
+
+    diff = await apply_write(
+        lambda s: queries.apply_message_import(s, changes), group=False
+    )
+    logger.info(
+        f"Imported {len(changes)} day messages by admin {telegram_id}, "
+        f"{len(diff['changed'])} changed"
+    )
+    await message.answer(content_import.format_summary(diff))
 
 
 def setup_handlers(dp) -> None:
     """Register all handlers with the dispatcher."""
+    # Drop floods first so they never wait for a processing slot
+    dp.update.outer_middleware(
+        ThrottlingMiddleware(
+            rate=config.THROTTLE_RATE,
+            burst=config.THROTTLE_BURST,
+            max_tracked=config.THROTTLE_MAX_TRACKED_USERS,
+            prune_interval=config.THROTTLE_PRUNE_INTERVAL,
+        )
+    )
+    if config.UPDATE_PROCESSING_MODE == "concurrent":
+        dp.update.outer_middleware(
+            UpdateConcurrencyMiddleware(config.UPDATE_CONCURRENCY_LIMIT)
+        )
+
+    # Each matched message or button press gets its own scoped DB session
+    router.message.middleware(DbSessionMiddleware())
+    router.callback_query.middleware(DbSessionMiddleware())
     dp.include_router(router)
@@ -0,0 +1,205 @@
+"""Aiogram middlewares for Telegram 365 Bot."""
+import asyncio
+import logging
+import time
+from typing import Any, Awaitable, Callable, Dict
+
+from aiogram import BaseMiddleware
+from aiogram.types import TelegramObject
+
+from src.database import SessionLocal
+from src.database.profiling import QueryScope
+from src.metrics import metrics
+
+logger = logging.getLogger(__name__)
+
+
+class DbSessionMiddleware(BaseMiddleware):
+    """Give each update its own database session.
+
+    The session is passed to handlers as ``db``. It is created lazily, so an
+    update that never touches the database never checks out a connection.
+    Handlers call ``release(db)`` before awaiting Telegram; the middleware
+    closes whatever is left when the handler returns and records how long the
+    update waited for pooled connections. The handler runs in a query scope
+    named after it, so its statements and database time are counted.
+    """
+
+    async def __call__(
+        self,
+        handler: Callable[[TelegramObject, Dict[str, Any]], Awaitable[Any]],
+        event: TelegramObject,
+        data: Dict[str, Any],
+    ) -> Any:
+        db = SessionLocal()
+        data["db"] = db
+        callback = getattr(data.get("handler"), "callback", None)
+        name = getattr(callback, "__name__", type(event).__name__)
+        try:
+            with QueryScope("bot", name):
+                return await handler(event, data)
+        finally:
+            db.close()
+            waited = db.info.get("checkout_wait")
+            if waited is not None:
+                metrics.observe("bot.update.checkout_wait", waited)
+                logger.debug(f"Update waited {waited * 1000:.2f}ms for DB connections")
+
+
+class UpdateConcurrencyMiddleware(BaseMiddleware):
+    """Process updates concurrently with a global limit and per-user ordering.
+
+    Updates from the same ``from_user.id`` wait on a per-user lock, so they
+    run one after another in arrival order, while updates from different
+    users share a global semaphore of ``limit`` slots. Registered as an outer
+    middleware on ``dp.update`` when polling with ``handle_as_tasks=True``.
+    """
+
+    def __init__(self, limit: int) -> None:
+        self.limit = limit
+        self._semaphore = asyncio.Semaphore(limit)
+        # user_id -> [lock, number of updates holding or waiting on it]
+        self._user_locks: dict[int, list] = {}
+        self.queued = 0
+        self.in_flight = 0
+
+    def _acquire_user_entry(self, user_id: int) -> list:
+        entry = self._user_locks.get(user_id)
+        if entry is None:
+            entry = [asyncio.Lock(), 0]
+            self._user_locks[user_id] = entry
+        entry[1] += 1
+        return entry
+
+    def _release_user_entry(self, user_id: int, entry: list) -> None:
+        entry[1] -= 1
+        if entry[1] == 0:
+            del self._user_locks[user_id]
+
+    def _set_queued(self, delta: int) -> None:
+        self.queued += delta
+        metrics.set_gauge("bot.updates.queued", self.queued)
+
+    def _set_in_flight(self, delta: int) -> None:
+        self.in_flight += delta
+        metrics.set_gauge("bot.updates.in_flight", self.in_flight)
+
+    async def __call__(
+        self,
+        handler: Callable[[TelegramObject, Dict[str, Any]], Awaitable[Any]],
+        event: TelegramObject,
+        data: Dict[str, Any],
+    ) -> Any:
+        user = data.get("event_from_user")
+        user_id = user.id if user else None
+        entry = self._acquire_user_entry(user_id) if user_id is not None else None
+
+        queued_at = time.perf_counter()
+        self._set_queued(1)
+        try:
+            if entry is not None:
+                await entry[0].acquire()
+            try:
+                await self._semaphore.acquire()
+            except BaseException:
+                if entry is not None:
+                    entry[0].release()
+                raise
+        except BaseException:
+            self._set_queued(-1)
+            if entry is not None:
+                self._release_user_entry(user_id, entry)
+            raise
+
+        self._set_queued(-1)
+        metrics.observe("bot.updates.queue_wait", time.perf_counter() - queued_at)
+        self._set_in_flight(1)
+        try:
+            return await handler(event, data)
+        finally:
+            self._set_in_flight(-1)
+            self._semaphore.release()
+            if entry is not None:
+                entry[0].release()
+                self._release_user_entry(user_id, entry)
+
+
+class ThrottlingMiddleware(BaseMiddleware):
+    """Drop updates from users who exceed a per-user token bucket.
+
+    The bucket is kept in GCRA form: one float per user holding the
+    theoretical arrival time of their next update, which is all a token
+    bucket needs. A user whose stored time is in the past has a full bucket
+    and is indistinguishable from an untracked one, so those entries are
+    pruned every ``prune_interval`` seconds, or as soon as ``max_tracked``
+    users are tracked. Each prune then evicts the least recently seen users
+    down to 90% of ``max_tracked``, which keeps memory bounded however many
+    distinct users write and keeps prunes rare during a flood.
+    Registered as an outer middleware on ``dp.update`` so dropped updates
+    never reach a handler, a queue slot or a database session.
+    """
+
+    def __init__(
+        self,
+        rate: float,
+        burst: int,
+        max_tracked: int = 100000,
+        prune_interval: float = 60.0,
+    ) -> None:
+        self.interval = 1.0 / rate
+        self.tolerance = self.interval * (burst - 1)
+        self.max_tracked = max_tracked
+        self.prune_interval = prune_interval
+        # user_id -> theoretical arrival time, least recently seen first
+        self._tat: dict[int, float] = {}
+        self._last_prune = time.monotonic()
+
+    def allow(self, user_id: int, now: float) -> bool:
+        """Consume a token for user_id, returning False if none is left."""
+        tat = self._tat.pop(user_id, now)
+        if tat < now:
+            tat = now
+        if tat - now > self.tolerance:
+            self._tat[user_id] = tat
+            return False
+        self._tat[user_id] = tat + self.interval
+        return True
+
+    def prune(self, now: float) -> None:
+        """Forget users whose bucket has refilled, then enforce max_tracked."""
+        before = len(self._tat)
+        self._tat = {uid: tat for uid, tat in self._tat.items() if tat > now}
+        # Evict down to 90% of the cap whenever at or above it, so every
+        # prune leaves room for at least 10% new senders before the next one
+        low_watermark = int(self.max_tracked * 0.9)
+        overflow = len(self._tat) - low_watermark
+        if overflow > 0:
+            for uid in list(self._tat)[:overflow]:
+                del self._tat[uid]
+        self._last_prune = now
+        metrics.incr("bot.throttle.pruned", before - len(self._tat))
+        metrics.set_gauge("bot.throttle.tracked_users", len(self._tat))
+
+    async def __call__(
+        self,
+        handler: Callable[[TelegramObject, Dict[str, Any]], Awaitable[Any]],
+        event: TelegramObject,
+        data: Dict[str, Any],
+    ) -> Any:
+        user = data.get("event_from_user")
+        if user is None:
+            return await handler(event, data)
+
+        now = time.monotonic()
+        if (
+            now - self._last_prune >= self.prune_interval
+            or len(self._tat) >= self.max_tracked
+        ):
+            self.prune(now)
+
+        if not self.allow(user.id, now):
+            metrics.incr("bot.throttle.dropped")
+            logger.debug(f"Dropped update from {user.id} (rate limited)")
+            return None
+
+        return await handler(event, data)
@@ -0,0 +1,38 @@
+"""First-contact messages for Telegram 365 Bot.
+
+/start and the startup catch-up register users in different ways (one at a
+time or in bulk) but greet them the same way, through ``onboard``: the
+welcome message, then the timezone prompt for users who still need to set
+their timezone.
+"""
+from typing import Any, Awaitable, Callable
+
+from aiogram.types import KeyboardButton, ReplyKeyboardMarkup
+
+TIMEZONE_PROMPT = (
+    "Messages are sent at your local time. Share your location to set your "
+    "timezone, or choose your UTC offset."
+)
+CHOOSE_OFFSET_TEXT = "🕐 Choose UTC offset"
+
+# send(text, reply_markup=None): Message.answer, or sender.send bound to a chat
+SendFn = Callable[..., Awaitable[Any]]
+
+
+def timezone_keyboard() -> ReplyKeyboardMarkup:
+    """Reply keyboard asking for a location, with the offset list as fallback."""
+    return ReplyKeyboardMarkup(
+        keyboard=[
+            [KeyboardButton(text="📍 Share location", request_location=True)],
+            [KeyboardButton(text=CHOOSE_OFFSET_TEXT)],
+        ],
+        resize_keyboard=True,
+        one_time_keyboard=True,
+    )
+
+
+async def onboard(send: SendFn, welcome: str, ask_timezone: bool) -> None:
+    """Send the welcome message, then the timezone prompt if asked for."""
+    await send(welcome)
+    if ask_timezone:
+        await send(TIMEZONE_PROMPT, reply_markup=timezone_keyboard())
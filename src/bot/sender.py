@@ -0,0 +1,136 @@
+"""Rate-limited message sender for Telegram 365 Bot."""
+import asyncio
+import logging
+import time
+from typing import Any, Awaitable, Iterable, Optional
+
+from aiogram import Bot
+from aiogram.exceptions import TelegramForbiddenError, TelegramRetryAfter
+from aiogram.types import ReplyKeyboardMarkup
+
+from src.bot.bot import bot
+from src.config import config
+from src.metrics import metrics
+
+logger = logging.getLogger(__name__)
+
+
+class RateLimitedSender:
+    """Send messages concurrently without exceeding a global rate.
+
+    Sends are spaced ``1 / rate`` seconds apart across all callers and at most
+    ``concurrency`` requests are in flight. A flood-wait from Telegram pushes
+    the next free slot back for every caller, not just the one that hit it.
+
+    Low-priority sends (broadcasts) may use at most half of the concurrency
+    and step aside whenever a normal send (daily deliveries, replies) is
+    waiting, so a large broadcast can never starve daily messages.
+    """
+
+    def __init__(self, bot: Bot, rate: float, concurrency: int, max_retries: int = 3) -> None:
+        self.bot = bot
+        self.interval = 1.0 / rate
+        self.max_retries = max_retries
+        self._semaphore = asyncio.Semaphore(concurrency)
+        self._low_semaphore = asyncio.Semaphore(max(1, concurrency // 2))
+        self._next_slot = 0.0
+        self._high_pending = 0
+        self._high_idle = asyncio.Event()
+        self._high_idle.set()
+
+    async def _wait_for_slot(self) -> None:
+        now = time.monotonic()
+        slot = max(now, self._next_slot)
+        self._next_slot = slot + self.interval
+        if slot > now:
+            await asyncio.sleep(slot - now)
+
+    async def _yield_to_high_priority(self) -> None:
+        while self._high_pending:
+            await self._high_idle.wait()
+
+    async def send(
+        self,
+        chat_id: int,
+        text: str,
+        low_priority: bool = False,
+        reply_markup: Optional[ReplyKeyboardMarkup] = None,
+    ) -> None:
+        """Send one message, retrying flood-waits.
+
+        Raises:
+            TelegramAPIError: If Telegram rejects the message for another reason.
+        """
+        if low_priority:
+            async with self._low_semaphore:
+                await self._yield_to_high_priority()
+                await self._send(chat_id, text, reply_markup)
+            return
+
+        self._high_pending += 1
+        self._high_idle.clear()
+        try:
+            await self._send(chat_id, text, reply_markup)
+        finally:
+            self._high_pending -= 1
+            if not self._high_pending:
+                self._high_idle.set()
+
+    async def _send(
+        self, chat_id: int, text: str, reply_markup: Optional[ReplyKeyboardMarkup]
+    ) -> None:
+        async with self._semaphore:
+            for attempt in range(self.max_retries + 1):
+                await self._wait_for_slot()
+                try:
+                    await self.bot.send_message(chat_id, text, reply_markup=reply_markup)
+                    metrics.incr("bot.sender.sent")
+                    return
+                except TelegramRetryAfter as e:
+                    if attempt == self.max_retries:
+                        raise
+                    metrics.incr("bot.sender.retry_after")
+                    logger.warning(f"Flood wait {e.retry_after}s sending to {chat_id}")
+                    self._next_slot = max(self._next_slot, time.monotonic() + e.retry_after)
+
+    async def send_many(
+        self, messages: Iterable[tuple[int, str]], low_priority: bool = False
+    ) -> dict:
+        """Send (chat_id, text) pairs concurrently.
+
+        Returns:
+            Dict with "sent" and "failed" counts and the list of "blocked" chat ids.
+        """
+        return await gather_sends(
+            (chat_id, self.send(chat_id, text, low_priority)) for chat_id, text in messages
+        )
+
+
+async def gather_sends(sends: Iterable[tuple[int, Awaitable[Any]]]) -> dict:
+    """Run (chat_id, coroutine) sends concurrently and count the outcomes.
+
+    Returns:
+        Dict with "sent" and "failed" counts and the list of "blocked" chat ids.
+    """
+    report = {"sent": 0, "failed": 0, "blocked": []}
+
+    async def run(chat_id: int, send: Awaitable[Any]) -> None:
+        try:
+            await send
+            report["sent"] += 1
+        except TelegramForbiddenError:
+            report["failed"] += 1
+            report["blocked"].append(chat_id)
+        except Exception as e:
+            report["failed"] += 1
+            logger.error(f"Failed to send message to {chat_id}: {e}")
+
+    await asyncio.gather(*(run(chat_id, send) for chat_id, send in sends))
+    return report
+
+
+sender = RateLimitedSender(
+    bot,
+    rate=config.SEND_RATE_PER_SECOND,
+    concurrency=config.SEND_CONCURRENCY,
+)
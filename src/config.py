@@ -15,12 +15,51 @@ class Config:
     # Database
     DATABASE_URL: str = os.getenv("DATABASE_URL", "postgresql://localhost/telegram_365_bot")
 
+    # Optional read replica for the web panel and reporting queries. After an
+    # edit the panel reads from the primary for READ_YOUR_WRITES_SECONDS
+    DATABASE_REPLICA_URL: str = os.getenv("DATABASE_REPLICA_URL", "")
+    READ_YOUR_WRITES_SECONDS: float = float(os.getenv("READ_YOUR_WRITES_SECONDS", "10"))
+
+    # Connection pool shared by handlers, scheduler, writer and web panel.
+    # Pre-ping: "always" pings on every checkout, "idle" only connections idle
+    # longer than DB_POOL_PING_IDLE_SECONDS, "never" relies on recycle alone
+    DB_POOL_SIZE: int = int(os.getenv("DB_POOL_SIZE", "5"))
+    DB_MAX_OVERFLOW: int = int(os.getenv("DB_MAX_OVERFLOW", "10"))
+    DB_POOL_TIMEOUT: float = float(os.getenv("DB_POOL_TIMEOUT", "30"))
+    DB_POOL_RECYCLE: int = int(os.getenv("DB_POOL_RECYCLE", "1800"))
+    DB_POOL_PRE_PING: str = os.getenv("DB_POOL_PRE_PING", "idle").lower()
+    DB_POOL_PING_IDLE_SECONDS: float = float(os.getenv("DB_POOL_PING_IDLE_SECONDS", "60"))
+
+    # Per-scope query instrumentation (web request, bot update, scheduler
+    # tick). Scopes over any limit are logged; 0 disables that check
+    QUERY_SCOPE_MAX_STATEMENTS: int = int(os.getenv("QUERY_SCOPE_MAX_STATEMENTS", "50"))
+    QUERY_SCOPE_MAX_DB_MS: float = float(os.getenv("QUERY_SCOPE_MAX_DB_MS", "500"))
+    QUERY_SCOPE_REPEAT_THRESHOLD: int = int(os.getenv("QUERY_SCOPE_REPEAT_THRESHOLD", "10"))
+
+    # Slow-query log (0 disables): statements at least this slow are kept
+    # in a ring buffer shown in the web panel, with their EXPLAIN plan if
+    # SLOW_QUERY_EXPLAIN is on
+    SLOW_QUERY_MS: float = float(os.getenv("SLOW_QUERY_MS", "0"))
+    SLOW_QUERY_EXPLAIN: bool = os.getenv("SLOW_QUERY_EXPLAIN", "False").lower() == "true"
+    SLOW_QUERY_LOG_SIZE: int = int(os.getenv("SLOW_QUERY_LOG_SIZE", "200"))
+
+    # SQLite profile (ignored for other databases). WAL lets reads run while
+    # the single writer commits; without it an open read blocks the writer.
+    # NORMAL sync can lose the last commits on power loss, never corrupts
+    SQLITE_JOURNAL_MODE: str = os.getenv("SQLITE_JOURNAL_MODE", "WAL")
+    SQLITE_SYNCHRONOUS: str = os.getenv("SQLITE_SYNCHRONOUS", "NORMAL")
+    SQLITE_BUSY_TIMEOUT_MS: int = int(os.getenv("SQLITE_BUSY_TIMEOUT_MS", "5000"))
+    SQLITE_MMAP_SIZE: int = int(os.getenv("SQLITE_MMAP_SIZE", str(256 * 1024 * 1024)))
+
     # Admin Authentication
     ADMIN_PASSWORD: str = os.getenv("ADMIN_PASSWORD", "")
 
     # Web Panel
     WEB_ADMIN_PASSWORD: str = os.getenv("WEB_ADMIN_PASSWORD", "")
     SECRET_KEY: str = os.getenv("SECRET_KEY", "change-this-secret-key")
+    DASHBOARD_PAGE_SIZE: int = int(os.getenv("DASHBOARD_PAGE_SIZE", "50"))  # days per page
+    # HTML/JSON/CSS responses at least this big are sent gzip or brotli compressed
+    COMPRESS_MIN_SIZE: int = int(os.getenv("COMPRESS_MIN_SIZE", "1024"))
 
     # Flask Server
     FLASK_HOST: str = os.getenv("FLASK_HOST", "0.0.0.0")
@@ -30,12 +69,55 @@ class Config:
     # Session timeout in minutes (default: 30 minutes)
     SESSION_TIMEOUT_MINUTES: int = int(os.getenv("SESSION_TIMEOUT_MINUTES", "30"))
 
+    # Group commit: batch handler-side writes arriving within a few
+    # milliseconds into one transaction. SQLite always runs the writer, but
+    # only batches when this is enabled
+    GROUP_COMMIT_ENABLED: bool = os.getenv("GROUP_COMMIT_ENABLED", "False").lower() == "true"
+    GROUP_COMMIT_WINDOW_MS: float = float(os.getenv("GROUP_COMMIT_WINDOW_MS", "5"))
+    GROUP_COMMIT_MAX_BATCH: int = int(os.getenv("GROUP_COMMIT_MAX_BATCH", "200"))
+
+    # Update processing: "sequential" handles one update at a time,
+    # "concurrent" runs different users in parallel up to the limit below
+    UPDATE_PROCESSING_MODE: str = os.getenv("UPDATE_PROCESSING_MODE", "concurrent")
+    UPDATE_CONCURRENCY_LIMIT: int = int(os.getenv("UPDATE_CONCURRENCY_LIMIT", "10"))
+
+    # Anti-flood: per-user token bucket in front of all handlers
+    THROTTLE_RATE: float = float(os.getenv("THROTTLE_RATE", "1.0"))  # updates/second
+    THROTTLE_BURST: int = int(os.getenv("THROTTLE_BURST", "5"))
+    THROTTLE_MAX_TRACKED_USERS: int = int(os.getenv("THROTTLE_MAX_TRACKED_USERS", "100000"))
+    THROTTLE_PRUNE_INTERVAL: int = int(os.getenv("THROTTLE_PRUNE_INTERVAL", "60"))  # seconds
+
+    # Outgoing messages: global rate limit shared by all bulk sends
+    SEND_RATE_PER_SECOND: float = float(os.getenv("SEND_RATE_PER_SECOND", "25"))
+    SEND_CONCURRENCY: int = int(os.getenv("SEND_CONCURRENCY", "10"))
+
+    # Broadcasts: users fetched per keyset batch, and how often the scheduler
+    # picks up broadcasts started or resumed from the web panel
+    BROADCAST_BATCH_SIZE: int = int(os.getenv("BROADCAST_BATCH_SIZE", "200"))
+    BROADCAST_POLL_SECONDS: int = int(os.getenv("BROADCAST_POLL_SECONDS", "5"))
+
+    # Catch up on updates that piled up while the bot was down
+    CATCHUP_ON_STARTUP: bool = os.getenv("CATCHUP_ON_STARTUP", "True").lower() == "true"
+    CATCHUP_BATCH_SIZE: int = int(os.getenv("CATCHUP_BATCH_SIZE", "100"))  # Telegram max
+
+    # Offline timezone grid built by tools/build_timezone_grid.py (init.sh and
+    # the Docker image run it); without it, shared locations resolve to the
+    # nearest built-in reference city and the user is asked to confirm
+    TIMEZONE_GRID_PATH: str = os.getenv("TIMEZONE_GRID_PATH", "data/timezones.grid")
+
     # Scheduler
     SCHEDULER_TIMEZONE: str = os.getenv("SCHEDULER_TIMEZONE", "UTC")
+    STATS_RECONCILE_MINUTES: int = int(os.getenv("STATS_RECONCILE_MINUTES", "60"))
+
+    # Users inactive this long are moved to archived_users (0 disables)
+    ARCHIVE_INACTIVE_AFTER_DAYS: int = int(os.getenv("ARCHIVE_INACTIVE_AFTER_DAYS", "30"))
+    ARCHIVE_BATCH_SIZE: int = int(os.getenv("ARCHIVE_BATCH_SIZE", "1000"))
+    ARCHIVE_INTERVAL_MINUTES: int = int(os.getenv("ARCHIVE_INTERVAL_MINUTES", "60"))
 
     # Message limits
     MAX_MESSAGE_LENGTH: int = 4096  # Telegram message limit
     TOTAL_DAYS: int = 365
+    IMPORT_MAX_FILE_SIZE: int = 5 * 1024 * 1024  # Bulk content import documents
 
     @classmethod
     def validate(cls) -> list[str]:
@@ -53,6 +135,12 @@ class Config:
             errors.append("ADMIN_PASSWORD is required")
         if not cls.WEB_ADMIN_PASSWORD:
             errors.append("WEB_ADMIN_PASSWORD is required")
+        if cls.UPDATE_PROCESSING_MODE not in ("sequential", "concurrent"):
+            errors.append("UPDATE_PROCESSING_MODE must be 'sequential' or 'concurrent'")
+        if cls.UPDATE_CONCURRENCY_LIMIT < 1:
+            errors.append("UPDATE_CONCURRENCY_LIMIT must be at least 1")
+        if cls.DB_POOL_PRE_PING not in ("always", "idle", "never"):
+            errors.append("DB_POOL_PRE_PING must be 'always', 'idle' or 'never'")
         return errors
 
 
@@ -1,15 +1,36 @@
 """Database package for Telegram 365 Bot."""
-from src.database.models import Base, User, Message, Setting, Admin
-from src.database.session import engine, SessionLocal, init_db, get_db
+from src.database.models import (
+    Base,
+    User,
+    ArchivedUser,
+    Message,
+    Setting,
+    Admin,
+    StatCounter,
+    Broadcast,
+)
+from src.database.session import (
+    engine,
+    SessionLocal,
+    init_db,
+    get_db,
+    get_read_db,
+    release,
+)
 
 __all__ = [
     "Base",
     "User",
+    "ArchivedUser",
     "Message",
     "Setting",
     "Admin",
+    "StatCounter",
+    "Broadcast",
     "engine",
     "SessionLocal",
     "init_db",
     "get_db",
+    "get_read_db",
+    "release",
 ]
@@ -10,6 +10,9 @@ from sqlalchemy import (
     DateTime,
     Time,
     Date,
+    Float,
+    Index,
+    text,
 )
 from sqlalchemy.orm import declarative_base
 
@@ -20,6 +23,22 @@ class User(Base):
     """User model for tracking Telegram users."""
 
     __tablename__ = "users"
+    # Partial indexes over active users only (see migration 0002)
+    __table_args__ = (
+        Index(
+            "ix_users_active_id",
+            "id",
+            postgresql_where=text("is_active = true"),
+            sqlite_where=text("is_active = 1"),
+        ),
+        Index(
+            "ix_users_active_timezone_day",
+            "timezone",
+            "current_day",
+            postgresql_where=text("is_active = true"),
+            sqlite_where=text("is_active = 1"),
+        ),
+    )
 
     id = Column(Integer, primary_key=True)
     telegram_id = Column(BigInteger, unique=True, nullable=False, index=True)
@@ -36,6 +55,30 @@ class User(Base):
         return f"<User(telegram_id={self.telegram_id}, day={self.current_day})>"
 
 
+class ArchivedUser(Base):
+    """Long-inactive user moved out of the hot users table.
+
+    Restored into users (keeping current_day) when they send /start again.
+    """
+
+    __tablename__ = "archived_users"
+
+    id = Column(Integer, primary_key=True)
+    telegram_id = Column(BigInteger, unique=True, nullable=False, index=True)
+    username = Column(String(255), nullable=True)
+    timezone = Column(String(50), default="UTC")
+    current_day = Column(Integer, default=1)
+    started_at = Column(DateTime, nullable=True)
+    last_message_date = Column(Date, nullable=True)
+    created_at = Column(DateTime, nullable=True)
+    # users.updated_at at archiving time, i.e. roughly when they went inactive
+    deactivated_at = Column(DateTime, nullable=True)
+    archived_at = Column(DateTime, default=datetime.utcnow)
+
+    def __repr__(self) -> str:
+        return f"<ArchivedUser(telegram_id={self.telegram_id}, day={self.current_day})>"
+
+
 class Message(Base):
     """Message model for daily messages."""
 
@@ -77,3 +120,67 @@ class Admin(Base):
 
     def __repr__(self) -> str:
         return f"<Admin(telegram_id={self.telegram_id})>"
+
+
+class StatCounter(Base):
+    """Incrementally maintained counter backing the admin statistics."""
+
+    __tablename__ = "stat_counters"
+
+    id = Column(Integer, primary_key=True)
+    name = Column(String(100), unique=True, nullable=False, index=True)
+    value = Column(BigInteger, nullable=False, default=0)
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+    def __repr__(self) -> str:
+        return f"<StatCounter(name={self.name}, value={self.value})>"
+
+
+class Broadcast(Base):
+    """One-off announcement sent to every active user."""
+
+    __tablename__ = "broadcasts"
+
+    id = Column(Integer, primary_key=True)
+    text = Column(Text, nullable=False)
+    # running, paused, done or cancelled
+    status = Column(String(20), nullable=False, default="running", index=True)
+    # Keyset cursor: users.id of the last user processed
+    cursor_user_id = Column(Integer, nullable=False, default=0)
+    total = Column(Integer, nullable=False, default=0)
+    sent = Column(Integer, nullable=False, default=0)
+    failed = Column(Integer, nullable=False, default=0)
+    active_seconds = Column(Float, nullable=False, default=0.0)
+    created_at = Column(DateTime, default=datetime.utcnow)
+    finished_at = Column(DateTime, nullable=True)
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+    @property
+    def remaining(self) -> int:
+        """Users not yet processed (estimated from the count at creation)."""
+        return max(self.total - self.sent - self.failed, 0)
+
+    @property
+    def rate(self) -> float:
+        """Messages processed per second while running."""
+        if not self.active_seconds:
+            return 0.0
+        return (self.sent + self.failed) / self.active_seconds
+
+    def to_dict(self) -> dict:
+        """Progress snapshot for the bot and the web panel."""
+        return {
+            "id": self.id,
+            "status": self.status,
+            "text": self.text,
+            "total": self.total,
+            "sent": self.sent,
+            "failed": self.failed,
+            "remaining": self.remaining,
+            "rate": round(self.rate, 1),
+            "created_at": self.created_at.isoformat() if self.created_at else None,
+            "finished_at": self.finished_at.isoformat() if self.finished_at else None,
+        }
+
+    def __repr__(self) -> str:
+        return f"<Broadcast(id={self.id}, status={self.status})>"
@@ -0,0 +1,101 @@
+"""Connection pool configuration and metrics for Telegram 365 Bot.
+
+The Flask thread, the scheduler, the writer and the bot handlers share one
+pool. Its size, overflow, recycle and timeout come from ``Config``, and the
+pool reports into the metrics registry:
+
+- ``db.pool.checked_out`` / ``db.pool.size`` gauges
+- ``db.pool.checkout_wait`` timing (time spent waiting for a free connection)
+- ``db.pool.overflow_opened`` / ``db.pool.timeouts`` / ``db.pool.pings_failed``
+  counters
+
+A pool that keeps opening overflow connections or timing out is too small
+for the load. The read replica's pool reports the same metrics under
+``db.replica_pool``.
+"""
+import time
+from typing import Any
+
+from sqlalchemy import event, exc
+from sqlalchemy.engine import Engine
+from sqlalchemy.pool import QueuePool
+
+from src.config import config
+from src.metrics import metrics
+
+
+class MeteredQueuePool(QueuePool):
+    """QueuePool that records checkout waits, overflow and timeouts."""
+
+    metrics_prefix = "db.pool"
+
+    def _do_get(self):
+        started = time.perf_counter()
+        overflow_before = self._overflow
+        try:
+            record = super()._do_get()
+        except exc.TimeoutError:
+            metrics.incr(f"{self.metrics_prefix}.timeouts")
+            raise
+        finally:
+            metrics.observe(
+                f"{self.metrics_prefix}.checkout_wait", time.perf_counter() - started
+            )
+        if self._overflow > max(overflow_before, 0):
+            metrics.incr(f"{self.metrics_prefix}.overflow_opened")
+        return record
+
+
+def engine_options(url: str) -> dict[str, Any]:
+    """Keyword arguments for create_engine built from the pool settings."""
+    options: dict[str, Any] = {
+        "pool_pre_ping": config.DB_POOL_PRE_PING == "always",
+    }
+    if url.startswith("sqlite") and (":memory:" in url or url.rstrip("/") == "sqlite:"):
+        # In-memory SQLite lives in a single connection; no pool to size
+        return options
+    options.update(
+        poolclass=MeteredQueuePool,
+        pool_size=config.DB_POOL_SIZE,
+        max_overflow=config.DB_MAX_OVERFLOW,
+        pool_timeout=config.DB_POOL_TIMEOUT,
+        pool_recycle=config.DB_POOL_RECYCLE,
+    )
+    return options
+
+
+def instrument_pool(engine: Engine, prefix: str = "db.pool") -> None:
+    """Track checked-out connections and ping idle ones if configured.
+
+    Metrics are recorded under ``prefix``, so a replica pool can be told
+    apart from the primary.
+    """
+    if not isinstance(engine.pool, QueuePool):
+        return
+    if isinstance(engine.pool, MeteredQueuePool):
+        engine.pool.metrics_prefix = prefix
+    metrics.set_gauge(f"{prefix}.size", engine.pool.size())
+
+    @event.listens_for(engine, "checkout")
+    def _on_checkout(dbapi_connection, connection_record, connection_proxy) -> None:
+        metrics.set_gauge(f"{prefix}.checked_out", engine.pool.checkedout())
+        if config.DB_POOL_PRE_PING != "idle":
+            return
+        # Ping only connections that sat idle long enough to have been dropped
+        checked_in = connection_record.info.get("checked_in_at")
+        if checked_in is None or time.monotonic() - checked_in < config.DB_POOL_PING_IDLE_SECONDS:
+            return
+        try:
+            cursor = dbapi_connection.cursor()
+            cursor.execute("SELECT 1")
+            cursor.close()
+        except Exception:
+            metrics.incr(f"{prefix}.pings_failed")
+            # The pool discards this connection and checks out another
+            raise exc.DisconnectionError()
+
+    @event.listens_for(engine, "checkin")
+    def _on_checkin(dbapi_connection, connection_record) -> None:
+        connection_record.info["checked_in_at"] = time.monotonic()
+        # Fires before the connection is handed back, so it still counts
+        metrics.set_gauge(f"{prefix}.checked_out", engine.pool.checkedout() - 1)
@@ -0,0 +1,193 @@
+"""Per-scope SQL statement counting for Telegram 365 Bot.
+
+A scope is one unit of work: a web panel request, a bot update or a
+scheduler tick. While a scope is active every statement the engine runs is
+counted against it, together with the time spent in the database, and when
+the scope ends it reports into the metrics registry:
+
+- ``db.scope.<kind>`` timing (database time per scope)
+- ``db.scope.<kind>.statements`` counter
+- ``db.scope.<kind>.flagged`` counter (scopes that crossed a threshold)
+
+A scope that runs more than ``QUERY_SCOPE_MAX_STATEMENTS`` statements,
+spends more than ``QUERY_SCOPE_MAX_DB_MS`` in the database, or runs the same
+SELECT ``QUERY_SCOPE_REPEAT_THRESHOLD`` times or more (the usual sign of an
+N+1 loop) is logged as a warning.
+
+The active scope lives in a context variable, so concurrent updates and
+request threads never mix their counts, and writes queued on the writer
+thread are counted against the scope that queued them. Tests use
+``assert_max_queries`` to pin the number of statements a code path may run.
+"""
+import functools
+import logging
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, Callable, Iterator, Optional
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+from src.config import config
+from src.database.slow_queries import slow_queries
+from src.metrics import metrics
+
+logger = logging.getLogger(__name__)
+
+_current: ContextVar[Optional["QueryScope"]] = ContextVar("query_scope", default=None)
+
+
+class QueryScope:
+    """Statements and database time of one unit of work.
+
+    Used as a context manager, or with ``start()`` and ``finish()`` where
+    entering and leaving happen in different callbacks (Flask hooks).
+    Scopes nest: a statement counts against every active enclosing scope.
+
+    Args:
+        kind: Scope family used in metric names ("web", "bot", "scheduler").
+        name: What ran, e.g. the route, handler or job name.
+        capture: Keep the SQL of every statement in ``captured``.
+    """
+
+    def __init__(self, kind: str, name: str, capture: bool = False) -> None:
+        self.kind = kind
+        self.name = name
+        self.statements = 0
+        self.seconds = 0.0
+        # SELECT text -> times run, to spot the same query issued in a loop
+        self.selects: dict[str, int] = {}
+        self.captured: Optional[list[str]] = [] if capture else None
+        self.problems: list[str] = []
+        self.parent: Optional[QueryScope] = None
+        self.active = False
+        self._token = None
+
+    def record(self, statement: str, seconds: float) -> None:
+        """Count a statement against this scope and its enclosing scopes."""
+        scope = self
+        while scope is not None and scope.active:
+            scope.statements += 1
+            scope.seconds += seconds
+            if statement.lstrip()[:6].upper() == "SELECT":
+                scope.selects[statement] = scope.selects.get(statement, 0) + 1
+            if scope.captured is not None:
+                scope.captured.append(statement)
+            scope = scope.parent
+
+    def start(self) -> "QueryScope":
+        """Make this the active scope for the current context."""
+        self.parent = _current.get()
+        self._token = _current.set(self)
+        self.active = True
+        return self
+
+    def finish(self) -> None:
+        """Deactivate the scope, record metrics and log threshold breaches."""
+        if not self.active:
+            return
+        self.active = False
+        _current.reset(self._token)
+        self._token = None
+
+        self.problems = self._check_thresholds()
+        metrics.observe(f"db.scope.{self.kind}", self.seconds)
+        metrics.incr(f"db.scope.{self.kind}.statements", self.statements)
+        if self.problems:
+            metrics.incr(f"db.scope.{self.kind}.flagged")
+            logger.warning(
+                f"{self.kind} {self.name}: {self.statements} statements, "
+                f"{self.seconds * 1000:.1f}ms in the database; "
+                + "; ".join(self.problems)
+            )
+
+    def _check_thresholds(self) -> list[str]:
+        problems = []
+        if 0 < config.QUERY_SCOPE_MAX_STATEMENTS < self.statements:
+            problems.append(f"more than {config.QUERY_SCOPE_MAX_STATEMENTS} statements")
+        if 0 < config.QUERY_SCOPE_MAX_DB_MS < self.seconds * 1000:
+            problems.append(f"more than {config.QUERY_SCOPE_MAX_DB_MS:g}ms in the database")
+        if config.QUERY_SCOPE_REPEAT_THRESHOLD > 0:
+            for statement, count in self.selects.items():
+                if count >= config.QUERY_SCOPE_REPEAT_THRESHOLD:
+                    sql = " ".join(statement.split())[:200]
+                    problems.append(f"possible N+1, ran {count} times: {sql}")
+        return problems
+
+    def __enter__(self) -> "QueryScope":
+        return self.start()
+
+    def __exit__(self, *exc_info) -> None:
+        self.finish()
+
+
+def current_scope() -> Optional[QueryScope]:
+    """The scope statements are currently counted against, if any."""
+    return _current.get()
+
+
+def query_scoped(kind: str, name: Optional[str] = None) -> Callable:
+    """Decorate a coroutine function to run each call in its own scope."""
+
+    def decorator(fn: Callable) -> Callable:
+        @functools.wraps(fn)
+        async def wrapper(*args, **kwargs) -> Any:
+            with QueryScope(kind, name or fn.__name__):
+                return await fn(*args, **kwargs)
+
+        return wrapper
+
+    return decorator
+
+
+def instrument_queries(engine: Engine) -> None:
+    """Count the engine's statements against the active scope.
+
+    Transaction control issued as SQL (SQLite's explicit BEGIN) is not
+    counted, so statement counts are the same on SQLite and PostgreSQL.
+    Statements slower than ``SLOW_QUERY_MS`` also go to the slow-query log.
+    """
+
+    @event.listens_for(engine, "before_cursor_execute")
+    def _before_execute(conn, cursor, statement, parameters, context, executemany) -> None:
+        conn.info["query_started"] = time.perf_counter()
+
+    @event.listens_for(engine, "after_cursor_execute")
+    def _after_execute(conn, cursor, statement, parameters, context, executemany) -> None:
+        if statement.startswith("BEGIN"):
+            return
+        elapsed = time.perf_counter() - conn.info["query_started"]
+        scope = _current.get()
+        if scope is not None:
+            scope.record(statement, elapsed)
+        if 0 < config.SLOW_QUERY_MS <= elapsed * 1000:
+            caller = (
+                f"{scope.kind} {scope.name}" if scope is not None
+                else threading.current_thread().name
+            )
+            slow_queries.record(conn, statement, parameters, executemany, elapsed, caller)
+
+
+@contextmanager
+def assert_max_queries(limit: int) -> Iterator[QueryScope]:
+    """Fail if the block runs more than ``limit`` statements.
+
+    Intended for tests that guard hot paths against query regressions::
+
+        with assert_max_queries(2):
+            queries.get_delivery_rows(db)
+            queries.get_message_schedule(db)
+
+    Raises:
+        AssertionError: Listing every statement the block ran.
+    """
+    scope = QueryScope("test", "assert_max_queries", capture=True)
+    with scope:
+        yield scope
+    if scope.statements > limit:
+        listing = "\n".join(f"  {' '.join(sql.split())}" for sql in scope.captured)
+        raise AssertionError(
+            f"Expected at most {limit} statements, {scope.statements} ran:\n{listing}"
+        )
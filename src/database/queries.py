@@ -1,13 +1,195 @@
 """Database query functions for Telegram 365 Bot."""
-from datetime import date, time as dt_time
-from typing import Optional
+import re
+from datetime import date, datetime, timedelta, time as dt_time
+from typing import Callable, Iterator, Optional
 
+import pytz
+from sqlalchemy import Row, bindparam, case, delete, func, insert, select, text, update
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
 from sqlalchemy.orm import Session
 
-from src.database.models import User, Message, Setting, Admin
+from src.database.models import (
+    User,
+    ArchivedUser,
+    Message,
+    Setting,
+    Admin,
+    StatCounter,
+    Broadcast,
+)
 from src.config import config
 
 
+# Callbacks run after day messages or the welcome message change, so caches
+# can drop stale content
+_content_listeners: list[Callable[[], None]] = []
+
+
+def on_content_change(callback: Callable[[], None]) -> None:
+    """Register a callback to run after day messages or the welcome message change."""
+    _content_listeners.append(callback)
+
+
+def _notify_content_change() -> None:
+    for callback in _content_listeners:
+        callback()
+
+
+def _finish_write(db: Session, commit: bool) -> None:
+    """Commit, or just flush when the caller commits.
+
+    No refresh afterwards: sessions keep loaded attributes across commits
+    (expire_on_commit=False) and INSERTs fetch generated keys with RETURNING.
+    """
+    if commit:
+        db.commit()
+    else:
+        db.flush()
+
+
+def _upsert(db: Session, model):
+    """INSERT supporting ON CONFLICT for the session's backend."""
+    if db.get_bind().dialect.name == "postgresql":
+        return pg_insert(model)
+    return sqlite_insert(model)
+
+
+# Statistics counters
+USERS_TOTAL = "users_total"
+USERS_ACTIVE = "users_active"
+ACTIVE_DAY_PREFIX = "active_day:"
+DELIVERED_PREFIX = "delivered:"
+
+
+def active_day_counter(day: int) -> str:
+    """Counter name for active users currently at a day."""
+    return f"{ACTIVE_DAY_PREFIX}{day}"
+
+
+def delivered_counter(day: date) -> str:
+    """Counter name for messages delivered on a UTC date."""
+    return f"{DELIVERED_PREFIX}{day.isoformat()}"
+
+
+def bump_counters(db: Session, deltas: dict[str, int]) -> None:
+    """Apply counter deltas inside the caller's transaction.
+
+    All counters are updated (or created) by a single upsert, in name order
+    so concurrent writers lock rows in the same order.
+    """
+    rows = [
+        {"name": name, "value": delta}
+        for name, delta in sorted(deltas.items())
+        if delta
+    ]
+    if not rows:
+        return
+    stmt = _upsert(db, StatCounter).values(rows)
+    db.execute(
+        stmt.on_conflict_do_update(
+            index_elements=[StatCounter.name],
+            set_={
+                "value": StatCounter.value + stmt.excluded.value,
+                "updated_at": datetime.utcnow(),
+            },
+        )
+    )
+
+
+def get_stats(db: Session) -> dict:
+    """Read user and delivery statistics from the maintained counters.
+
+    Returns:
+        Dict with "total_users", "active_users", "delivered_today" and
+        "active_by_day" (day number -> active users at that day).
+    """
+    today = delivered_counter(datetime.utcnow().date())
+    rows = (
+        db.query(StatCounter.name, StatCounter.value)
+        .filter(~StatCounter.name.startswith(DELIVERED_PREFIX) | (StatCounter.name == today))
+        .all()
+    )
+    counters = dict(rows)
+    active_by_day = {}
+    for name, value in counters.items():
+        if name.startswith(ACTIVE_DAY_PREFIX) and value:
+            active_by_day[int(name[len(ACTIVE_DAY_PREFIX):])] = value
+    return {
+        "total_users": counters.get(USERS_TOTAL, 0),
+        "active_users": counters.get(USERS_ACTIVE, 0),
+        "delivered_today": counters.get(today, 0),
+        "active_by_day": dict(sorted(active_by_day.items())),
+    }
+
+
+def group_active_by_period(
+    active_by_day: dict[int, int], period: int = 30
+) -> list[tuple[int, int, int]]:
+    """Group per-day active user counts into (first day, last day, users) periods."""
+    buckets: dict[int, int] = {}
+    for day, count in active_by_day.items():
+        start = (day - 1) // period * period + 1
+        buckets[start] = buckets.get(start, 0) + count
+    return [
+        (start, min(start + period - 1, config.TOTAL_DAYS), count)
+        for start, count in sorted(buckets.items())
+    ]
+
+
+def reconcile_stats(db: Session, retention_days: int = 30) -> int:
+    """Recompute user counters from the users table and fix any drift.
+
+    Delivery counters cannot be rebuilt from users, so they are kept as
+    counted and only trimmed to retention_days.
+
+    Returns:
+        Number of counters that had drifted and were corrected.
+    """
+    # Lock the counters before counting: on PostgreSQL, increments from
+    # concurrent writes wait and apply on top of the corrected values
+    existing = {
+        counter.name: counter
+        for counter in db.query(StatCounter)
+        .filter(~StatCounter.name.startswith(DELIVERED_PREFIX))
+        .with_for_update()
+        .all()
+    }
+
+    # Archived users still count towards the total, just not as active
+    expected = {
+        USERS_TOTAL: (db.query(func.count(User.id)).scalar() or 0)
+        + (db.query(func.count(ArchivedUser.id)).scalar() or 0)
+    }
+    active_rows = (
+        db.query(User.current_day, func.count(User.id))
+        .filter(User.is_active == True)
+        .group_by(User.current_day)
+        .all()
+    )
+    active_by_day = dict(active_rows)
+    expected[USERS_ACTIVE] = sum(active_by_day.values())
+    for day in range(1, config.TOTAL_DAYS + 1):
+        expected[active_day_counter(day)] = active_by_day.get(day, 0)
+
+    corrected = 0
+    for name, value in expected.items():
+        counter = existing.get(name)
+        if counter is None:
+            db.add(StatCounter(name=name, value=value))
+            corrected += value != 0
+        elif counter.value != value:
+            counter.value = value
+            corrected += 1
+
+    cutoff = delivered_counter(datetime.utcnow().date() - timedelta(days=retention_days))
+    db.query(StatCounter).filter(
+        StatCounter.name.startswith(DELIVERED_PREFIX), StatCounter.name < cutoff
+    ).delete(synchronize_session=False)
+    db.commit()
+    return corrected
+
+
 # User queries
 def get_user_by_telegram_id(db: Session, telegram_id: int) -> Optional[User]:
     """Get user by Telegram ID."""
@@ -19,8 +201,13 @@ def create_user(
     telegram_id: int,
     username: Optional[str] = None,
     timezone: str = "UTC",
+    commit: bool = True,
 ) -> User:
-    """Create a new user."""
+    """Create a new user.
+
+    With commit=False the row is only flushed, so the caller (e.g. the
+    group-commit writer) can commit several writes together.
+    """
     user = User(
         telegram_id=telegram_id,
         username=username,
@@ -29,47 +216,527 @@ def create_user(
         is_active=True,
     )
     db.add(user)
-    db.commit()
-    db.refresh(user)
+    bump_counters(db, {USERS_TOTAL: 1, USERS_ACTIVE: 1, active_day_counter(1): 1})
+    _finish_write(db, commit)
     return user
 
 
-def update_user_day(db: Session, user: User, user_date: date = None) -> User:
-    """Increment user's current day, cycling back to 1 after 365."""
-    user.last_message_date = user_date or date.today()
-    if user.current_day >= config.TOTAL_DAYS:
-        user.current_day = 1
-    else:
-        user.current_day += 1
-    db.commit()
-    db.refresh(user)
+def update_user_day(
+    db: Session, user_id: int, user_date: date = None, commit: bool = True
+) -> Optional[User]:
+    """Increment user's current day, cycling back to 1 after 365.
+
+    One UPDATE ... RETURNING and the counter upsert, without loading the
+    user first.
+    """
+    user = db.scalars(
+        update(User)
+        .where(User.id == user_id)
+        .values(
+            current_day=case(
+                (User.current_day >= config.TOTAL_DAYS, 1), else_=User.current_day + 1
+            ),
+            last_message_date=user_date or date.today(),
+        )
+        .returning(User),
+        execution_options={"populate_existing": True},
+    ).first()
+    if user is None:
+        return None
+    old_day = config.TOTAL_DAYS if user.current_day == 1 else user.current_day - 1
+    deltas = {delivered_counter(datetime.utcnow().date()): 1}
+    if user.is_active:
+        deltas[active_day_counter(old_day)] = -1
+        deltas[active_day_counter(user.current_day)] = 1
+    bump_counters(db, deltas)
+    _finish_write(db, commit)
+    return user
+
+
+def set_user_timezone(
+    db: Session, user: User, timezone: str, commit: bool = True
+) -> User:
+    """Change a user's timezone, keeping today's delivery from repeating.
+
+    last_message_date is a date in the user's own timezone. If today's
+    message was already delivered, it is moved to "today" in the new zone,
+    so moving east across midnight does not deliver the next day early.
+    """
+    old_tz = pytz.timezone(user.timezone or "UTC")
+    new_tz = pytz.timezone(timezone)
+    if user.last_message_date == datetime.now(old_tz).date():
+        user.last_message_date = datetime.now(new_tz).date()
+    user.timezone = timezone
+    _finish_write(db, commit)
     return user
 
 
-def set_user_active(db: Session, user: User, is_active: bool) -> User:
+def set_user_active(
+    db: Session, user: User, is_active: bool, commit: bool = True
+) -> User:
     """Set user active status."""
+    if bool(user.is_active) != is_active:
+        delta = 1 if is_active else -1
+        bump_counters(
+            db, {USERS_ACTIVE: delta, active_day_counter(user.current_day): delta}
+        )
     user.is_active = is_active
+    _finish_write(db, commit)
+    return user
+
+
+def register_users_bulk(
+    db: Session, users: dict[int, Optional[str]], chunk_size: int = 500
+) -> tuple[list[int], list[int]]:
+    """Register, restore or reactivate many users in one transaction.
+
+    Archived users are moved back into users and reported as reactivated.
+
+    Args:
+        users: Mapping of telegram_id to username.
+
+    Returns:
+        Tuple of (created telegram ids, reactivated telegram ids).
+    """
+    created: list[int] = []
+    reactivated: list[int] = []
+    telegram_ids = list(users)
+    for start in range(0, len(telegram_ids), chunk_size):
+        chunk = telegram_ids[start:start + chunk_size]
+        reactivated.extend(
+            restore_archived_users(db, {tid: users[tid] for tid in chunk})
+        )
+        existing = dict(
+            db.query(User.telegram_id, User.is_active)
+            .filter(User.telegram_id.in_(chunk))
+            .all()
+        )
+        new_ids = [tid for tid in chunk if tid not in existing]
+        inactive_ids = [tid for tid, active in existing.items() if not active]
+        if new_ids:
+            db.execute(
+                insert(User),
+                [
+                    {
+                        "telegram_id": tid,
+                        "username": users[tid],
+                        "timezone": "UTC",
+                        "current_day": 1,
+                        "is_active": True,
+                    }
+                    for tid in new_ids
+                ],
+            )
+            created.extend(new_ids)
+            bump_counters(
+                db,
+                {
+                    USERS_TOTAL: len(new_ids),
+                    USERS_ACTIVE: len(new_ids),
+                    active_day_counter(1): len(new_ids),
+                },
+            )
+        if inactive_ids:
+            by_day = (
+                db.query(User.current_day, func.count(User.id))
+                .filter(User.telegram_id.in_(inactive_ids))
+                .group_by(User.current_day)
+                .all()
+            )
+            deltas = {active_day_counter(day): count for day, count in by_day}
+            deltas[USERS_ACTIVE] = len(inactive_ids)
+            bump_counters(db, deltas)
+            db.execute(
+                update(User)
+                .where(User.telegram_id.in_(inactive_ids))
+                .values(is_active=True)
+            )
+            reactivated.extend(inactive_ids)
+    db.commit()
+    return created, reactivated
+
+
+# Columns copied between users and archived_users
+_ARCHIVED_COLUMNS = (
+    "telegram_id",
+    "username",
+    "timezone",
+    "current_day",
+    "started_at",
+    "last_message_date",
+    "created_at",
+)
+
+
+def archive_inactive_users(db: Session, inactive_before: datetime, limit: int) -> int:
+    """Move up to limit users inactive since before inactive_before to archived_users.
+
+    The rows are deleted from users with RETURNING and inserted into the
+    archive in the same transaction, so each user is in exactly one of the
+    two tables. Inactive users are not in the active counters and the total
+    counts both tables, so no counter changes.
+
+    Returns:
+        Number of users archived.
+    """
+    stale = (
+        select(User.id)
+        .where(User.is_active == False, User.updated_at < inactive_before)
+        .order_by(User.id)
+        .limit(limit)
+    )
+    rows = db.execute(
+        delete(User)
+        .where(User.id.in_(stale), User.is_active == False)
+        .returning(
+            *(getattr(User, name) for name in _ARCHIVED_COLUMNS),
+            User.updated_at.label("deactivated_at"),
+        )
+        .execution_options(synchronize_session=False)
+    ).all()
+    if rows:
+        archived_at = datetime.utcnow()
+        db.execute(
+            insert(ArchivedUser),
+            [dict(row._mapping, archived_at=archived_at) for row in rows],
+        )
     db.commit()
-    db.refresh(user)
+    return len(rows)
+
+
+def restore_archived_users(
+    db: Session, users: dict[int, Optional[str]]
+) -> list[int]:
+    """Move archived users back into users as active, keeping their current_day.
+
+    Does not commit, so callers can restore inside a larger write.
+
+    Args:
+        users: Mapping of telegram_id to username; a None username keeps
+            the archived one.
+
+    Returns:
+        Telegram ids of the restored users.
+    """
+    if not users:
+        return []
+    rows = db.execute(
+        delete(ArchivedUser)
+        .where(ArchivedUser.telegram_id.in_(list(users)))
+        .returning(*(getattr(ArchivedUser, name) for name in _ARCHIVED_COLUMNS))
+        .execution_options(synchronize_session=False)
+    ).all()
+    if not rows:
+        return []
+    db.execute(
+        insert(User),
+        [
+            dict(
+                row._mapping,
+                username=users[row.telegram_id] or row.username,
+                is_active=True,
+            )
+            for row in rows
+        ],
+    )
+    deltas = {USERS_ACTIVE: len(rows)}
+    for row in rows:
+        name = active_day_counter(row.current_day)
+        deltas[name] = deltas.get(name, 0) + 1
+    bump_counters(db, deltas)
+    return [row.telegram_id for row in rows]
+
+
+def restore_archived_user(
+    db: Session, telegram_id: int, username: Optional[str] = None, commit: bool = True
+) -> Optional[User]:
+    """Restore one archived user, e.g. on /start.
+
+    Returns:
+        The restored user, or None if they were not archived.
+    """
+    if not restore_archived_users(db, {telegram_id: username}):
+        return None
+    user = get_user_by_telegram_id(db, telegram_id)
+    _finish_write(db, commit)
     return user
 
 
+def import_users_bulk(
+    db: Session, rows: list[dict], update_existing: bool = False
+) -> tuple[int, int, int]:
+    """Upsert a batch of imported users in one transaction.
+
+    Rows have telegram_id, username, timezone and current_day; None means
+    "not given". New users get the defaults for missing values. Existing
+    users are left alone unless update_existing, in which case the given
+    values overwrite theirs. Archived users are always left alone. New
+    users are inserted in a single executemany with ON CONFLICT DO NOTHING
+    RETURNING, so users registering at the same moment are neither
+    duplicated nor counted twice.
+
+    Returns:
+        Tuple of (inserted, updated, skipped) row counts.
+    """
+    if not rows:
+        return 0, 0, 0
+    ids = [row["telegram_id"] for row in rows]
+    existing = {
+        telegram_id: (day, active)
+        for telegram_id, day, active in db.execute(
+            select(User.telegram_id, User.current_day, User.is_active).where(
+                User.telegram_id.in_(ids)
+            )
+        )
+    }
+    archived = set(
+        db.scalars(select(ArchivedUser.telegram_id).where(ArchivedUser.telegram_id.in_(ids)))
+    )
+
+    new_rows = []
+    update_rows = []
+    deltas: dict[str, int] = {}
+
+    def count(name: str, delta: int) -> None:
+        deltas[name] = deltas.get(name, 0) + delta
+
+    for row in rows:
+        telegram_id = row["telegram_id"]
+        if telegram_id in archived:
+            continue
+        if telegram_id not in existing:
+            new_rows.append(
+                {
+                    "telegram_id": telegram_id,
+                    "username": row["username"],
+                    "timezone": row["timezone"] or "UTC",
+                    "current_day": row["current_day"] or 1,
+                    "is_active": True,
+                }
+            )
+        elif update_existing:
+            update_rows.append(dict(row, is_active=True))
+            old_day, active = existing[telegram_id]
+            new_day = row["current_day"]
+            if active and new_day and new_day != old_day:
+                count(active_day_counter(old_day), -1)
+                count(active_day_counter(new_day), 1)
+
+    # Core table inserts: plain executemany, without ORM bulk bookkeeping
+    inserted = 0
+    if new_rows:
+        # Users who registered since the read above are skipped by the
+        # conflict clause; only rows actually inserted count as registrations
+        stmt = _upsert(db, User.__table__).on_conflict_do_nothing(
+            index_elements=["telegram_id"]
+        )
+        for (day,) in db.execute(stmt.returning(User.__table__.c.current_day), new_rows):
+            inserted += 1
+            for name in (USERS_TOTAL, USERS_ACTIVE, active_day_counter(day)):
+                count(name, 1)
+    if update_rows:
+        # Values not given in the file keep what the user already has
+        stmt = _upsert(db, User.__table__)
+        stmt = stmt.on_conflict_do_update(
+            index_elements=["telegram_id"],
+            set_={
+                name: func.coalesce(stmt.excluded[name], User.__table__.c[name])
+                for name in ("username", "timezone", "current_day")
+            }
+            | {"updated_at": datetime.utcnow()},
+        )
+        db.execute(stmt, update_rows)
+    bump_counters(db, deltas)
+    db.commit()
+    updated = len(update_rows)
+    return inserted, updated, len(rows) - inserted - updated
+
+
 def get_users_for_delivery(db: Session) -> list[User]:
     """Get all active users for message delivery check."""
     return db.query(User).filter(User.is_active == True).all()
 
 
+def get_delivery_rows(db: Session) -> list[Row]:
+    """Get the columns the delivery check needs for every active user.
+
+    Plain Core rows instead of User objects: no identity map, no attribute
+    instrumentation, a fraction of the memory per user.
+
+    Returns:
+        Rows with id, telegram_id, timezone, current_day and
+        last_message_date attributes.
+    """
+    return db.execute(
+        select(
+            User.id,
+            User.telegram_id,
+            User.timezone,
+            User.current_day,
+            User.last_message_date,
+        ).where(User.is_active == True)
+    ).all()
+
+
+def deactivate_users_bulk(db: Session, telegram_ids: list[int]) -> int:
+    """Mark many users inactive (e.g. blocked during a broadcast) in one transaction.
+
+    Returns:
+        Number of users that were active and are now inactive.
+    """
+    if not telegram_ids:
+        return 0
+    by_day = (
+        db.query(User.current_day, func.count(User.id))
+        .filter(User.telegram_id.in_(telegram_ids), User.is_active == True)
+        .group_by(User.current_day)
+        .all()
+    )
+    deltas = {active_day_counter(day): -count for day, count in by_day}
+    deactivated = sum(count for _, count in by_day)
+    deltas[USERS_ACTIVE] = -deactivated
+    bump_counters(db, deltas)
+    db.execute(
+        update(User)
+        .where(User.telegram_id.in_(telegram_ids), User.is_active == True)
+        .values(is_active=False)
+        .execution_options(synchronize_session=False)
+    )
+    db.commit()
+    return deactivated
+
+
+def get_active_user_batch(
+    db: Session, after_id: int, limit: int
+) -> list[tuple[int, int]]:
+    """Get the next batch of active users after a users.id, in id order.
+
+    Keyset pagination: each batch is an index range scan no matter how far
+    into the table it is.
+
+    Returns:
+        List of (users.id, telegram_id) tuples.
+    """
+    return db.execute(
+        select(User.id, User.telegram_id)
+        .where(User.is_active == True, User.id > after_id)
+        .order_by(User.id)
+        .limit(limit)
+    ).all()
+
+
+def iter_user_rows(
+    db: Session,
+    active: Optional[bool] = None,
+    day: Optional[int] = None,
+    batch_size: int = 1000,
+) -> Iterator[Row]:
+    """Stream users for export in id order, batch_size rows at a time.
+
+    Uses a server-side cursor where the driver has one, so only one batch
+    is held in memory however large the table is.
+
+    Args:
+        active: Only active (True) or inactive (False) users.
+        day: Only users currently at this day.
+    """
+    stmt = select(
+        User.id,
+        User.telegram_id,
+        User.username,
+        User.timezone,
+        User.current_day,
+        User.is_active,
+        User.started_at,
+        User.last_message_date,
+        User.created_at,
+    ).order_by(User.id)
+    if active is not None:
+        stmt = stmt.where(User.is_active == active)
+    if day is not None:
+        stmt = stmt.where(User.current_day == day)
+    return db.execute(stmt.execution_options(yield_per=batch_size))
+
+
 # Message queries
 def get_message_by_day(db: Session, day_number: int) -> Optional[Message]:
     """Get message for a specific day."""
     return db.query(Message).filter(Message.day_number == day_number).first()
 
 
+def get_message_schedule(db: Session) -> dict[int, Row]:
+    """Get every day's content and send time, keyed by day number.
+
+    Loaded once per scheduler tick instead of one query per user.
+
+    Returns:
+        Mapping of day number to a row with content and send_time.
+    """
+    rows = db.execute(select(Message.day_number, Message.content, Message.send_time))
+    return {row.day_number: row for row in rows}
+
+
+def iter_message_rows(db: Session, batch_size: int = 1000) -> Iterator[Row]:
+    """Stream day messages for export as (day, content, send_time) rows."""
+    return db.execute(
+        select(
+            Message.day_number.label("day"), Message.content, Message.send_time
+        )
+        .order_by(Message.day_number)
+        .execution_options(yield_per=batch_size)
+    )
+
+
 def get_all_messages(db: Session) -> list[Message]:
     """Get all messages ordered by day number."""
     return db.query(Message).order_by(Message.day_number).all()
 
 
+# Characters of content included in a message summary
+MESSAGE_PREVIEW_LENGTH = 50
+
+
+def get_message_summaries(
+    db: Session,
+    offset: int = 0,
+    limit: int = 50,
+    filled: Optional[bool] = None,
+) -> tuple[list[Row], int]:
+    """Get a page of day summaries for listings, without full message content.
+
+    The preview and length are computed in SQL, so only a short prefix of
+    each message leaves the database.
+
+    Args:
+        filled: True for days with content, False for empty days, None for all.
+
+    Returns:
+        Rows of (day_number, send_time, preview, length, updated_at) ordered
+        by day, and the number of days matching the filter.
+    """
+    content = func.coalesce(Message.content, "")
+    condition = None
+    if filled is not None:
+        condition = content != "" if filled else content == ""
+    stmt = (
+        select(
+            Message.day_number,
+            Message.send_time,
+            func.substr(content, 1, MESSAGE_PREVIEW_LENGTH).label("preview"),
+            func.length(content).label("length"),
+            Message.updated_at,
+        )
+        .order_by(Message.day_number)
+        .offset(offset)
+        .limit(limit)
+    )
+    count = select(func.count()).select_from(Message)
+    if condition is not None:
+        stmt = stmt.where(condition)
+        count = count.where(condition)
+    return db.execute(stmt).all(), db.scalar(count)
+
+
 def update_message(
     db: Session,
     day_number: int,
@@ -77,16 +744,146 @@ def update_message(
     send_time: Optional[dt_time] = None,
 ) -> Optional[Message]:
     """Update message content and optionally send time."""
-    message = get_message_by_day(db, day_number)
+    values = {"content": content}
+    if send_time:
+        values["send_time"] = send_time
+    message = db.scalars(
+        update(Message)
+        .where(Message.day_number == day_number)
+        .values(**values)
+        .returning(Message),
+        execution_options={"populate_existing": True},
+    ).first()
     if message:
-        message.content = content
-        if send_time:
-            message.send_time = send_time
+        _index_message_content(db, [message])
         db.commit()
-        db.refresh(message)
+        _notify_content_change()
     return message
 
 
+def apply_message_import(
+    db: Session, changes: dict[int, tuple[str, Optional[dt_time]]]
+) -> dict:
+    """Apply imported day messages in a single transaction.
+
+    Args:
+        changes: Mapping of day number to (content, send_time or None to
+            keep the current send time).
+
+    Returns:
+        Diff summary with the changed day numbers and counts.
+    """
+    messages = (
+        db.query(Message).filter(Message.day_number.in_(list(changes))).all()
+        if changes
+        else []
+    )
+    changed: list[int] = []
+    content_changed = 0
+    time_changed = 0
+    reindex: list[Message] = []
+    for message in messages:
+        content, send_time = changes[message.day_number]
+        content_differs = message.content != content
+        time_differs = send_time is not None and message.send_time != send_time
+        if content_differs:
+            message.content = content
+            content_changed += 1
+            reindex.append(message)
+        if time_differs:
+            message.send_time = send_time
+            time_changed += 1
+        if content_differs or time_differs:
+            changed.append(message.day_number)
+    _index_message_content(db, reindex)
+    db.commit()
+    if changed:
+        _notify_content_change()
+    return {
+        "changed": changed,
+        "unchanged": len(messages) - len(changed),
+        "content_changed": content_changed,
+        "time_changed": time_changed,
+    }
+
+
+# Snippet highlight markers; the web panel escapes the snippet, then turns
+# these into <mark> tags
+SEARCH_MARK_START = "\x02"
+SEARCH_MARK_STOP = "\x03"
+
+_DELETE_FTS = text("DELETE FROM messages_fts WHERE rowid IN :ids").bindparams(
+    bindparam("ids", expanding=True)
+)
+_INSERT_FTS = text("INSERT INTO messages_fts (rowid, content) VALUES (:id, :content)")
+
+_SEARCH_SQLITE = text(
+    "SELECT messages.day_number, "
+    "snippet(messages_fts, 0, :start, :stop, '…', 16) AS snippet, "
+    "-bm25(messages_fts) AS rank "
+    "FROM messages_fts JOIN messages ON messages.id = messages_fts.rowid "
+    "WHERE messages_fts MATCH :query "
+    "ORDER BY bm25(messages_fts), messages.day_number LIMIT :limit"
+).columns()
+_SEARCH_POSTGRESQL = text(
+    "SELECT day_number, ts_headline('simple', content, query, :options) AS snippet, "
+    "ts_rank(to_tsvector('simple', content), query) AS rank "
+    "FROM messages, to_tsquery('simple', :query) AS query "
+    "WHERE to_tsvector('simple', content) @@ query "
+    "ORDER BY rank DESC, day_number LIMIT :limit"
+).columns()
+
+
+def _index_message_content(db: Session, messages: list[Message]) -> None:
+    """Replace the full-text entries of messages whose content changed.
+
+    Only SQLite needs this; PostgreSQL indexes the content expression itself.
+    """
+    if not messages or db.get_bind().dialect.name != "sqlite":
+        return
+    db.execute(_DELETE_FTS, {"ids": [m.id for m in messages]})
+    rows = [{"id": m.id, "content": m.content} for m in messages if m.content]
+    if rows:
+        db.execute(_INSERT_FTS, rows)
+
+
+def search_messages(db: Session, query: str, limit: int = 20) -> list[Row]:
+    """Find days whose content has every word of query, best match first.
+
+    Words match as prefixes, case-insensitively. Punctuation in query is
+    ignored, so user input can be passed as is.
+
+    Returns:
+        Rows of (day_number, snippet, rank). Matched words in the snippet
+        are wrapped in SEARCH_MARK_START and SEARCH_MARK_STOP.
+    """
+    words = re.findall(r"\w+", query)
+    if not words:
+        return []
+    # Textual SELECTs, so a routing session sends them to the replica
+    if db.get_bind(clause=_SEARCH_SQLITE).dialect.name == "sqlite":
+        return db.execute(
+            _SEARCH_SQLITE,
+            {
+                "query": " ".join(f'"{word}"*' for word in words),
+                "start": SEARCH_MARK_START,
+                "stop": SEARCH_MARK_STOP,
+                "limit": limit,
+            },
+        ).all()
+    return db.execute(
+        _SEARCH_POSTGRESQL,
+        {
+            "query": " & ".join(f"{word}:*" for word in words),
+            "options": (
+                f'StartSel="{SEARCH_MARK_START}", StopSel="{SEARCH_MARK_STOP}", '
+                "MaxFragments=2, MaxWords=20, MinWords=5"
+            ),
+            "limit": limit,
+        },
+    ).all()
+
+
 # Settings queries
 def get_setting(db: Session, key: str) -> Optional[str]:
     """Get setting value by key."""
@@ -94,16 +891,17 @@ def get_setting(db: Session, key: str) -> Optional[str]:
     return setting.value if setting else None
 
 
-def set_setting(db: Session, key: str, value: str) -> Setting:
-    """Set or update a setting value."""
-    setting = db.query(Setting).filter(Setting.key == key).first()
-    if setting:
-        setting.value = value
-    else:
-        setting = Setting(key=key, value=value)
-        db.add(setting)
-    db.commit()
-    db.refresh(setting)
+def set_setting(db: Session, key: str, value: str, commit: bool = True) -> Setting:
+    """Set or update a setting value with one upsert."""
+    stmt = _upsert(db, Setting).values(key=key, value=value)
+    setting = db.scalars(
+        stmt.on_conflict_do_update(
+            index_elements=[Setting.key],
+            set_={"value": stmt.excluded.value, "updated_at": datetime.utcnow()},
+        ).returning(Setting),
+        execution_options={"populate_existing": True},
+    ).one()
+    _finish_write(db, commit)
     return setting
 
 
@@ -112,9 +910,29 @@ def get_welcome_message(db: Session) -> str:
     return get_setting(db, "welcome_message") or "Welcome!"
 
 
-def set_welcome_message(db: Session, message: str) -> Setting:
-    """Set the welcome message."""
-    return set_setting(db, "welcome_message", message)
+def set_welcome_message(db: Session, message: str, commit: bool = True) -> Setting:
+    """Set the welcome message.
+
+    Listeners are notified right away, even when the caller commits later;
+    caches keyed by get_content_version cannot pick the old text up again.
+    """
+    setting = set_setting(db, "welcome_message", message, commit=commit)
+    _notify_content_change()
+    return setting
+
+
+def get_content_version(db: Session) -> Optional[datetime]:
+    """Time of the latest change to day messages or settings, in one query.
+
+    The web panel derives its HTTP cache validators from it.
+    """
+    latest = db.execute(
+        select(
+            select(func.max(Message.updated_at)).scalar_subquery(),
+            select(func.max(Setting.updated_at)).scalar_subquery(),
+        )
+    ).one()
+    return max((value for value in latest if value is not None), default=None)
 
 
 # Admin queries
@@ -124,20 +942,84 @@ def is_admin(db: Session, telegram_id: int) -> bool:
     return admin is not None
 
 
-def add_admin(db: Session, telegram_id: int) -> Admin:
+def add_admin(db: Session, telegram_id: int, commit: bool = True) -> Admin:
     """Add a new admin."""
     admin = Admin(telegram_id=telegram_id)
     db.add(admin)
-    db.commit()
-    db.refresh(admin)
+    _finish_write(db, commit)
     return admin
 
 
 def remove_admin(db: Session, telegram_id: int) -> bool:
     """Remove an admin."""
-    admin = db.query(Admin).filter(Admin.telegram_id == telegram_id).first()
-    if admin:
-        db.delete(admin)
-        db.commit()
-        return True
-    return False
+    result = db.execute(
+        delete(Admin)
+        .where(Admin.telegram_id == telegram_id)
+        .execution_options(synchronize_session=False)
+    )
+    db.commit()
+    return result.rowcount > 0
+
+
+# Broadcast queries
+def create_broadcast(db: Session, text: str) -> Broadcast:
+    """Create a running broadcast to all currently active users."""
+    active = (
+        select(StatCounter.value)
+        .where(StatCounter.name == USERS_ACTIVE)
+        .scalar_subquery()
+    )
+    broadcast = db.scalars(
+        insert(Broadcast)
+        .values(text=text, status="running", total=func.coalesce(active, 0))
+        .returning(Broadcast)
+    ).one()
+    db.commit()
+    return broadcast
+
+
+def get_broadcast(db: Session, broadcast_id: int) -> Optional[Broadcast]:
+    """Get broadcast by ID."""
+    return db.query(Broadcast).filter(Broadcast.id == broadcast_id).first()
+
+
+def get_recent_broadcasts(db: Session, limit: int = 10) -> list[Broadcast]:
+    """Get the most recent broadcasts, newest first."""
+    return db.query(Broadcast).order_by(Broadcast.id.desc()).limit(limit).all()
+
+
+def get_running_broadcasts(db: Session) -> list[Broadcast]:
+    """Get broadcasts that should currently be sending."""
+    return db.query(Broadcast).filter(Broadcast.status == "running").all()
+
+
+def set_broadcast_status(db: Session, broadcast: Broadcast, status: str) -> Broadcast:
+    """Change a broadcast's status (running, paused, done or cancelled)."""
+    broadcast.status = status
+    if status in ("done", "cancelled"):
+        broadcast.finished_at = datetime.utcnow()
+    db.commit()
+    return broadcast
+
+
+def record_broadcast_progress(
+    db: Session,
+    broadcast_id: int,
+    cursor_user_id: int,
+    sent: int,
+    failed: int,
+    seconds: float,
+) -> None:
+    """Advance a broadcast's cursor and add a batch's results."""
+    db.execute(
+        update(Broadcast)
+        .where(Broadcast.id == broadcast_id)
+        .values(
+            cursor_user_id=cursor_user_id,
+            sent=Broadcast.sent + sent,
+            failed=Broadcast.failed + failed,
+            active_seconds=Broadcast.active_seconds + seconds,
+        )
+        .execution_options(synchronize_session=False)
+    )
+    db.commit()
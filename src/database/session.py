@@ -1,47 +1,259 @@
 """Database session management for Telegram 365 Bot."""
+import os
+import time
 from contextlib import contextmanager
-from typing import Generator
+from functools import lru_cache
+from typing import Generator, Optional
 
-from sqlalchemy import create_engine
+from alembic import command
+from alembic.config import Config as AlembicConfig
+from alembic.script import ScriptDirectory
+from sqlalchemy import create_engine, event, insert, inspect, select
+from sqlalchemy.engine import Engine
+from sqlalchemy.exc import DBAPIError
 from sqlalchemy.orm import sessionmaker, Session
 
 from src.config import config
-from src.database.models import Base, Message, Setting
+from src.database.models import Message, Setting, StatCounter
+from src.database.pool import engine_options, instrument_pool
+from src.database.profiling import instrument_queries
+from src.database.queries import reconcile_stats, set_setting
 
 # Create database engine
-engine = create_engine(config.DATABASE_URL, pool_pre_ping=True)
+IS_SQLITE = config.DATABASE_URL.startswith("sqlite")
+engine = create_engine(
+    config.DATABASE_URL,
+    # The bot loop, scheduler, writer and Flask threads share the pool
+    connect_args={"check_same_thread": False} if IS_SQLITE else {},
+    **engine_options(config.DATABASE_URL),
+)
+instrument_pool(engine)
+instrument_queries(engine)
 
 # Create session factory
-SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+# Objects stay loaded after commit, so writes never need a refresh round trip
+SessionLocal = sessionmaker(
+    autocommit=False, autoflush=False, expire_on_commit=False, bind=engine
+)
+
+# Sessions for the writer thread; on SQLite they take the write lock up front
+WriterSessionLocal = sessionmaker(
+    autocommit=False,
+    autoflush=False,
+    expire_on_commit=False,
+    bind=engine.execution_options(sqlite_begin="BEGIN IMMEDIATE"),
+)
+
+
+if IS_SQLITE:
+
+    @event.listens_for(engine, "connect")
+    def _sqlite_connect(dbapi_connection, connection_record) -> None:
+        """Apply the SQLite production profile to each new connection."""
+        # Let the "begin" hook below emit BEGIN instead of the driver
+        dbapi_connection.isolation_level = None
+        cursor = dbapi_connection.cursor()
+        cursor.execute(f"PRAGMA journal_mode={config.SQLITE_JOURNAL_MODE}")
+        cursor.execute(f"PRAGMA synchronous={config.SQLITE_SYNCHRONOUS}")
+        cursor.execute(f"PRAGMA busy_timeout={int(config.SQLITE_BUSY_TIMEOUT_MS)}")
+        cursor.execute(f"PRAGMA mmap_size={int(config.SQLITE_MMAP_SIZE)}")
+        cursor.close()
+
+    @event.listens_for(engine, "begin")
+    def _sqlite_begin(connection) -> None:
+        """Start transactions explicitly.
+
+        Readers use a deferred BEGIN; the writer uses BEGIN IMMEDIATE so it
+        waits on busy_timeout for the lock instead of failing when a read
+        transaction would have to be upgraded.
+        """
+        connection.exec_driver_sql(
+            connection.get_execution_options().get("sqlite_begin", "BEGIN")
+        )
+
+
+# Optional read replica for the web panel and reporting queries
+replica_engine: Optional[Engine] = None
+if config.DATABASE_REPLICA_URL:
+    _replica_is_sqlite = config.DATABASE_REPLICA_URL.startswith("sqlite")
+    replica_engine = create_engine(
+        config.DATABASE_REPLICA_URL,
+        connect_args={"check_same_thread": False} if _replica_is_sqlite else {},
+        **engine_options(config.DATABASE_REPLICA_URL),
+    )
+    instrument_pool(replica_engine, prefix="db.replica_pool")
+    instrument_queries(replica_engine)
+
+    if _replica_is_sqlite:
+
+        @event.listens_for(replica_engine, "connect")
+        def _sqlite_replica_connect(dbapi_connection, connection_record) -> None:
+            """Make SQLite replica connections read-only."""
+            cursor = dbapi_connection.cursor()
+            cursor.execute("PRAGMA query_only=1")
+            cursor.execute(f"PRAGMA busy_timeout={int(config.SQLITE_BUSY_TIMEOUT_MS)}")
+            cursor.execute(f"PRAGMA mmap_size={int(config.SQLITE_MMAP_SIZE)}")
+            cursor.close()
+
+
+class RoutingSession(Session):
+    """Session that sends SELECTs to the read replica.
+
+    Flushes and other statements go to the primary and pin the session to it,
+    so a session reads its own writes. Everything goes to the primary when
+    there is no replica or the session starts pinned with
+    ``info["primary"] = True`` (read-your-writes after an edit).
+    """
+
+    def __init__(self, *args, replica: Optional[Engine] = None, **kwargs) -> None:
+        super().__init__(*args, **kwargs)
+        self.replica = replica
+
+    def get_bind(self, mapper=None, clause=None, **kwargs):
+        if self.replica is not None and not self.info.get("primary"):
+            if not self._flushing and getattr(clause, "is_select", False):
+                return self.replica
+            self.info["primary"] = True
+        return super().get_bind(mapper, clause=clause, **kwargs)
+
+
+# Read-mostly sessions for the web panel, statistics and exports
+ReadSessionLocal = sessionmaker(
+    class_=RoutingSession,
+    autocommit=False,
+    autoflush=False,
+    expire_on_commit=False,
+    bind=engine,
+    replica=replica_engine,
+)
+
+
+@event.listens_for(SessionLocal, "after_transaction_create")
+def _mark_checkout_start(session: Session, transaction) -> None:
+    """Remember when a session starts waiting for a pooled connection."""
+    if transaction.parent is None:
+        session.info["checkout_started"] = time.perf_counter()
+
+
+@event.listens_for(SessionLocal, "after_begin")
+def _record_checkout_wait(session: Session, transaction, connection) -> None:
+    """Accumulate the time spent waiting for a connection in session.info."""
+    started = session.info.pop("checkout_started", None)
+    if started is not None:
+        waited = time.perf_counter() - started
+        session.info["checkout_wait"] = session.info.get("checkout_wait", 0.0) + waited
+
+
+ALEMBIC_INI = os.path.join(
+    os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))),
+    "alembic.ini",
+)
+# Revision matching the tables create_all made before migrations existed
+BASELINE_REVISION = "0001"
+# Setting holding "<alembic head>:<TOTAL_DAYS>" once init_db has completed
+SCHEMA_VERSION_KEY = "schema_version"
+
+
+def _run_alembic(bind: Engine, fn, *args) -> None:
+    """Run an Alembic command on a fresh connection and commit its work.
+
+    The connection must not be in a transaction when Alembic gets it,
+    otherwise migrations that need autocommit (CREATE INDEX CONCURRENTLY on
+    PostgreSQL) fail.
+    """
+    alembic_cfg = AlembicConfig(ALEMBIC_INI)
+    with bind.connect() as connection:
+        alembic_cfg.attributes["connection"] = connection
+        fn(alembic_cfg, *args)
+        connection.commit()
+
+
+def upgrade_schema(bind: Engine = engine) -> None:
+    """Bring the schema up to the latest migration.
+
+    Databases created by create_all before migrations were introduced are
+    stamped at the baseline first, so only the newer migrations run.
+    """
+    with bind.connect() as connection:
+        tables = inspect(connection).get_table_names()
+    if "users" in tables and "alembic_version" not in tables:
+        _run_alembic(bind, command.stamp, BASELINE_REVISION)
+    _run_alembic(bind, command.upgrade, "head")
+
+
+@lru_cache(maxsize=1)
+def _head_revision() -> str:
+    """Latest migration revision (scans migrations/versions once per process)."""
+    return ScriptDirectory.from_config(AlembicConfig(ALEMBIC_INI)).get_current_head()
+
+
+def _schema_version() -> str:
+    """Marker stored once the schema is migrated and seeded for this config."""
+    return f"{_head_revision()}:{config.TOTAL_DAYS}"
+
+
+def _is_initialized(version: str) -> bool:
+    """Check in one query whether the database is already at this version."""
+    try:
+        with engine.connect() as connection:
+            stored = connection.execute(
+                select(Setting.value).where(Setting.key == SCHEMA_VERSION_KEY)
+            ).scalar()
+    except DBAPIError:
+        # First start: the settings table does not exist yet
+        return False
+    return stored == version
+
+
+def seed_messages(db: Session) -> int:
+    """Insert the missing day rows in one multi-row INSERT.
+
+    Returns:
+        Number of days inserted.
+    """
+    existing = set(db.scalars(select(Message.day_number)))
+    missing = [
+        {"day_number": day, "content": ""}
+        for day in range(1, config.TOTAL_DAYS + 1)
+        if day not in existing
+    ]
+    if missing:
+        db.execute(insert(Message).values(missing))
+    return len(missing)
 
 
 def init_db() -> None:
-    """Initialize the database and create all tables."""
-    # Create all tables
-    Base.metadata.create_all(bind=engine)
-
-    # Initialize 365 messages if they don't exist
-    with get_db() as db:
-        existing_count = db.query(Message).count()
-        if existing_count < config.TOTAL_DAYS:
-            for day in range(1, config.TOTAL_DAYS + 1):
-                existing = db.query(Message).filter(Message.day_number == day).first()
-                if not existing:
-                    message = Message(day_number=day, content="")
-                    db.add(message)
-            db.commit()
+    """Initialize the database: migrate the schema and seed default rows.
+
+    Warm starts only check the stored schema version and return.
+    """
+    version = _schema_version()
+    if _is_initialized(version):
+        return
+
+    upgrade_schema()
+
+    # A writer session: on SQLite it takes the write lock up front, so
+    # seeding cannot fail halfway against a bot or panel already running
+    # in another process
+    with WriterSessionLocal() as db:
+        seed_messages(db)
 
         # Initialize welcome message setting if not exists
-        welcome_setting = (
-            db.query(Setting).filter(Setting.key == "welcome_message").first()
-        )
-        if not welcome_setting:
-            welcome = Setting(
-                key="welcome_message",
-                value="Welcome! You'll receive a daily message for the next 365 days.",
+        if db.scalar(select(Setting.id).where(Setting.key == "welcome_message")) is None:
+            db.add(
+                Setting(
+                    key="welcome_message",
+                    value="Welcome! You'll receive a daily message for the next 365 days.",
+                )
             )
-            db.add(welcome)
-            db.commit()
+        db.commit()
+
+        # Seed statistics counters on first start (kept up to date afterwards)
+        if db.query(StatCounter.id).first() is None:
+            reconcile_stats(db)
+
+        set_setting(db, SCHEMA_VERSION_KEY, version)
 
 
 @contextmanager
@@ -56,3 +268,33 @@ def get_db() -> Generator[Session, None, None]:
         yield db
     finally:
         db.close()
+
+
+@contextmanager
+def get_read_db(primary: bool = False) -> Generator[Session, None, None]:
+    """Get a session whose reads go to the replica when one is configured.
+
+    Args:
+        primary: Read from the primary anyway, e.g. right after the caller
+            wrote something it expects to see.
+
+    Yields:
+        SQLAlchemy database session.
+    """
+    db = ReadSessionLocal()
+    db.info["primary"] = primary
+    try:
+        yield db
+    finally:
+        db.close()
+
+
+def release(db: Session) -> None:
+    """Commit pending work and return the session's connection to the pool.
+
+    Handlers call this before any network I/O so that a pooled connection is
+    never held across a Telegram round trip. The session stays usable and
+    checks out a new connection if it is touched again.
+    """
+    db.commit()
+    db.close()
@@ -0,0 +1,139 @@
+"""Slow-query log for Telegram 365 Bot.
+
+Opt in with ``SLOW_QUERY_MS``: every statement that takes at least that long
+is kept in a bounded in-memory ring buffer (``SLOW_QUERY_LOG_SIZE`` entries,
+oldest dropped first) and shown on the web panel's Slow Queries page.
+Each entry has:
+
+- the SQL and how long it took
+- the shape of its bound parameters (names and types, never the values,
+  which may be user content)
+- the caller: the query scope it ran in (route, handler or job), or the
+  thread name outside any scope
+- with ``SLOW_QUERY_EXPLAIN``, the plan from ``EXPLAIN QUERY PLAN`` on
+  SQLite or ``EXPLAIN`` on PostgreSQL, for SELECTs only
+
+The plan is taken right after the slow statement on the same connection,
+so it reflects the data and indexes that statement saw.
+"""
+import logging
+import threading
+from collections import deque
+from datetime import datetime
+from typing import Any, Optional
+
+from src.config import config
+from src.metrics import metrics
+
+logger = logging.getLogger(__name__)
+
+# Parameters described per statement before the rest are summarized
+MAX_PARAMETERS_SHOWN = 10
+
+
+def _describe(parameters: Any) -> str:
+    """Names and types of one parameter set, e.g. ``{day_number: int}``."""
+    if isinstance(parameters, dict):
+        items = [f"{key}: {type(value).__name__}" for key, value in parameters.items()]
+        opening, closing = "{", "}"
+    else:
+        items = [type(value).__name__ for value in parameters or ()]
+        opening, closing = "(", ")"
+    extra = len(items) - MAX_PARAMETERS_SHOWN
+    if extra > 0:
+        items = items[:MAX_PARAMETERS_SHOWN] + [f"... {extra} more"]
+    return opening + ", ".join(items) + closing
+
+
+def parameter_shape(parameters: Any, executemany: bool = False) -> str:
+    """Describe bound parameters without their values."""
+    if executemany:
+        rows = len(parameters)
+        return f"{rows} x {_describe(parameters[0] if rows else ())}"
+    return _describe(parameters)
+
+
+def explain(connection, statement: str, parameters: Any) -> Optional[str]:
+    """Plan of a SELECT on the connection it ran on, or None if unsupported.
+
+    Args:
+        connection: SQLAlchemy connection the statement ran on.
+    """
+    if statement.lstrip()[:6].upper() != "SELECT":
+        return None
+    dialect = connection.dialect.name
+    if dialect == "sqlite":
+        prefix = "EXPLAIN QUERY PLAN "
+    elif dialect == "postgresql":
+        prefix = "EXPLAIN "
+    else:
+        return None
+    # A separate DBAPI cursor: the statement's own cursor may still hold rows
+    cursor = connection.connection.cursor()
+    try:
+        cursor.execute(prefix + statement, parameters)
+        rows = cursor.fetchall()
+    except Exception as e:
+        return f"EXPLAIN failed: {e}"
+    finally:
+        cursor.close()
+    if dialect == "sqlite":
+        # (id, parent, unused, detail); indent children under their parent
+        depth = {0: -1}
+        lines = []
+        for node, parent, _, detail in rows:
+            depth[node] = depth.get(parent, -1) + 1
+            lines.append("  " * depth[node] + detail)
+        return "\n".join(lines)
+    return "\n".join(row[0] for row in rows)
+
+
+class SlowQueryLog:
+    """Thread-safe ring buffer of the most recent slow statements."""
+
+    def __init__(self, size: int) -> None:
+        self._lock = threading.Lock()
+        self._entries: deque = deque(maxlen=size)
+
+    def record(
+        self,
+        connection,
+        statement: str,
+        parameters: Any,
+        executemany: bool,
+        seconds: float,
+        caller: str,
+    ) -> dict:
+        """Store a slow statement, explaining it first if configured."""
+        entry = {
+            "at": datetime.utcnow(),
+            "duration_ms": round(seconds * 1000, 3),
+            "caller": caller,
+            "statement": statement,
+            "parameters": parameter_shape(parameters, executemany),
+            "plan": None,
+        }
+        if config.SLOW_QUERY_EXPLAIN and not executemany:
+            entry["plan"] = explain(connection, statement, parameters)
+        with self._lock:
+            self._entries.append(entry)
+        metrics.incr("db.slow_queries")
+        logger.warning(
+            f"Slow query ({entry['duration_ms']:.1f}ms) in {caller}: "
+            f"{' '.join(statement.split())[:200]}"
+        )
+        return entry
+
+    def entries(self) -> list[dict]:
+        """Recorded statements, slowest first."""
+        with self._lock:
+            entries = list(self._entries)
+        return sorted(entries, key=lambda e: e["duration_ms"], reverse=True)
+
+    def clear(self) -> None:
+        """Forget all recorded statements."""
+        with self._lock:
+            self._entries.clear()
+
+
+slow_queries = SlowQueryLog(config.SLOW_QUERY_LOG_SIZE)
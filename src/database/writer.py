@@ -0,0 +1,237 @@
+"""Group-commit writer for Telegram 365 Bot.
+
+During a registration burst every /start commits on its own, which costs one
+fsync per user. The writer collects write callables that arrive within a few
+milliseconds of each other and applies them in a single transaction on a
+background thread. Each caller still gets its own result (or exception)
+back once that transaction has committed.
+
+On SQLite the writer is also the single writer for the whole process: the
+bot, the scheduler and the web panel all queue their writes here, so they
+never contend for the database write lock while reads run concurrently.
+"""
+import asyncio
+import contextvars
+import functools
+import logging
+import queue
+import threading
+import time
+from concurrent.futures import Future
+from typing import Any, Callable, Optional
+
+from sqlalchemy.orm import Session, sessionmaker
+
+from src.config import config
+from src.database.session import IS_SQLITE, WriterSessionLocal, get_db
+from src.metrics import metrics
+
+logger = logging.getLogger(__name__)
+
+WriteFn = Callable[[Session], Any]
+
+_STOP = object()
+
+
+class GroupCommitWriter:
+    """Batch writes from many callers into shared transactions.
+
+    Write functions receive a session and must not commit it themselves
+    (query helpers take ``commit=False`` for this). They should return plain
+    values rather than ORM objects, since those are expired once the batch
+    commits on the writer thread.
+
+    Writes submitted with ``group=False`` run alone in their own transaction
+    and may commit themselves; they are still serialized with everything
+    else on the writer thread.
+    """
+
+    def __init__(
+        self,
+        session_factory: sessionmaker = WriterSessionLocal,
+        window_ms: float = 5.0,
+        max_batch: int = 200,
+    ) -> None:
+        self.session_factory = session_factory
+        self.window = window_ms / 1000
+        self.max_batch = max_batch
+        self._queue: queue.SimpleQueue = queue.SimpleQueue()
+        self._thread: Optional[threading.Thread] = None
+        # Ungrouped write that ended the previous batch, applied next
+        self._held = None
+
+    @property
+    def running(self) -> bool:
+        """Whether the writer thread is accepting writes."""
+        return self._thread is not None and self._thread.is_alive()
+
+    def start(self) -> None:
+        """Start the writer thread."""
+        if self.running:
+            return
+        self._thread = threading.Thread(
+            target=self._run, name="group-commit-writer", daemon=True
+        )
+        self._thread.start()
+        logger.info(
+            f"Group-commit writer started (window {self.window * 1000:.1f}ms, "
+            f"max batch {self.max_batch})"
+        )
+
+    def stop(self) -> None:
+        """Flush pending writes and stop the writer thread."""
+        if not self.running:
+            return
+        self._queue.put(_STOP)
+        self._thread.join()
+        self._thread = None
+
+    def submit(self, fn: WriteFn, group: bool = True) -> Future:
+        """Queue a write and return a future for its result.
+
+        The write runs in a copy of the caller's context, so its statements
+        count against the caller's query scope.
+        """
+        future: Future = Future()
+        fn = functools.partial(contextvars.copy_context().run, fn)
+        self._queue.put((fn, future, group))
+        return future
+
+    async def run(self, fn: WriteFn, group: bool = True) -> Any:
+        """Queue a write and wait until the transaction holding it commits."""
+        return await asyncio.wrap_future(self.submit(fn, group))
+
+    def _collect(self, first) -> tuple[list, bool]:
+        """Gather writes arriving within the window after the first one."""
+        batch = [first]
+        deadline = time.perf_counter() + self.window
+        while len(batch) < self.max_batch:
+            remaining = deadline - time.perf_counter()
+            if remaining <= 0:
+                break
+            try:
+                item = self._queue.get(timeout=remaining)
+            except queue.Empty:
+                break
+            if item is _STOP:
+                return batch, True
+            if not item[2]:
+                self._held = item
+                break
+            batch.append(item)
+        return batch, False
+
+    def _run(self) -> None:
+        stopping = False
+        while not stopping or self._held is not None:
+            if self._held is not None:
+                item, self._held = self._held, None
+            else:
+                item = self._queue.get()
+            if item is _STOP:
+                break
+            if not item[2]:
+                self._apply([item])
+                continue
+            batch, stopping = self._collect(item)
+            self._apply(batch)
+
+    def _apply(self, batch: list) -> None:
+        """Apply a batch in one transaction.
+
+        A write that raises is failed on its own and the rest of the batch is
+        retried without it, so a single bad write cannot fail its neighbours.
+        If the commit itself fails, writes are replayed one per transaction.
+        """
+        started = time.perf_counter()
+        results = []
+        failed_at = None
+        error = None
+        db = self.session_factory()
+        try:
+            for index, (fn, _, _) in enumerate(batch):
+                failed_at = index
+                results.append(fn(db))
+            failed_at = None
+            db.commit()
+        except Exception as e:
+            db.rollback()
+            error = e
+        finally:
+            db.close()
+
+        if error is not None:
+            if failed_at is not None:
+                _resolve(batch[failed_at][1], error=error)
+                rest = batch[:failed_at] + batch[failed_at + 1:]
+                if rest:
+                    self._apply(rest)
+            elif len(batch) == 1:
+                _resolve(batch[0][1], error=error)
+            else:
+                logger.warning(
+                    f"Group commit of {len(batch)} writes failed ({error}), "
+                    "retrying one by one"
+                )
+                for entry in batch:
+                    self._apply([entry])
+            return
+
+        for (_, future, _), result in zip(batch, results):
+            _resolve(future, result=result)
+        metrics.incr("db.group_commit.batches")
+        metrics.incr("db.group_commit.writes", len(batch))
+        metrics.observe("db.group_commit.batch_time", time.perf_counter() - started)
+
+
+def _resolve(future: Future, result: Any = None, error: Exception = None) -> None:
+    """Settle a caller's future unless the caller already gave up on it."""
+    if future.cancelled():
+        return
+    if error is not None:
+        future.set_exception(error)
+    else:
+        future.set_result(result)
+
+
+# With group commit disabled the writer only serializes SQLite writes: a zero
+# window applies each write in its own transaction as soon as it arrives
+writer = GroupCommitWriter(
+    window_ms=config.GROUP_COMMIT_WINDOW_MS if config.GROUP_COMMIT_ENABLED else 0,
+    max_batch=config.GROUP_COMMIT_MAX_BATCH,
+)
+
+
+def _apply_direct(fn: WriteFn) -> Any:
+    with get_db() as db:
+        result = fn(db)
+        db.commit()
+        return result
+
+
+def writer_required() -> bool:
+    """Whether writes must go through the writer (always on SQLite).
+
+    On SQLite without GROUP_COMMIT_ENABLED the writer runs with no window,
+    so writes are serialized but not batched.
+    """
+    return config.GROUP_COMMIT_ENABLED or IS_SQLITE
+
+
+async def apply_write(fn: WriteFn, group: bool = True) -> Any:
+    """Run a write through the group-commit writer when it is running.
+
+    Without the writer the write runs in its own short transaction, so
+    callers behave the same either way. Pass ``group=False`` for writes
+    that commit themselves.
+    """
+    if writer.running:
+        return await writer.run(fn, group)
+    return _apply_direct(fn)
+
+
+def apply_write_sync(fn: WriteFn, group: bool = True) -> Any:
+    """Blocking variant of apply_write for threads outside the event loop."""
+    if writer.running:
+        return writer.submit(fn, group).result()
+    return _apply_direct(fn)
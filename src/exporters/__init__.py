@@ -0,0 +1 @@
+"""Streaming exporters for Telegram 365 Bot."""
@@ -0,0 +1,102 @@
+"""Streaming CSV and JSON exports of users and day messages.
+
+Rows are encoded as they arrive from the database cursor and handed out in
+chunks of about CHUNK_SIZE characters, so memory use does not grow with the
+number of rows. Formats:
+
+- CSV with a header row
+- JSON: one array of objects
+
+Message exports use the ``day,content,send_time`` layout that the content
+importer reads, so an export can be edited and imported back.
+"""
+import csv
+import io
+import json
+import zlib
+from datetime import date, datetime, time as dt_time
+from typing import Any, Iterable, Iterator
+
+CHUNK_SIZE = 64 * 1024
+
+# format -> MIME type
+FORMATS = {"csv": "text/csv", "json": "application/json"}
+
+# table -> exported fields, in column order
+FIELDS = {
+    "users": (
+        "id",
+        "telegram_id",
+        "username",
+        "timezone",
+        "current_day",
+        "is_active",
+        "started_at",
+        "last_message_date",
+        "created_at",
+    ),
+    "messages": ("day", "content", "send_time"),
+}
+
+
+def _value(value: Any) -> Any:
+    """Convert a column value to its exported form."""
+    if isinstance(value, dt_time):
+        return value.strftime("%H:%M")
+    if isinstance(value, (date, datetime)):
+        return value.isoformat()
+    return value
+
+
+def _records(fields: tuple[str, ...], rows: Iterable) -> Iterator[dict[str, Any]]:
+    for row in rows:
+        mapping = row._mapping
+        yield {field: _value(mapping[field]) for field in fields}
+
+
+def encode_csv(fields: tuple[str, ...], rows: Iterable) -> Iterator[str]:
+    """Yield CSV text in chunks, starting with the header row."""
+    buffer = io.StringIO()
+    writer = csv.DictWriter(buffer, fieldnames=fields)
+    writer.writeheader()
+    for record in _records(fields, rows):
+        writer.writerow(record)
+        if buffer.tell() >= CHUNK_SIZE:
+            yield buffer.getvalue()
+            buffer.seek(0)
+            buffer.truncate()
+    yield buffer.getvalue()
+
+
+def encode_json(fields: tuple[str, ...], rows: Iterable) -> Iterator[str]:
+    """Yield a JSON array of objects in chunks."""
+    parts = ["["]
+    size = 1
+    separator = "\n"
+    for record in _records(fields, rows):
+        part = separator + json.dumps(record, ensure_ascii=False)
+        separator = ",\n"
+        parts.append(part)
+        size += len(part)
+        if size >= CHUNK_SIZE:
+            yield "".join(parts)
+            parts = []
+            size = 0
+    parts.append("\n]\n")
+    yield "".join(parts)
+
+
+def encode(table: str, fmt: str, rows: Iterable) -> Iterator[str]:
+    """Yield rows of a table ("users" or "messages") encoded as fmt."""
+    encoder = encode_csv if fmt == "csv" else encode_json
+    return encoder(FIELDS[table], rows)
+
+
+def gzip_chunks(chunks: Iterable[str]) -> Iterator[bytes]:
+    """Compress text chunks into one gzip stream as they are produced."""
+    compressor = zlib.compressobj(wbits=31)  # 31: gzip header and trailer
+    for chunk in chunks:
+        data = compressor.compress(chunk.encode("utf-8"))
+        if data:
+            yield data
+    yield compressor.flush()
@@ -0,0 +1 @@
+"""Bulk importers for Telegram 365 Bot."""
@@ -0,0 +1,193 @@
+"""Bulk import of day messages from CSV or JSON documents.
+
+Accepted formats, one row per day:
+
+- CSV with a header row: ``day,content,send_time``
+- JSON: an array of ``{"day": 1, "content": "...", "send_time": "09:00"}``
+  objects, or the same objects one per line (JSON Lines)
+
+``send_time`` is optional; rows without it keep the day's current send time.
+"""
+import csv
+import io
+import json
+from datetime import time as dt_time
+from typing import Any, BinaryIO, Iterator, Optional
+
+from src.config import config
+
+MAX_ERRORS_REPORTED = 10
+
+
+class ContentImportError(ValueError):
+    """Raised when an import document cannot be parsed."""
+
+
+def parse_send_time(value: str) -> dt_time:
+    """Parse an HH:MM string into a time."""
+    parts = value.strip().split(":")
+    if len(parts) != 2:
+        raise ValueError("Invalid format")
+    hour, minute = int(parts[0]), int(parts[1])
+    if not (0 <= hour <= 23 and 0 <= minute <= 59):
+        raise ValueError("Invalid time values")
+    return dt_time(hour, minute)
+
+
+def _iter_csv(text: io.TextIOBase) -> Iterator[dict[str, Any]]:
+    reader = csv.DictReader(text)
+    if not reader.fieldnames or "day" not in reader.fieldnames:
+        raise ContentImportError("CSV must have a header row with day,content,send_time")
+    yield from reader
+
+
+def _iter_json(text: io.TextIOBase, chunk_size: int = 65536) -> Iterator[Any]:
+    """Yield top-level values from a JSON array or JSON Lines stream.
+
+    Objects are decoded as soon as they are complete, so the whole document
+    never has to be held as one parsed structure.
+    """
+    decoder = json.JSONDecoder()
+    buffer = ""
+    pos = 0
+    in_array = None
+    eof = False
+    while True:
+        # Skip whitespace and array punctuation between values
+        while pos < len(buffer) and buffer[pos] in " \t\r\n,":
+            pos += 1
+        if pos < len(buffer) and in_array is None:
+            in_array = buffer[pos] == "["
+            if in_array:
+                pos += 1
+                continue
+        if pos < len(buffer) and buffer[pos] == "]" and in_array:
+            return
+        try:
+            if pos >= len(buffer):
+                raise ValueError("need more data")
+            value, end = decoder.raw_decode(buffer, pos)
+        except ValueError:
+            if eof:
+                if buffer[pos:].strip():
+                    raise ContentImportError("Invalid JSON document")
+                return
+            chunk = text.read(chunk_size)
+            if not chunk:
+                eof = True
+            buffer = buffer[pos:] + chunk
+            pos = 0
+            continue
+        # A number cut off at the chunk boundary may decode early
+        if end == len(buffer) and not eof:
+            chunk = text.read(chunk_size)
+            if chunk:
+                buffer = buffer[pos:] + chunk
+                pos = 0
+                continue
+            eof = True
+        pos = end
+        yield value
+
+
+def iter_rows(stream: BinaryIO, filename: str) -> Iterator[dict[str, Any]]:
+    """Stream rows out of an uploaded document, picking the format by extension."""
+    name = (filename or "").lower()
+    if not name.endswith((".csv", ".json", ".jsonl")):
+        raise ContentImportError("Unsupported file type. Send a .csv or .json document.")
+
+    text = io.TextIOWrapper(stream, encoding="utf-8-sig", newline="")
+    try:
+        if name.endswith(".csv"):
+            yield from _iter_csv(text)
+        else:
+            for value in _iter_json(text):
+                if not isinstance(value, dict):
+                    raise ContentImportError("Each JSON row must be an object")
+                yield value
+    except UnicodeDecodeError:
+        raise ContentImportError("File must be UTF-8 encoded")
+    except csv.Error as e:
+        raise ContentImportError(f"Invalid CSV: {e}")
+
+
+def validate_rows(
+    rows: Iterator[dict[str, Any]],
+) -> tuple[dict[int, tuple[str, Optional[dt_time]]], list[str]]:
+    """Validate import rows against the day range and message length limit.
+
+    Returns:
+        Tuple of (changes keyed by day number as (content, send_time or
+        None), list of error messages). Any error means nothing is applied.
+    """
+    changes: dict[int, tuple[str, Optional[dt_time]]] = {}
+    errors: list[str] = []
+    for line, row in enumerate(rows, start=1):
+        try:
+            day = int(str(row.get("day", "")).strip())
+        except ValueError:
+            errors.append(f"Row {line}: invalid day number")
+            continue
+        if day < 1 or day > config.TOTAL_DAYS:
+            errors.append(f"Row {line}: day must be between 1 and {config.TOTAL_DAYS}")
+            continue
+        if day in changes:
+            errors.append(f"Row {line}: day {day} appears more than once")
+            continue
+
+        content = row.get("content")
+        if not isinstance(content, str):
+            errors.append(f"Row {line}: content is missing")
+            continue
+        if len(content) > config.MAX_MESSAGE_LENGTH:
+            errors.append(
+                f"Row {line}: day {day} is too long "
+                f"({len(content)} > {config.MAX_MESSAGE_LENGTH} characters)"
+            )
+            continue
+
+        send_time = None
+        raw_time = row.get("send_time")
+        if raw_time not in (None, ""):
+            try:
+                send_time = parse_send_time(str(raw_time))
+            except (ValueError, IndexError):
+                errors.append(f"Row {line}: invalid send_time, use HH:MM")
+                continue
+
+        changes[day] = (content, send_time)
+    return changes, errors
+
+
+def format_days(days: list[int]) -> str:
+    """Format day numbers compactly, e.g. [1, 2, 3, 7] -> "1-3, 7"."""
+    ranges = []
+    for day in sorted(days):
+        if ranges and day == ranges[-1][1] + 1:
+            ranges[-1][1] = day
+        else:
+            ranges.append([day, day])
+    return ", ".join(str(a) if a == b else f"{a}-{b}" for a, b in ranges)
+
+
+def format_summary(diff: dict) -> str:
+    """Render an import diff as a short chat reply."""
+    lines = [
+        f"Import applied: {len(diff['changed'])} days changed, "
+        f"{diff['unchanged']} unchanged.",
+        f"Content changed: {diff['content_changed']}, "
+        f"send time changed: {diff['time_changed']}.",
+    ]
+    if diff["changed"]:
+        lines.append(f"Changed days: {format_days(diff['changed'])}")
+    return "\n".join(lines)
+
+
+def format_errors(errors: list[str]) -> str:
+    """Render validation errors as a short chat reply."""
+    shown = errors[:MAX_ERRORS_REPORTED]
+    lines = [f"Import rejected, nothing was changed ({len(errors)} errors):"]
+    lines.extend(shown)
+    if len(errors) > len(shown):
+        lines.append(f"...and {len(errors) - len(shown)} more")
+    return "\n".join(lines)
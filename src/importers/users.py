@@ -0,0 +1,162 @@
+"""Bulk import of subscribers, e.g. from another bot's user list.
+
+Accepted format: CSV with a header row ``telegram_id,username,timezone,current_day``.
+Only ``telegram_id`` is required; a missing or empty value means "not given":
+new users then start at day 1 in UTC, existing users keep what they have.
+
+The file is read as a stream and written in batches of ``batch_size`` rows,
+each batch one upsert in its own transaction, so memory stays flat and a
+500k-row file takes seconds rather than hours. Invalid rows are rejected
+and reported without stopping the import.
+"""
+import csv
+import io
+import time
+from typing import Any, BinaryIO, Callable, Iterator, Optional
+
+import pytz
+
+from src.config import config
+from src.database import queries
+from src.database.writer import apply_write_sync
+
+DEFAULT_BATCH_SIZE = 5000
+MAX_ERRORS_REPORTED = 10
+
+COLUMNS = ("telegram_id", "username", "timezone", "current_day")
+
+
+class UserImportError(ValueError):
+    """Raised when an import file cannot be read at all."""
+
+
+def _iter_csv(stream: BinaryIO) -> Iterator[dict[str, Any]]:
+    text = io.TextIOWrapper(stream, encoding="utf-8-sig", newline="")
+    try:
+        reader = csv.DictReader(text)
+        if not reader.fieldnames or "telegram_id" not in reader.fieldnames:
+            raise UserImportError(f"CSV must have a header row with {','.join(COLUMNS)}")
+        yield from reader
+    except UnicodeDecodeError:
+        raise UserImportError("File must be UTF-8 encoded")
+    except csv.Error as e:
+        raise UserImportError(f"Invalid CSV: {e}")
+
+
+def parse_row(raw: dict[str, Any]) -> dict[str, Any]:
+    """Validate one CSV row into import values.
+
+    Raises:
+        ValueError: With a message saying what is wrong with the row.
+    """
+    def cell(name: str) -> Optional[str]:
+        value = (raw.get(name) or "").strip()
+        return value or None
+
+    telegram_id = cell("telegram_id")
+    if telegram_id is None or not telegram_id.isdigit() or int(telegram_id) == 0:
+        raise ValueError("telegram_id must be a positive integer")
+
+    username = cell("username")
+    if username is not None:
+        username = username.lstrip("@")[:255] or None
+
+    timezone = cell("timezone")
+    if timezone is not None and timezone not in pytz.all_timezones_set:
+        raise ValueError(f"unknown timezone {timezone!r}")
+
+    current_day = cell("current_day")
+    if current_day is not None:
+        if not current_day.isdigit() or not 1 <= int(current_day) <= config.TOTAL_DAYS:
+            raise ValueError(f"current_day must be between 1 and {config.TOTAL_DAYS}")
+        current_day = int(current_day)
+
+    return {
+        "telegram_id": int(telegram_id),
+        "username": username,
+        "timezone": timezone,
+        "current_day": current_day,
+    }
+
+
+def import_users(
+    stream: BinaryIO,
+    update_existing: bool = False,
+    batch_size: int = DEFAULT_BATCH_SIZE,
+    write: Callable = apply_write_sync,
+) -> dict:
+    """Import users from a CSV stream in batches.
+
+    Args:
+        update_existing: Overwrite existing users' values with the file's
+            instead of skipping them.
+        write: Runs each batch write (the writer queue by default).
+
+    Returns:
+        Report with row counts, the first rejected rows and the rate.
+
+    Raises:
+        UserImportError: If the file is not a readable CSV with a
+            telegram_id column. Batches written before it stay written.
+    """
+    report = {
+        "rows": 0,
+        "inserted": 0,
+        "updated": 0,
+        "skipped": 0,
+        "rejected": 0,
+        "errors": [],
+    }
+    started = time.perf_counter()
+
+    def flush(batch: dict[int, dict]) -> None:
+        rows = list(batch.values())
+        inserted, updated, skipped = write(
+            lambda s: queries.import_users_bulk(s, rows, update_existing),
+            group=False,
+        )
+        report["inserted"] += inserted
+        report["updated"] += updated
+        report["skipped"] += skipped
+
+    def reject(line: int, reason: str) -> None:
+        report["rejected"] += 1
+        if len(report["errors"]) < MAX_ERRORS_REPORTED:
+            report["errors"].append(f"Line {line}: {reason}")
+
+    # telegram_id -> row; a repeated id in one batch keeps the first row
+    batch: dict[int, dict] = {}
+    for line, raw in enumerate(_iter_csv(stream), start=2):
+        report["rows"] += 1
+        try:
+            row = parse_row(raw)
+        except ValueError as e:
+            reject(line, str(e))
+            continue
+        if row["telegram_id"] in batch:
+            reject(line, f"telegram_id {row['telegram_id']} appears more than once")
+            continue
+        batch[row["telegram_id"]] = row
+        if len(batch) >= batch_size:
+            flush(batch)
+            batch = {}
+    if batch:
+        flush(batch)
+
+    report["seconds"] = time.perf_counter() - started
+    report["rows_per_second"] = report["rows"] / report["seconds"] if report["seconds"] else 0
+    return report
+
+
+def format_report(report: dict) -> str:
+    """Render an import report as a few lines of text."""
+    lines = [
+        f"Imported {report['rows']} rows in {report['seconds']:.1f}s "
+        f"({report['rows_per_second']:.0f} rows/s).",
+        f"New: {report['inserted']}, updated: {report['updated']}, "
+        f"already known: {report['skipped']}, rejected: {report['rejected']}.",
+    ]
+    lines.extend(report["errors"])
+    if report["rejected"] > len(report["errors"]):
+        lines.append(f"...and {report['rejected'] - len(report['errors'])} more")
+    return "\n".join(lines)
@@ -6,7 +6,9 @@ import threading
 
 from src.config import config
 from src.database import init_db
+from src.database.writer import writer, writer_required
 from src.bot import bot, dp, setup_handlers
+from src.bot.catchup import drain_backlog
 from src.scheduler import setup_scheduler
 from src.web import create_app
 
@@ -45,6 +47,10 @@ async def main():
     logger.info("Initializing database...")
     init_db()
 
+    # Group commit, or the single writer every SQLite write goes through
+    if writer_required():
+        writer.start()
+
     # Setup bot handlers
     logger.info("Setting up bot handlers...")
     setup_handlers(dp)
@@ -58,9 +64,19 @@ async def main():
     flask_thread = threading.Thread(target=run_flask, daemon=True)
     flask_thread.start()
 
+    # Process updates that arrived while the bot was down in bulk
+    if config.CATCHUP_ON_STARTUP:
+        logger.info("Catching up on pending updates...")
+        await drain_backlog(bot, dp)
+
     # Start bot polling
-    logger.info("Starting Telegram bot...")
-    await dp.start_polling(bot)
+    logger.info(
+        f"Starting Telegram bot ({config.UPDATE_PROCESSING_MODE} update processing)..."
+    )
+    await dp.start_polling(
+        bot,
+        handle_as_tasks=config.UPDATE_PROCESSING_MODE == "concurrent",
+    )
 
 
 if __name__ == "__main__":
@@ -0,0 +1,77 @@
+"""In-process metrics registry for Telegram 365 Bot.
+
+The bot loop, the scheduler and the Flask thread all record into the same
+registry, and the web panel exposes a snapshot of it at ``/api/metrics``.
+"""
+import threading
+from typing import Any
+
+
+class Metrics:
+    """Thread-safe counters, gauges and timing summaries."""
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._counters: dict[str, int] = {}
+        self._gauges: dict[str, float] = {}
+        self._timings: dict[str, list[float]] = {}
+
+    def incr(self, name: str, value: int = 1) -> None:
+        """Increment a counter."""
+        with self._lock:
+            self._counters[name] = self._counters.get(name, 0) + value
+
+    def set_gauge(self, name: str, value: float) -> None:
+        """Set a gauge to its current value."""
+        with self._lock:
+            self._gauges[name] = value
+
+    def add_gauge(self, name: str, delta: float) -> None:
+        """Move a gauge up or down by delta."""
+        with self._lock:
+            self._gauges[name] = self._gauges.get(name, 0) + delta
+
+    def observe(self, name: str, seconds: float) -> None:
+        """Record a duration in seconds (count, total and max are kept)."""
+        with self._lock:
+            timing = self._timings.get(name)
+            if timing is None:
+                self._timings[name] = [1, seconds, seconds]
+            else:
+                timing[0] += 1
+                timing[1] += seconds
+                if seconds > timing[2]:
+                    timing[2] = seconds
+
+    def get_counter(self, name: str) -> int:
+        """Get the current value of a counter."""
+        with self._lock:
+            return self._counters.get(name, 0)
+
+    def snapshot(self) -> dict[str, Any]:
+        """Get a JSON-serializable copy of all metrics."""
+        with self._lock:
+            timings = {
+                name: {
+                    "count": count,
+                    "total_ms": round(total * 1000, 3),
+                    "avg_ms": round(total * 1000 / count, 3) if count else 0.0,
+                    "max_ms": round(peak * 1000, 3),
+                }
+                for name, (count, total, peak) in self._timings.items()
+            }
+            return {
+                "counters": dict(self._counters),
+                "gauges": dict(self._gauges),
+                "timings": timings,
+            }
+
+    def reset(self) -> None:
+        """Clear all metrics."""
+        with self._lock:
+            self._counters.clear()
+            self._gauges.clear()
+            self._timings.clear()
+
+
+metrics = Metrics()
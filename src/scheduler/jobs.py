@@ -1,7 +1,7 @@
 """APScheduler jobs for Telegram 365 Bot."""
 import asyncio
 import logging
-from datetime import datetime, date
+from datetime import datetime, date, timedelta
 
 import pytz
 from apscheduler.schedulers.asyncio import AsyncIOScheduler
@@ -9,7 +9,11 @@ from apscheduler.schedulers.asyncio import AsyncIOScheduler
 from src.config import config
 from src.database import get_db
 from src.database import queries
-from src.bot.bot import bot
+from src.database.models import User
+from src.database.profiling import query_scoped
+from src.database.writer import apply_write
+from src.bot.broadcast import resume_broadcasts
+from src.bot.sender import sender
 
 logger = logging.getLogger(__name__)
 
@@ -17,70 +21,116 @@ logger = logging.getLogger(__name__)
 scheduler = AsyncIOScheduler(timezone=config.SCHEDULER_TIMEZONE)
 
 
+@query_scoped("scheduler")
 async def send_daily_messages() -> None:
     """Check and send daily messages to users based on their timezone."""
     logger.debug("Running daily message check...")
 
+    # Compact rows, not User objects; the session is done before any sending
     with get_db() as db:
-        users = queries.get_users_for_delivery(db)
-
-        for user in users:
-            try:
-                # Get user's timezone
+        users = queries.get_delivery_rows(db)
+        messages = queries.get_message_schedule(db)
+
+    # Local time per timezone, computed once per tick rather than per user
+    now_by_zone: dict[str, datetime] = {}
+
+    for user in users:
+        try:
+            # Get current time in user's timezone
+            zone = user.timezone or "UTC"
+            user_now = now_by_zone.get(zone)
+            if user_now is None:
                 try:
-                    user_tz = pytz.timezone(user.timezone or "UTC")
+                    user_tz = pytz.timezone(zone)
                 except pytz.exceptions.UnknownTimeZoneError:
                     user_tz = pytz.UTC
+                user_now = now_by_zone[zone] = datetime.now(user_tz)
+            user_today = user_now.date()
 
-                # Get current time in user's timezone
-                user_now = datetime.now(user_tz)
-                user_today = user_now.date()
-
-                # Skip if already received message today (in user's timezone!)
-                if user.last_message_date == user_today:
-                    continue
-
-                # Get message for user's current day
-                message = queries.get_message_by_day(db, user.current_day)
-                if not message:
-                    logger.warning(f"No message found for day {user.current_day}")
-                    continue
-
-                # Check if it's time to send (compare hours and minutes)
-                send_time = message.send_time
-                if (
-                    user_now.hour == send_time.hour
-                    and user_now.minute == send_time.minute
-                ):
-                    # Send message if content exists
-                    if message.content:
-                        try:
-                            await bot.send_message(user.telegram_id, message.content)
-                            logger.info(
-                                f"Sent day {user.current_day} message to user {user.telegram_id}"
-                            )
+            # Skip if already received message today (in user's timezone!)
+            if user.last_message_date == user_today:
+                continue
 
-                            # Update user's day (pass user's timezone date)
-                            queries.update_user_day(db, user, user_today)
+            # Get message for user's current day
+            message = messages.get(user.current_day)
+            if not message:
+                logger.warning(f"No message found for day {user.current_day}")
+                continue
+
+            # Check if it's time to send (compare hours and minutes)
+            send_time = message.send_time
+            if (
+                user_now.hour == send_time.hour
+                and user_now.minute == send_time.minute
+            ):
+                # Send message if content exists
+                if message.content:
+                    try:
+                        await sender.send(user.telegram_id, message.content)
+                        logger.info(
+                            f"Sent day {user.current_day} message to user {user.telegram_id}"
+                        )
 
-                        except Exception as e:
-                            logger.error(
-                                f"Failed to send message to {user.telegram_id}: {e}"
+                        # Update user's day (pass user's timezone date)
+                        user_id = user.id
+                        await apply_write(
+                            lambda s: queries.update_user_day(
+                                s, user_id, user_today, commit=False
                             )
-                            # Mark user as inactive if blocked
-                            if "blocked" in str(e).lower():
-                                queries.set_user_active(db, user, False)
-                                logger.info(
-                                    f"User {user.telegram_id} marked inactive (blocked)"
-                                )
-                    else:
-                        logger.warning(
-                            f"Day {user.current_day} has empty content, skipping"
                         )
 
-            except Exception as e:
-                logger.error(f"Error processing user {user.telegram_id}: {e}")
-                continue
+                    except Exception as e:
+                        logger.error(
+                            f"Failed to send message to {user.telegram_id}: {e}"
+                        )
+                        # Mark user as inactive if blocked
+                        if "blocked" in str(e).lower():
+                            user_id = user.id
+                            await apply_write(
+                                lambda s: queries.set_user_active(
+                                    s, s.get(User, user_id), False, commit=False
+                                )
+                            )
+                            logger.info(
+                                f"User {user.telegram_id} marked inactive (blocked)"
+                            )
+                else:
+                    logger.warning(
+                        f"Day {user.current_day} has empty content, skipping"
+                    )
+
+        except Exception as e:
+            logger.error(f"Error processing user {user.telegram_id}: {e}")
+            continue
+
+
+@query_scoped("scheduler")
+async def reconcile_stats() -> None:
+    """Correct any drift in the incrementally maintained statistics counters."""
+    # Alone on the writer: counter increments cannot land between its scan
+    # and its corrections
+    corrected = await apply_write(queries.reconcile_stats, group=False)
+    if corrected:
+        logger.warning(f"Stats reconciliation corrected {corrected} drifted counters")
+    else:
+        logger.debug("Stats reconciliation found no drift")
+
+
+@query_scoped("scheduler")
+async def archive_inactive_users() -> None:
+    """Move long-inactive users to the archive in batches, one transaction each."""
+    cutoff = datetime.utcnow() - timedelta(days=config.ARCHIVE_INACTIVE_AFTER_DAYS)
+    archived = 0
+    while True:
+        moved = await apply_write(
+            lambda s: queries.archive_inactive_users(s, cutoff, config.ARCHIVE_BATCH_SIZE),
+            group=False,
+        )
+        archived += moved
+        if moved < config.ARCHIVE_BATCH_SIZE:
+            break
+    if archived:
+        logger.info(f"Archived {archived} inactive users")
 
 
 def setup_scheduler() -> None:
@@ -94,5 +144,33 @@ def setup_scheduler() -> None:
         replace_existing=True,
     )
 
+    # Periodically rebuild user counters so /stats never needs a full scan
+    scheduler.add_job(
+        reconcile_stats,
+        "interval",
+        minutes=config.STATS_RECONCILE_MINUTES,
+        id="stats_reconciliation",
+        replace_existing=True,
+    )
+
+    # Pick up broadcasts started from the web panel or interrupted by a restart
+    scheduler.add_job(
+        resume_broadcasts,
+        "interval",
+        seconds=config.BROADCAST_POLL_SECONDS,
+        id="broadcast_resume",
+        replace_existing=True,
+    )
+
+    # Keep the users table down to users we can still deliver to
+    if config.ARCHIVE_INACTIVE_AFTER_DAYS > 0:
+        scheduler.add_job(
+            archive_inactive_users,
+            "interval",
+            minutes=config.ARCHIVE_INTERVAL_MINUTES,
+            id="archive_inactive_users",
+            replace_existing=True,
+        )
+
     scheduler.start()
     logger.info("Scheduler started - checking for messages every minute")
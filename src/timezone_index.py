@@ -0,0 +1,287 @@
+"""Offline timezone lookup from coordinates for Telegram 365 Bot.
+
+Lookups never touch the network. The primary index is a precomputed grid of
+IANA zone ids over the whole globe, rasterized from timezone boundary
+polygons by ``tools/build_timezone_grid.py`` and memory-mapped on first use,
+so a lookup is one array read. When no grid file is installed, the nearest of a
+built-in set of reference cities is used instead, and points far from any
+city (e.g. at sea) get the nautical ``Etc/GMT`` zone for their longitude.
+
+Grid file layout (little-endian)::
+
+    b"TZG1"                     magic
+    uint16 cols, uint16 rows    cells cover 360/cols by 180/rows degrees
+    uint16 zone_count           zone ids 1..zone_count, 0 means no zone
+    zone_count x (uint8 len, utf-8 name)
+    rows x cols x uint16        zone id per cell, north to south, west to east
+"""
+import math
+import mmap
+import os
+import struct
+import threading
+from typing import Iterable, Optional
+
+from src.config import config
+
+GRID_MAGIC = b"TZG1"
+
+# Maximum distance to a reference city before falling back to the nautical zone
+MAX_REFERENCE_DISTANCE_KM = 1500
+
+# (IANA zone, latitude, longitude) of cities spread across the populated zones
+REFERENCE_CITIES: tuple[tuple[str, float, float], ...] = (
+    ("Europe/London", 51.51, -0.13),
+    ("Europe/Dublin", 53.35, -6.26),
+    ("Europe/Lisbon", 38.72, -9.14),
+    ("Europe/Madrid", 40.42, -3.70),
+    ("Europe/Paris", 48.86, 2.35),
+    ("Europe/Brussels", 50.85, 4.35),
+    ("Europe/Amsterdam", 52.37, 4.90),
+    ("Europe/Berlin", 52.52, 13.40),
+    ("Europe/Rome", 41.90, 12.50),
+    ("Europe/Zurich", 47.38, 8.54),
+    ("Europe/Vienna", 48.21, 16.37),
+    ("Europe/Prague", 50.08, 14.44),
+    ("Europe/Warsaw", 52.23, 21.01),
+    ("Europe/Stockholm", 59.33, 18.07),
+    ("Europe/Oslo", 59.91, 10.75),
+    ("Europe/Copenhagen", 55.68, 12.57),
+    ("Europe/Helsinki", 60.17, 24.94),
+    ("Europe/Riga", 56.95, 24.11),
+    ("Europe/Vilnius", 54.69, 25.28),
+    ("Europe/Tallinn", 59.44, 24.75),
+    ("Europe/Kiev", 50.45, 30.52),
+    ("Europe/Minsk", 53.90, 27.56),
+    ("Europe/Bucharest", 44.43, 26.10),
+    ("Europe/Sofia", 42.70, 23.32),
+    ("Europe/Athens", 37.98, 23.73),
+    ("Europe/Belgrade", 44.79, 20.45),
+    ("Europe/Budapest", 47.50, 19.04),
+    ("Europe/Istanbul", 41.01, 28.98),
+    ("Europe/Kaliningrad", 54.71, 20.51),
+    ("Europe/Moscow", 55.76, 37.62),
+    ("Europe/Samara", 53.20, 50.15),
+    ("Asia/Yekaterinburg", 56.84, 60.61),
+    ("Asia/Omsk", 54.99, 73.37),
+    ("Asia/Novosibirsk", 55.03, 82.92),
+    ("Asia/Krasnoyarsk", 56.01, 92.87),
+    ("Asia/Irkutsk", 52.29, 104.28),
+    ("Asia/Yakutsk", 62.03, 129.73),
+    ("Asia/Vladivostok", 43.12, 131.89),
+    ("Asia/Magadan", 59.56, 150.81),
+    ("Asia/Kamchatka", 53.02, 158.65),
+    ("Asia/Tbilisi", 41.72, 44.79),
+    ("Asia/Yerevan", 40.18, 44.51),
+    ("Asia/Baku", 40.41, 49.87),
+    ("Asia/Almaty", 43.24, 76.89),
+    ("Asia/Tashkent", 41.30, 69.24),
+    ("Asia/Bishkek", 42.87, 74.59),
+    ("Asia/Dubai", 25.20, 55.27),
+    ("Asia/Riyadh", 24.71, 46.68),
+    ("Asia/Tehran", 35.69, 51.39),
+    ("Asia/Jerusalem", 31.77, 35.21),
+    ("Asia/Baghdad", 33.31, 44.36),
+    ("Asia/Kabul", 34.56, 69.21),
+    ("Asia/Karachi", 24.86, 67.01),
+    ("Asia/Kolkata", 28.61, 77.21),
+    ("Asia/Kathmandu", 27.72, 85.32),
+    ("Asia/Dhaka", 23.81, 90.41),
+    ("Asia/Yangon", 16.87, 96.20),
+    ("Asia/Bangkok", 13.76, 100.50),
+    ("Asia/Jakarta", -6.21, 106.85),
+    ("Asia/Singapore", 1.35, 103.82),
+    ("Asia/Manila", 14.60, 120.98),
+    ("Asia/Shanghai", 31.23, 121.47),
+    ("Asia/Hong_Kong", 22.32, 114.17),
+    ("Asia/Taipei", 25.03, 121.57),
+    ("Asia/Seoul", 37.57, 126.98),
+    ("Asia/Tokyo", 35.68, 139.69),
+    ("Australia/Perth", -31.95, 115.86),
+    ("Australia/Darwin", -12.46, 130.84),
+    ("Australia/Adelaide", -34.93, 138.60),
+    ("Australia/Brisbane", -27.47, 153.03),
+    ("Australia/Sydney", -33.87, 151.21),
+    ("Pacific/Auckland", -36.85, 174.76),
+    ("Pacific/Honolulu", 21.31, -157.86),
+    ("America/Anchorage", 61.22, -149.90),
+    ("America/Vancouver", 49.28, -123.12),
+    ("America/Los_Angeles", 34.05, -118.24),
+    ("America/Phoenix", 33.45, -112.07),
+    ("America/Denver", 39.74, -104.99),
+    ("America/Chicago", 41.88, -87.63),
+    ("America/Mexico_City", 19.43, -99.13),
+    ("America/New_York", 40.71, -74.01),
+    ("America/Toronto", 43.65, -79.38),
+    ("America/Halifax", 44.65, -63.58),
+    ("America/St_Johns", 47.56, -52.71),
+    ("America/Bogota", 4.71, -74.07),
+    ("America/Lima", -12.05, -77.04),
+    ("America/Caracas", 10.48, -66.90),
+    ("America/Santiago", -33.45, -70.67),
+    ("America/Argentina/Buenos_Aires", -34.60, -58.38),
+    ("America/Sao_Paulo", -23.55, -46.63),
+    ("Africa/Casablanca", 33.57, -7.59),
+    ("Africa/Lagos", 6.52, 3.38),
+    ("Africa/Cairo", 30.04, 31.24),
+    ("Africa/Nairobi", -1.29, 36.82),
+    ("Africa/Johannesburg", -26.20, 28.05),
+)
+
+# Offsets offered in the keyboard fallback, mapped to zones. Whole hours use
+# the fixed Etc/GMT zones (whose sign is inverted by POSIX convention).
+OFFSET_ZONES: dict[str, str] = {
+    **{f"{h:+d}": (f"Etc/GMT{-h:+d}" if h else "UTC") for h in range(-12, 15)},
+    "-3:30": "America/St_Johns",
+    "+3:30": "Asia/Tehran",
+    "+4:30": "Asia/Kabul",
+    "+5:30": "Asia/Kolkata",
+    "+5:45": "Asia/Kathmandu",
+    "+6:30": "Asia/Yangon",
+    "+9:30": "Australia/Darwin",
+}
+
+
+def nautical_zone(longitude: float) -> str:
+    """Get the fixed-offset zone used at sea for a longitude."""
+    offset = int(round(longitude / 15.0))
+    offset = max(-12, min(12, offset))
+    return "UTC" if offset == 0 else f"Etc/GMT{-offset:+d}"
+
+
+def _distance_km(lat1: float, lon1: float, lat2: float, lon2: float) -> float:
+    """Equirectangular distance, accurate enough to pick the nearest city."""
+    x = math.radians(lon2 - lon1)
+    if x > math.pi:
+        x -= 2 * math.pi
+    elif x < -math.pi:
+        x += 2 * math.pi
+    x *= math.cos(math.radians((lat1 + lat2) / 2))
+    y = math.radians(lat2 - lat1)
+    return 6371.0 * math.hypot(x, y)
+
+
+class TimezoneGrid:
+    """Memory-mapped grid of zone ids, see the module docstring for the layout."""
+
+    def __init__(self, path: str) -> None:
+        with open(path, "rb") as f:
+            self._mmap = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        if self._mmap[:4] != GRID_MAGIC:
+            raise ValueError(f"{path} is not a timezone grid file")
+        self.cols, self.rows, zone_count = struct.unpack_from("<HHH", self._mmap, 4)
+        offset = 10
+        self.zones: list[Optional[str]] = [None]
+        for _ in range(zone_count):
+            length = self._mmap[offset]
+            self.zones.append(self._mmap[offset + 1:offset + 1 + length].decode("utf-8"))
+            offset += 1 + length
+        self._cells_offset = offset
+
+    def lookup(self, latitude: float, longitude: float) -> Optional[str]:
+        """Get the zone for a point, or None if the cell has no zone."""
+        row = min(int((90.0 - latitude) * self.rows / 180.0), self.rows - 1)
+        col = int((longitude + 180.0) * self.cols / 360.0) % self.cols
+        index = self._cells_offset + 2 * (row * self.cols + col)
+        zone_id = self._mmap[index] | (self._mmap[index + 1] << 8)
+        return self.zones[zone_id] if zone_id < len(self.zones) else None
+
+
+def _fill_polygon(
+    cells: list[int], cols: int, rows: int, rings: list, zone_id: int
+) -> None:
+    """Scanline-fill one polygon (outer ring plus holes, even-odd rule).
+
+    A cell belongs to the polygon when its centre does.
+    """
+    # Bucket each edge's crossing into the rows whose centre latitude it spans,
+    # so the work is proportional to edges plus crossings, not edges x rows
+    crossings: dict[int, list[float]] = {}
+    for ring in rings:
+        for i in range(len(ring)):
+            (lon1, lat1), (lon2, lat2) = ring[i], ring[(i + 1) % len(ring)]
+            if lat1 == lat2:
+                continue
+            # Rows whose centre latitude lies in [low, high)
+            low, high = min(lat1, lat2), max(lat1, lat2)
+            first = max(0, math.floor((90.0 - high) * rows / 180.0 - 0.5) + 1)
+            last = min(rows - 1, math.floor((90.0 - low) * rows / 180.0 - 0.5))
+            for row in range(first, last + 1):
+                lat = 90.0 - (row + 0.5) * 180.0 / rows
+                crossings.setdefault(row, []).append(
+                    lon1 + (lat - lat1) * (lon2 - lon1) / (lat2 - lat1)
+                )
+    for row, lons in crossings.items():
+        lons.sort()
+        for west, east in zip(lons[::2], lons[1::2]):
+            first = max(0, math.ceil((west + 180.0) * cols / 360.0 - 0.5))
+            last = min(cols - 1, math.floor((east + 180.0) * cols / 360.0 - 0.5))
+            for col in range(first, last + 1):
+                cells[row * cols + col] = zone_id
+
+
+def build_grid(features: Iterable[tuple[str, list]], resolution: float) -> bytes:
+    """Rasterize zone polygons into a grid file.
+
+    Args:
+        features: (zone name, list of polygons) pairs, each polygon a list of
+            rings of (longitude, latitude) points as in GeoJSON.
+        resolution: Cell size in degrees.
+
+    Returns:
+        The grid file contents.
+    """
+    cols, rows = round(360 / resolution), round(180 / resolution)
+    cells = [0] * (cols * rows)
+    zones: dict[str, int] = {}
+    for name, polygons in features:
+        zone_id = zones.setdefault(name, len(zones) + 1)
+        for rings in polygons:
+            _fill_polygon(cells, cols, rows, rings, zone_id)
+
+    header = bytearray(GRID_MAGIC + struct.pack("<HHH", cols, rows, len(zones)))
+    for name in zones:
+        encoded = name.encode("utf-8")
+        header += bytes([len(encoded)]) + encoded
+    return bytes(header) + struct.pack(f"<{len(cells)}H", *cells)
+
+
+_grid: Optional[TimezoneGrid] = None
+_grid_loaded = False
+_grid_lock = threading.Lock()
+
+
+def _get_grid() -> Optional[TimezoneGrid]:
+    """Map the grid file on first use; None if it is not installed."""
+    global _grid, _grid_loaded
+    if not _grid_loaded:
+        with _grid_lock:
+            if not _grid_loaded:
+                path = config.TIMEZONE_GRID_PATH
+                if path and os.path.exists(path):
+                    _grid = TimezoneGrid(path)
+                _grid_loaded = True
+    return _grid
+
+
+def has_grid() -> bool:
+    """Check whether lookups use the grid rather than the reference cities."""
+    return _get_grid() is not None
+
+
+def lookup_timezone(latitude: float, longitude: float) -> str:
+    """Get the IANA timezone for coordinates without any network calls."""
+    if not (-90.0 <= latitude <= 90.0 and -180.0 <= longitude <= 180.0):
+        raise ValueError("Coordinates out of range")
+
+    grid = _get_grid()
+    if grid is not None:
+        zone = grid.lookup(latitude, longitude)
+        return zone or nautical_zone(longitude)
+
+    best_zone, best_distance = None, MAX_REFERENCE_DISTANCE_KM
+    for zone, lat, lon in REFERENCE_CITIES:
+        distance = _distance_km(latitude, longitude, lat, lon)
+        if distance < best_distance:
+            best_zone, best_distance = zone, distance
+    return best_zone or nautical_zone(longitude)
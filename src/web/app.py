@@ -2,16 +2,17 @@
 import logging
 from datetime import timedelta
 
-from flask import Flask, render_template
+from flask import Flask, g, render_template, request
 
 from src.config import config
+from src.database.profiling import QueryScope
 
 logger = logging.getLogger(__name__)
 
 
 def create_app() -> Flask:
     """Create and configure the Flask application."""
-    app = Flask(__name__, template_folder="templates")
+    app = Flask(__name__, template_folder="templates", static_folder="static")
 
     # Configure app
     app.secret_key = config.SECRET_KEY
@@ -26,6 +27,25 @@ def create_app() -> Flask:
 
     app.register_blueprint(bp)
 
+    # Fingerprinted stylesheets, cached by browsers; compressed responses
+    from src.web.assets import asset_url, cache_static, compress_response
+
+    app.jinja_env.globals["asset_url"] = asset_url
+    app.after_request(compress_response)
+    app.after_request(cache_static)
+
+    # Count each request's statements; streamed responses finish in teardown
+    @app.before_request
+    def start_query_scope():
+        name = f"{request.method} {request.endpoint or request.path}"
+        g.query_scope = QueryScope("web", name).start()
+
+    @app.teardown_request
+    def finish_query_scope(exc):
+        scope = g.pop("query_scope", None)
+        if scope is not None:
+            scope.finish()
+
     # Register error handlers
     @app.errorhandler(500)
     def internal_server_error(e):
@@ -0,0 +1,118 @@
+"""Static assets and response compression for the web panel.
+
+Stylesheets live in ``src/web/static`` and templates link them with
+``asset_url``, which adds a hash of the file's content to the URL. A request
+for the current hash is answered with a one-year ``immutable`` cache
+header, so browsers fetch each stylesheet once per change instead of
+receiving it inlined in every page.
+
+HTML, JSON, CSS and JavaScript responses of at least ``COMPRESS_MIN_SIZE``
+bytes are compressed with brotli when the client accepts it and the
+optional ``brotli`` package is installed, otherwise with gzip. Streamed
+responses (exports) are left alone; they compress themselves with
+``?gzip=1``.
+"""
+import gzip
+import hashlib
+import os
+from typing import Optional
+
+from flask import Response, current_app, request, url_for
+
+from src.config import config
+
+try:
+    import brotli
+except ImportError:  # optional: gzip only
+    brotli = None
+
+# One year, the conventional "forever" for fingerprinted assets
+STATIC_MAX_AGE = 365 * 24 * 3600
+
+COMPRESSIBLE_TYPES = {
+    "text/html",
+    "text/css",
+    "application/json",
+    "application/javascript",
+    "text/javascript",
+}
+
+# Fast settings: responses are compressed per request, not ahead of time
+GZIP_LEVEL = 6
+BROTLI_QUALITY = 5
+
+# path -> (mtime, fingerprint); rehashed only when a file changes
+_fingerprints: dict[str, tuple[int, str]] = {}
+
+
+def fingerprint(filename: str) -> str:
+    """Short content hash of a file in the static folder."""
+    path = os.path.join(current_app.static_folder, filename)
+    mtime = os.stat(path).st_mtime_ns
+    cached = _fingerprints.get(path)
+    if cached is not None and cached[0] == mtime:
+        return cached[1]
+    with open(path, "rb") as f:
+        digest = hashlib.sha256(f.read()).hexdigest()[:12]
+    _fingerprints[path] = (mtime, digest)
+    return digest
+
+
+def asset_url(filename: str) -> str:
+    """URL of a static file that changes whenever the file does."""
+    return url_for("static", filename=filename, v=fingerprint(filename))
+
+
+def cache_static(response: Response) -> Response:
+    """Let browsers keep fingerprinted static files for a year."""
+    if request.endpoint != "static" or response.status_code != 200:
+        return response
+    version = request.args.get("v")
+    if version and version == fingerprint(request.view_args["filename"]):
+        response.cache_control.no_cache = None
+        response.cache_control.public = True
+        response.cache_control.max_age = STATIC_MAX_AGE
+        response.cache_control.immutable = True
+    return response
+
+
+def choose_encoding() -> Optional[str]:
+    """Best compression the client accepts: "br", "gzip" or None."""
+    accepted = request.accept_encodings
+    if brotli is not None and accepted["br"]:
+        return "br"
+    if accepted["gzip"]:
+        return "gzip"
+    return None
+
+
+def compress_response(response: Response) -> Response:
+    """Compress a complete text response if it is big enough to be worth it."""
+    if (
+        response.status_code != 200
+        or response.mimetype not in COMPRESSIBLE_TYPES
+        or (response.is_streamed and not response.direct_passthrough)
+        or "Content-Encoding" in response.headers
+    ):
+        return response
+    response.vary.add("Accept-Encoding")
+    encoding = choose_encoding()
+    if encoding is None:
+        return response
+
+    # Static files are sent as file wrappers; read them like any other body
+    response.direct_passthrough = False
+    data = response.get_data()
+    if len(data) < config.COMPRESS_MIN_SIZE:
+        return response
+    if encoding == "br":
+        data = brotli.compress(data, quality=BROTLI_QUALITY)
+    else:
+        data = gzip.compress(data, compresslevel=GZIP_LEVEL)
+    response.set_data(data)
+    response.headers["Content-Encoding"] = encoding
+    # Same content, different bytes: the ETag still validates, but weakly
+    etag, weak = response.get_etag()
+    if etag and not weak:
+        response.set_etag(etag, weak=True)
+    return response
@@ -0,0 +1,101 @@
+"""HTTP caching helpers and rendered-fragment cache for the web panel.
+
+Panel pages that only depend on day messages and settings carry an ETag
+derived from ``get_content_version`` (the latest ``updated_at`` of either
+table). A browser revalidating an unchanged page gets a 304 before anything
+is rendered. The ETag also covers a per-process boot id, so new templates
+after a restart are never answered with 304.
+
+Expensive fragments, like the dashboard's message table, are kept rendered
+in ``fragments``. Their keys include the content version, so an entry can
+never outlive the content it was rendered from, and the cache is also
+emptied whenever ``update_message`` or ``set_welcome_message`` runs in this
+process.
+"""
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+from datetime import datetime
+from typing import Any, Callable, Hashable, Optional
+
+from flask import Response, request, session
+from markupsafe import Markup
+from werkzeug.http import is_resource_modified
+
+from src.database import queries
+from src.metrics import metrics
+
+# Changes with every restart, so a deploy never serves pages cached before it
+_BOOT_ID = str(time.time_ns())
+
+
+def make_etag(version: Optional[datetime], *parts: Any) -> str:
+    """ETag for a page built from content at version and the given inputs."""
+    key = repr((_BOOT_ID, version, parts)).encode()
+    return hashlib.sha1(key).hexdigest()[:20]
+
+
+def not_modified(etag: str, last_modified: Optional[datetime] = None) -> Optional[Response]:
+    """A 304 response if the client's copy is current, otherwise None.
+
+    Never answers 304 while a flashed message is waiting to be shown.
+    """
+    if session.get("_flashes"):
+        return None
+    if is_resource_modified(request.environ, etag=etag, last_modified=last_modified):
+        return None
+    metrics.incr("web.not_modified")
+    return with_validators(Response(status=304), etag, last_modified)
+
+
+def with_validators(
+    response: Response, etag: str, last_modified: Optional[datetime] = None
+) -> Response:
+    """Attach cache validators; browsers must revalidate before each use."""
+    response.set_etag(etag)
+    if last_modified is not None:
+        response.last_modified = last_modified
+    response.cache_control.private = True
+    response.cache_control.no_cache = True
+    return response
+
+
+class FragmentCache:
+    """Thread-safe LRU cache of rendered HTML fragments."""
+
+    def __init__(self, max_entries: int = 256) -> None:
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+        self._entries: OrderedDict[Hashable, Markup] = OrderedDict()
+
+    def get_or_render(self, key: Hashable, render: Callable[[], str]) -> Markup:
+        """Return the fragment for key, rendering and storing it on a miss."""
+        with self._lock:
+            fragment = self._entries.get(key)
+            if fragment is not None:
+                self._entries.move_to_end(key)
+        if fragment is not None:
+            metrics.incr("web.fragment_cache.hits")
+            return fragment
+
+        metrics.incr("web.fragment_cache.misses")
+        fragment = Markup(render())
+        with self._lock:
+            self._entries[key] = fragment
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+        return fragment
+
+    def clear(self) -> None:
+        """Drop every cached fragment."""
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._entries)
+
+
+fragments = FragmentCache()
+queries.on_content_change(fragments.clear)
@@ -1,10 +1,13 @@
 """Flask routes for Telegram 365 Bot web admin panel."""
 import logging
+import time
 from datetime import time as dt_time
 from functools import wraps
 
 from flask import (
     Blueprint,
+    Response,
+    abort,
     render_template,
     request,
     redirect,
@@ -12,16 +15,33 @@ from flask import (
     session,
     flash,
     jsonify,
+    make_response,
+    stream_with_context,
 )
+from markupsafe import Markup, escape
 
 from src.config import config
-from src.database import get_db
+from src.database import get_db, get_read_db
 from src.database import queries
+from src.database.slow_queries import slow_queries
+from src.database.writer import apply_write_sync
+from src.exporters import tables as table_export
+from src.importers import users as user_import
+from src.metrics import metrics
+from src.web.cache import fragments, make_etag, not_modified, with_validators
 
 logger = logging.getLogger(__name__)
 
 bp = Blueprint("main", __name__)
 
+# Most days a search shows
+SEARCH_LIMIT = 50
+
+# Dashboard "show" filter -> filled argument of get_message_summaries
+MESSAGE_FILTERS = {"all": None, "filled": True, "empty": False}
+# Most days one /api/messages request returns
+MESSAGES_API_MAX_LIMIT = 200
+
 
 def login_required(f):
     """Decorator to require login for routes."""
@@ -35,6 +55,21 @@ def login_required(f):
     return decorated_function
 
 
+def read_db():
+    """Session for panel reads: the replica, unless this admin just edited.
+
+    Reads go to the primary for READ_YOUR_WRITES_SECONDS after a write from
+    the same browser session, so an edit is never shown as not saved yet.
+    """
+    wrote_at = session.get("wrote_at", 0)
+    return get_read_db(primary=time.time() - wrote_at < config.READ_YOUR_WRITES_SECONDS)
+
+
+def mark_write() -> None:
+    """Record that this browser session just wrote to the primary."""
+    session["wrote_at"] = time.time()
+
+
 @bp.route("/login", methods=["GET", "POST"])
 def login():
     """Login page for web admin panel."""
@@ -63,10 +98,137 @@ def logout():
 @bp.route("/")
 @login_required
 def dashboard():
-    """Dashboard showing all 365 messages."""
-    with get_db() as db:
-        messages = queries.get_all_messages(db)
-        return render_template("dashboard.html", messages=messages)
+    """Dashboard with statistics and one page of day summaries.
+
+    Query parameters: ``page`` (from 1) and ``show`` (all, filled or empty).
+    Invalid values fall back to the first page of all days.
+    """
+    show = request.args.get("show", "all")
+    if show not in MESSAGE_FILTERS:
+        show = "all"
+    page = request.args.get("page", "1")
+    page = int(page) if page.isdigit() and int(page) > 0 else 1
+    page_size = config.DASHBOARD_PAGE_SIZE
+
+    with read_db() as db:
+        version = queries.get_content_version(db)
+        stats = queries.get_stats(db)
+        # Stats change without touching content, so they are part of the
+        # ETag; there is no Last-Modified for the same reason
+        etag = make_etag(version, stats, show, page, page_size)
+        cached = not_modified(etag)
+        if cached is not None:
+            return cached
+
+        def render_table() -> str:
+            messages, total = queries.get_message_summaries(
+                db, (page - 1) * page_size, page_size, MESSAGE_FILTERS[show]
+            )
+            return render_template(
+                "_message_table.html",
+                messages=messages,
+                show=show,
+                page=page,
+                pages=max(1, -(-total // page_size)),
+                total=total,
+                preview_length=queries.MESSAGE_PREVIEW_LENGTH,
+            )
+
+        message_table = fragments.get_or_render(
+            ("dashboard", version, show, page, page_size), render_table
+        )
+        periods = queries.group_active_by_period(stats["active_by_day"])
+        response = make_response(render_template(
+            "dashboard.html", message_table=message_table, stats=stats, periods=periods
+        ))
+    return with_validators(response, etag)
+
+
+@bp.route("/api/messages")
+@login_required
+def messages_api():
+    """Day summaries as JSON for paging through the program.
+
+    Query parameters: ``offset``, ``limit`` (at most MESSAGES_API_MAX_LIMIT)
+    and ``show`` (all, filled or empty). Content is a short preview; the
+    full text is on the edit page.
+    """
+    show = request.args.get("show", "all")
+    if show not in MESSAGE_FILTERS:
+        return jsonify({"error": "show must be all, filled or empty"}), 400
+    offset = request.args.get("offset", "0")
+    limit = request.args.get("limit", str(config.DASHBOARD_PAGE_SIZE))
+    if not offset.isdigit():
+        return jsonify({"error": "offset must be a non-negative integer"}), 400
+    if not limit.isdigit() or not 1 <= int(limit) <= MESSAGES_API_MAX_LIMIT:
+        return jsonify({"error": f"limit must be 1-{MESSAGES_API_MAX_LIMIT}"}), 400
+
+    with read_db() as db:
+        version = queries.get_content_version(db)
+        etag = make_etag(version, "messages", show, offset, limit)
+        cached = not_modified(etag, version)
+        if cached is not None:
+            return cached
+        rows, total = queries.get_message_summaries(
+            db, int(offset), int(limit), MESSAGE_FILTERS[show]
+        )
+    items = [
+        {
+            "day": row.day_number,
+            "send_time": row.send_time.strftime("%H:%M") if row.send_time else None,
+            "preview": row.preview,
+            "length": row.length,
+            "updated_at": row.updated_at.isoformat() if row.updated_at else None,
+        }
+        for row in rows
+    ]
+    response = jsonify(
+        {"total": total, "offset": int(offset), "limit": int(limit), "items": items}
+    )
+    return with_validators(response, etag, version)
+
+
+def _search(q: str) -> tuple[list[dict], float]:
+    """Search day messages, returning results with HTML snippets and the time taken."""
+    started = time.perf_counter()
+    with read_db() as db:
+        rows = queries.search_messages(db, q, limit=SEARCH_LIMIT)
+    elapsed_ms = (time.perf_counter() - started) * 1000
+    results = [
+        {
+            "day": row.day_number,
+            "snippet": Markup(
+                str(escape(row.snippet))
+                .replace(queries.SEARCH_MARK_START, "<mark>")
+                .replace(queries.SEARCH_MARK_STOP, "</mark>")
+            ),
+            "rank": row.rank,
+        }
+        for row in rows
+    ]
+    return results, elapsed_ms
+
+
+@bp.route("/search")
+@login_required
+def search():
+    """Full-text search over day messages."""
+    q = request.args.get("q", "").strip()
+    results, elapsed_ms = _search(q) if q else ([], 0.0)
+    return render_template("search.html", q=q, results=results, elapsed_ms=elapsed_ms)
+
+
+@bp.route("/api/search")
+@login_required
+def search_api():
+    """Full-text search as JSON; snippets are HTML with <mark> around matches."""
+    q = request.args.get("q", "").strip()
+    if not q:
+        return jsonify({"error": "q is required"}), 400
+    results, elapsed_ms = _search(q)
+    for result in results:
+        result["snippet"] = str(result["snippet"])
+    return jsonify({"query": q, "took_ms": round(elapsed_ms, 3), "results": results})
 
 
 @bp.route("/message/<int:day>", methods=["GET", "POST"])
@@ -78,7 +240,14 @@ def edit_message(day: int):
         flash("Invalid day number", "error")
         return redirect(url_for("main.dashboard"))
 
-    with get_db() as db:
+    with read_db() as db:
+        if request.method == "GET":
+            version = queries.get_content_version(db)
+            etag = make_etag(version, "message", day)
+            cached = not_modified(etag, version)
+            if cached is not None:
+                return cached
+
         message = queries.get_message_by_day(db, day)
 
         if request.method == "POST":
@@ -112,17 +281,21 @@ def edit_message(day: int):
                 )
 
             # Update message
-            queries.update_message(db, day, content, send_time)
+            apply_write_sync(
+                lambda s: queries.update_message(s, day, content, send_time), group=False
+            )
+            mark_write()
             logger.info(f"Day {day} message updated via web panel")
             flash("Message saved successfully!", "success")
             return redirect(url_for("main.dashboard"))
 
-        return render_template(
+        response = make_response(render_template(
             "edit_message.html",
             message=message,
             day=day,
             max_length=config.MAX_MESSAGE_LENGTH,
-        )
+        ))
+    return with_validators(response, etag, version)
 
 
 @bp.route("/message/<int:day>/preview")
@@ -137,7 +310,7 @@ def preview_message(day: int):
 @login_required
 def edit_welcome():
     """Edit welcome message."""
-    with get_db() as db:
+    with read_db() as db:
         if request.method == "POST":
             content = request.form.get("content", "")
 
@@ -153,19 +326,193 @@ def edit_welcome():
                     max_length=config.MAX_MESSAGE_LENGTH,
                 )
 
-            queries.set_welcome_message(db, content)
+            apply_write_sync(
+                lambda s: queries.set_welcome_message(s, content, commit=False)
+            )
+            mark_write()
             logger.info("Welcome message updated via web panel")
             flash("Welcome message saved successfully!", "success")
             return redirect(url_for("main.dashboard"))
 
+        version = queries.get_content_version(db)
+        etag = make_etag(version, "welcome")
+        cached = not_modified(etag, version)
+        if cached is not None:
+            return cached
         welcome = queries.get_welcome_message(db)
-        return render_template(
+        response = make_response(render_template(
             "edit_welcome.html",
             content=welcome,
             max_length=config.MAX_MESSAGE_LENGTH,
+        ))
+    return with_validators(response, etag, version)
+
+
+@bp.route("/broadcasts", methods=["GET", "POST"])
+@login_required
+def broadcasts():
+    """Start a broadcast and follow the progress of recent ones."""
+    with read_db() as db:
+        if request.method == "POST":
+            text = request.form.get("text", "").strip()
+
+            if not text:
+                flash("Broadcast text cannot be empty.", "error")
+            elif len(text) > config.MAX_MESSAGE_LENGTH:
+                flash(
+                    f"Message too long. Maximum {config.MAX_MESSAGE_LENGTH} characters.",
+                    "error",
+                )
+            else:
+                # The bot's scheduler picks up running broadcasts within seconds
+                broadcast = apply_write_sync(
+                    lambda s: queries.create_broadcast(s, text).to_dict(), group=False
+                )
+                mark_write()
+                logger.info(f"Broadcast {broadcast['id']} created via web panel")
+                flash(
+                    f"Broadcast #{broadcast['id']} queued for {broadcast['total']} active users.",
+                    "success",
+                )
+                return redirect(url_for("main.broadcasts"))
+
+        recent = queries.get_recent_broadcasts(db)
+        return render_template(
+            "broadcasts.html",
+            broadcasts=[b.to_dict() for b in recent],
+            max_length=config.MAX_MESSAGE_LENGTH,
         )
 
 
+@bp.route("/broadcasts/<int:broadcast_id>/<action>", methods=["POST"])
+@login_required
+def broadcast_action(broadcast_id: int, action: str):
+    """Pause or resume a broadcast."""
+    transitions = {"pause": ("running", "paused"), "resume": ("paused", "running")}
+    if action not in transitions:
+        flash("Unknown broadcast action.", "error")
+        return redirect(url_for("main.broadcasts"))
+
+    with get_db() as db:
+        broadcast = queries.get_broadcast(db, broadcast_id)
+        expected, new_status = transitions[action]
+        if broadcast is None or broadcast.status != expected:
+            flash(f"Broadcast #{broadcast_id} cannot be {action}d now.", "error")
+        else:
+            apply_write_sync(
+                lambda s: queries.set_broadcast_status(
+                    s, queries.get_broadcast(s, broadcast_id), new_status
+                ),
+                group=False,
+            )
+            mark_write()
+            logger.info(f"Broadcast {broadcast_id} {new_status} via web panel")
+            flash(f"Broadcast #{broadcast_id} {new_status}.", "success")
+    return redirect(url_for("main.broadcasts"))
+
+
+@bp.route("/api/broadcasts")
+@login_required
+def broadcasts_progress():
+    """JSON progress of recent broadcasts for live updates."""
+    with read_db() as db:
+        return jsonify([b.to_dict() for b in queries.get_recent_broadcasts(db)])
+
+
+@bp.route("/export/<table>.<fmt>")
+@login_required
+def export_table(table: str, fmt: str):
+    """Stream users or day messages as a CSV or JSON download.
+
+    Query parameters: ``gzip=1`` compresses the download; for users,
+    ``active=1``/``active=0`` and ``day=N`` filter the rows.
+    """
+    if table not in table_export.FIELDS or fmt not in table_export.FORMATS:
+        abort(404)
+
+    filters = {}
+    if table == "users":
+        active = request.args.get("active")
+        if active is not None:
+            if active not in ("0", "1"):
+                return jsonify({"error": "active must be 0 or 1"}), 400
+            filters["active"] = active == "1"
+        day = request.args.get("day")
+        if day is not None:
+            if not day.isdigit() or not 1 <= int(day) <= config.TOTAL_DAYS:
+                return jsonify({"error": f"day must be 1-{config.TOTAL_DAYS}"}), 400
+            filters["day"] = int(day)
+
+    def generate():
+        # The session lives as long as the response is being streamed
+        with read_db() as db:
+            if table == "users":
+                rows = queries.iter_user_rows(db, **filters)
+            else:
+                rows = queries.iter_message_rows(db)
+            yield from table_export.encode(table, fmt, rows)
+
+    filename = f"{table}.{fmt}"
+    chunks = generate()
+    mimetype = table_export.FORMATS[fmt]
+    if request.args.get("gzip") == "1":
+        chunks = table_export.gzip_chunks(chunks)
+        filename += ".gz"
+        mimetype = "application/gzip"
+    logger.info(f"Exporting {filename} via web panel")
+    return Response(
+        stream_with_context(chunks),
+        mimetype=mimetype,
+        headers={"Content-Disposition": f'attachment; filename="{filename}"'},
+    )
+
+
+@bp.route("/import/users", methods=["GET", "POST"])
+@login_required
+def import_users():
+    """Upload a CSV of subscribers and import it in batches."""
+    report = None
+    if request.method == "POST":
+        upload = request.files.get("file")
+        if upload is None or not upload.filename:
+            flash("Choose a CSV file to import.", "error")
+            return redirect(url_for("main.import_users"))
+        try:
+            result = user_import.import_users(
+                upload.stream, update_existing=request.form.get("update_existing") == "1"
+            )
+        except user_import.UserImportError as e:
+            flash(f"Import failed: {e}", "error")
+            return redirect(url_for("main.import_users"))
+        mark_write()
+        report = user_import.format_report(result)
+        logger.info(f"User import via web panel: {report.splitlines()[1]}")
+    return render_template("import_users.html", report=report)
+
+
+@bp.route("/slow-queries", methods=["GET", "POST"])
+@login_required
+def slow_query_log():
+    """Show the slowest recent statements; POST clears the log."""
+    if request.method == "POST":
+        slow_queries.clear()
+        flash("Slow-query log cleared.", "success")
+        return redirect(url_for("main.slow_query_log"))
+    return render_template(
+        "slow_queries.html",
+        entries=slow_queries.entries(),
+        threshold_ms=config.SLOW_QUERY_MS,
+        size=config.SLOW_QUERY_LOG_SIZE,
+    )
+
+
+@bp.route("/api/metrics")
+@login_required
+def metrics_snapshot():
+    """JSON snapshot of bot, scheduler and database metrics."""
+    return jsonify(metrics.snapshot())
+
+
 @bp.route("/api/test/scheduler-performance")
 @login_required
 def test_scheduler_performance():
@@ -248,7 +595,8 @@ def test_scheduler_performance():
         with get_db() as db:
             # Query users (what scheduler does)
             query_start = time.time()
-            users = queries.get_users_for_delivery(db)
+            users = queries.get_delivery_rows(db)
+            messages = queries.get_message_schedule(db)
             query_time = time.time() - query_start
 
             # Process each user
@@ -267,7 +615,7 @@ def test_scheduler_performance():
                     except Exception:
                         user_tz = pytz.UTC
 
-                    message = queries.get_message_by_day(db, user.current_day)
+                    message = messages.get(user.current_day)
                     if message and message.content:
                         messages_prepared += 1
 
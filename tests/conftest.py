@@ -0,0 +1,32 @@
+"""Shared pytest fixtures for Telegram 365 Bot tests."""
+import sys
+import os
+
+import pytest
+
+# Add project root to path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# Load environment variables
+from dotenv import load_dotenv
+load_dotenv()
+
+
+def logged_in_client():
+    """Flask test client for the web panel with an admin session."""
+    from src.database import init_db
+    from src.web import create_app
+
+    init_db()
+    app = create_app()
+    app.testing = True
+    client = app.test_client()
+    with client.session_transaction() as s:
+        s["logged_in"] = True
+    return client
+
+
+@pytest.fixture
+def panel_client():
+    """Logged-in web panel client (``logged_in_client`` for __main__ runs)."""
+    return logged_in_client()
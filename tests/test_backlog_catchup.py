@@ -0,0 +1,123 @@
+"""Unit tests for the startup backlog catch-up."""
+import sys
+import os
+import asyncio
+
+# Add project root to path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# Load environment variables
+from dotenv import load_dotenv
+load_dotenv()
+
+# Importing src.bot creates the Bot instance, which needs a well-formed token
+from src.config import config
+if not config.TELEGRAM_BOT_TOKEN:
+    config.TELEGRAM_BOT_TOKEN = "123456:TEST_TOKEN"
+
+from aiogram import Dispatcher
+from aiogram.types import Update
+
+from src.bot.catchup import drain_backlog
+from src.bot.onboarding import TIMEZONE_PROMPT
+from src.bot.sender import sender
+from src.database import init_db, get_db
+from src.database import queries
+from src.database.models import User
+
+
+class FakeBot:
+    """Serves a fixed backlog through get_updates and records sends."""
+
+    def __init__(self, updates):
+        self.pending = updates
+        self.sent = []
+
+    async def get_updates(self, offset=None, limit=100, timeout=0, allowed_updates=None):
+        if offset is not None:
+            self.pending = [u for u in self.pending if u.update_id >= offset]
+        return self.pending[:limit]
+
+    async def send_message(self, chat_id, text, reply_markup=None):
+        self.sent.append((chat_id, text))
+
+
+def _start_update(update_id, user_id):
+    return Update.model_validate({
+        "update_id": update_id,
+        "message": {
+            "message_id": update_id,
+            "date": 0,
+            "chat": {"id": user_id, "type": "private"},
+            "from": {"id": user_id, "is_bot": False, "first_name": "u", "username": f"u{user_id}"},
+            "text": "/start",
+        },
+    })
+
+
+def test_backlog_is_drained_in_bulk():
+    """
+    Test startup catch-up:
+    1. Queue 250 /start updates from 100 users (some repeated), one inactive
+    2. Drain the backlog
+    3. Verify users are registered or reactivated once each
+    4. Verify exactly one welcome per user was sent, followed by the
+       timezone prompt for new and reactivated users
+    """
+    print("=" * 60)
+    print("Testing backlog catch-up")
+    print("=" * 60)
+
+    init_db()
+    base_id = 720000000
+    with get_db() as db:
+        db.query(User).filter(User.telegram_id >= base_id, User.telegram_id < base_id + 100).delete()
+        db.commit()
+        user = queries.create_user(db, telegram_id=base_id)
+        queries.set_user_active(db, user, False)
+
+    # Step 1: Build backlog
+    updates = [_start_update(i, base_id + i % 100) for i in range(250)]
+    fake_bot = FakeBot(updates)
+    original_bot, original_interval = sender.bot, sender.interval
+    sender.bot, sender.interval = fake_bot, 0.0
+
+    # Step 2: Drain
+    print("\nStep 2: Draining 250 pending updates...")
+    try:
+        summary = asyncio.run(drain_backlog(fake_bot, Dispatcher()))
+    finally:
+        sender.bot, sender.interval = original_bot, original_interval
+    print(f"   Summary: {summary}")
+
+    # Step 3: Verify registrations
+    assert summary["updates"] == 250
+    assert summary["start_users"] == 100
+    assert summary["created"] == 99
+    assert summary["reactivated"] == 1
+    with get_db() as db:
+        active = db.query(User).filter(
+            User.telegram_id >= base_id, User.telegram_id < base_id + 100, User.is_active == True
+        ).count()
+        assert active == 100
+
+    # Step 4: Verify welcomes
+    welcomed = [chat_id for chat_id, text in fake_bot.sent if text != TIMEZONE_PROMPT]
+    prompted = [chat_id for chat_id, text in fake_bot.sent if text == TIMEZONE_PROMPT]
+    print(f"\nStep 4: {len(welcomed)} welcomes and {len(prompted)} timezone prompts sent")
+    assert sorted(welcomed) == [base_id + i for i in range(100)]
+    assert sorted(prompted) == [base_id + i for i in range(100)]
+    for chat_id in prompted:
+        assert fake_bot.sent.index((chat_id, TIMEZONE_PROMPT)) > welcomed.index(chat_id) >= 0
+
+    with get_db() as db:
+        db.query(User).filter(User.telegram_id >= base_id, User.telegram_id < base_id + 100).delete()
+        db.commit()
+
+    print("\n" + "=" * 60)
+    print("TEST PASSED!")
+    print("=" * 60)
+
+
+if __name__ == "__main__":
+    test_backlog_is_drained_in_bulk()
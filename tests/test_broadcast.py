@@ -0,0 +1,121 @@
+"""Unit tests for one-off broadcasts."""
+import sys
+import os
+import asyncio
+
+# Add project root to path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# Load environment variables
+from dotenv import load_dotenv
+load_dotenv()
+
+# Importing src.bot creates the Bot instance, which needs a well-formed token
+from src.config import config
+if not config.TELEGRAM_BOT_TOKEN:
+    config.TELEGRAM_BOT_TOKEN = "123456:TEST_TOKEN"
+
+from aiogram.exceptions import TelegramForbiddenError
+
+from src.bot import broadcast as broadcast_module
+from src.bot.sender import RateLimitedSender
+from src.database import init_db, get_db
+from src.database import queries
+from src.database.models import User, Broadcast
+
+
+class FakeBot:
+    """Records sends, blocks one chat and pauses the broadcast after a number of sends."""
+
+    def __init__(self, blocked_id, pause_after, broadcast_id):
+        self.sent = []
+        self.blocked_id = blocked_id
+        self.pause_after = pause_after
+        self.broadcast_id = broadcast_id
+
+    async def send_message(self, chat_id, text, reply_markup=None):
+        if chat_id == self.blocked_id:
+            raise TelegramForbiddenError(method=None, message="Forbidden: bot was blocked by the user")
+        self.sent.append(chat_id)
+        if len(self.sent) == self.pause_after:
+            with get_db() as db:
+                b = queries.get_broadcast(db, self.broadcast_id)
+                queries.set_broadcast_status(db, b, "paused")
+
+
+def test_broadcast_pause_resume_and_progress():
+    """
+    Test broadcast sending:
+    1. Create 30 active users and a broadcast (batch size 10)
+    2. Pause after the first batch and verify the cursor was saved
+    3. Resume and verify every user got the message exactly once
+    4. Verify blocked users were deactivated and counted as failed
+    """
+    print("=" * 60)
+    print("Testing broadcasts")
+    print("=" * 60)
+
+    init_db()
+    base_id = 740000000
+    with get_db() as db:
+        db.query(User).filter(User.telegram_id >= base_id, User.telegram_id < base_id + 30).delete()
+        db.query(Broadcast).delete()
+        # Deactivate everyone else so only test users are targeted
+        db.query(User).update({User.is_active: False})
+        db.commit()
+        for i in range(30):
+            queries.create_user(db, telegram_id=base_id + i)
+        queries.reconcile_stats(db)
+
+        # Step 1: Create broadcast
+        b = queries.create_broadcast(db, "TEST_BROADCAST")
+        broadcast_id = b.id
+        print(f"\nStep 1: Broadcast #{broadcast_id} to {b.total} users")
+        assert b.total == 30
+
+    original_batch, original_sender = config.BROADCAST_BATCH_SIZE, broadcast_module.sender
+    config.BROADCAST_BATCH_SIZE = 10
+    fake_bot = FakeBot(blocked_id=base_id + 15, pause_after=5, broadcast_id=broadcast_id)
+    try:
+        # Step 2: Pause after first batch
+        broadcast_module.sender = RateLimitedSender(fake_bot, rate=1000, concurrency=4)
+        asyncio.run(broadcast_module.run_broadcast(broadcast_id))
+        with get_db() as db:
+            b = queries.get_broadcast(db, broadcast_id)
+            print(f"\nStep 2: Paused at cursor {b.cursor_user_id}: {b.to_dict()}")
+            assert b.status == "paused"
+            assert b.sent == 10
+
+            # Step 3: Resume
+            queries.set_broadcast_status(db, b, "running")
+        fake_bot.pause_after = None
+        broadcast_module.sender = RateLimitedSender(fake_bot, rate=1000, concurrency=4)
+        asyncio.run(broadcast_module.run_broadcast(broadcast_id))
+    finally:
+        config.BROADCAST_BATCH_SIZE = original_batch
+        broadcast_module.sender = original_sender
+
+    with get_db() as db:
+        b = queries.get_broadcast(db, broadcast_id)
+        print(f"\nStep 3: Finished: {b.to_dict()}")
+        assert b.status == "done"
+        assert sorted(fake_bot.sent) == [base_id + i for i in range(30) if i != 15]
+        assert b.sent == 29 and b.failed == 1 and b.remaining == 0
+
+        # Step 4: Blocked user deactivated
+        blocked = queries.get_user_by_telegram_id(db, base_id + 15)
+        print(f"\nStep 4: Blocked user active = {blocked.is_active}")
+        assert blocked.is_active is False
+
+        db.query(User).filter(User.telegram_id >= base_id, User.telegram_id < base_id + 30).delete()
+        db.query(Broadcast).delete()
+        db.commit()
+        queries.reconcile_stats(db)
+
+    print("\n" + "=" * 60)
+    print("TEST PASSED!")
+    print("=" * 60)
+
+
+if __name__ == "__main__":
+    test_broadcast_pause_resume_and_progress()
@@ -0,0 +1,125 @@
+"""Unit tests for bulk day message import."""
+import sys
+import os
+import io
+import json
+from datetime import time as dt_time
+
+# Add project root to path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# Load environment variables
+from dotenv import load_dotenv
+load_dotenv()
+
+from src.config import config
+from src.database import init_db, get_db
+from src.database import queries
+from src.importers import content as content_import
+
+
+def test_parse_and_validate_documents():
+    """
+    Test import document parsing:
+    1. Parse the same rows from CSV, a JSON array and JSON Lines
+    2. Verify all three produce identical changes
+    3. Verify invalid rows are reported and nothing is accepted silently
+    """
+    print("=" * 60)
+    print("Testing import document parsing")
+    print("=" * 60)
+
+    rows = [
+        {"day": 1, "content": "First, \"quoted\" day", "send_time": "08:15"},
+        {"day": 2, "content": "Second day\nwith a newline"},
+    ]
+    csv_doc = 'day,content,send_time\n1,"First, ""quoted"" day",08:15\n2,"Second day\nwith a newline",\n'
+    json_doc = json.dumps(rows)
+    jsonl_doc = "\n".join(json.dumps(r) for r in rows)
+
+    # Step 1 & 2: Parse all formats
+    print("\nStep 1: Parsing CSV, JSON and JSON Lines...")
+    results = []
+    for name, doc in (("a.csv", csv_doc), ("a.json", json_doc), ("a.jsonl", jsonl_doc)):
+        changes, errors = content_import.validate_rows(
+            content_import.iter_rows(io.BytesIO(doc.encode()), name)
+        )
+        print(f"   {name}: {changes}")
+        assert errors == []
+        results.append(changes)
+    assert results[0] == results[1] == results[2]
+    assert results[0][1] == ('First, "quoted" day', dt_time(8, 15))
+    assert results[0][2][1] is None
+
+    # Step 3: Invalid rows
+    print("\nStep 3: Validating bad rows...")
+    bad = [
+        {"day": 0, "content": "x"},
+        {"day": 5, "content": "x" * (config.MAX_MESSAGE_LENGTH + 1)},
+        {"day": 6, "content": "x", "send_time": "25:00"},
+        {"day": 7, "content": "x"},
+        {"day": 7, "content": "y"},
+    ]
+    changes, errors = content_import.validate_rows(iter(bad))
+    for error in errors:
+        print(f"   {error}")
+    assert len(errors) == 4
+    assert list(changes) == [7]
+
+    print("\n" + "=" * 60)
+    print("TEST PASSED!")
+    print("=" * 60)
+
+
+def test_apply_import_in_one_transaction():
+    """
+    Test applying an import:
+    1. Import content for days 10-12 with one unchanged day
+    2. Verify the diff summary
+    3. Verify the content change callback fired exactly once
+    """
+    print("\n" + "=" * 60)
+    print("Testing import apply")
+    print("=" * 60)
+
+    init_db()
+    with get_db() as db:
+        queries.update_message(db, 12, "TEST_IMPORT_SAME", dt_time(9, 0))
+
+    calls = []
+
+    def record_change():
+        calls.append(1)
+
+    queries.on_content_change(record_change)
+
+    changes = {
+        10: ("TEST_IMPORT_10", dt_time(7, 30)),
+        11: ("TEST_IMPORT_11", None),
+        12: ("TEST_IMPORT_SAME", None),
+    }
+    with get_db() as db:
+        diff = queries.apply_message_import(db, changes)
+    print(f"   Diff: {diff}")
+    print(f"   Summary:\n{content_import.format_summary(diff)}")
+
+    assert diff["changed"] == [10, 11]
+    assert diff["unchanged"] == 1
+    assert diff["content_changed"] == 2
+    assert diff["time_changed"] == 1
+    assert calls == [1]
+
+    with get_db() as db:
+        assert queries.get_message_by_day(db, 10).send_time == dt_time(7, 30)
+        for day in (10, 11, 12):
+            queries.update_message(db, day, "", dt_time(9, 0))
+    queries._content_listeners.remove(record_change)
+
+    print("\n" + "=" * 60)
+    print("TEST PASSED!")
+    print("=" * 60)
+
+
+if __name__ == "__main__":
+    test_parse_and_validate_documents()
+    test_apply_import_in_one_transaction()
@@ -0,0 +1,130 @@
+"""Unit tests for the paginated dashboard and the day summaries API."""
+import sys
+import os
+
+# Add project root to path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# Load environment variables
+from dotenv import load_dotenv
+load_dotenv()
+
+from src.config import config
+from src.database import init_db, get_db
+from src.database import queries
+from src.database.profiling import assert_max_queries
+
+LONG_DAY = 310
+EMPTY_DAY = 311
+
+
+def test_message_summaries():
+    """
+    Test day summaries:
+    1. Content is cut to a preview in SQL, with the full length alongside
+    2. The filled and empty filters split all days between them
+    3. Offset and limit page through the days in order
+    """
+    print("=" * 60)
+    print("Testing day summaries")
+    print("=" * 60)
+
+    init_db()
+    with get_db() as db:
+        saved = {day: queries.get_message_by_day(db, day).content for day in (LONG_DAY, EMPTY_DAY)}
+        queries.update_message(db, LONG_DAY, "Ж" * 4000)
+        queries.update_message(db, EMPTY_DAY, "")
+        try:
+            # Step 1: Preview
+            with assert_max_queries(2) as scope:
+                rows, total = queries.get_message_summaries(db, LONG_DAY - 1, 2)
+            statement = scope.captured[0]
+            print(f"\nStep 1: Day {rows[0].day_number}: preview of {len(rows[0].preview)} "
+                  f"characters, length {rows[0].length}")
+            assert total == config.TOTAL_DAYS
+            assert rows[0].day_number == LONG_DAY
+            assert rows[0].preview == "Ж" * queries.MESSAGE_PREVIEW_LENGTH
+            assert rows[0].length == 4000
+            assert rows[1].length == 0
+            assert "substr(" in statement.lower()
+            assert "messages.content AS" not in statement
+
+            # Step 2: Filters
+            filled_rows, filled = queries.get_message_summaries(db, 0, 1000, filled=True)
+            empty_rows, empty = queries.get_message_summaries(db, 0, 1000, filled=False)
+            print(f"Step 2: {filled} filled + {empty} empty of {total}")
+            assert filled + empty == total
+            assert all(row.length for row in filled_rows)
+            assert not any(row.length for row in empty_rows)
+            assert EMPTY_DAY in [row.day_number for row in empty_rows]
+
+            # Step 3: Paging
+            first, _ = queries.get_message_summaries(db, 0, 10)
+            second, _ = queries.get_message_summaries(db, 10, 10)
+            print(f"Step 3: Pages {first[0].day_number}-{first[-1].day_number}, "
+                  f"{second[0].day_number}-{second[-1].day_number}")
+            assert [r.day_number for r in first + second] == list(range(1, 21))
+        finally:
+            for day, content in saved.items():
+                queries.update_message(db, day, content)
+
+    print("\n" + "=" * 60)
+    print("TEST PASSED!")
+    print("=" * 60)
+
+
+def test_dashboard_pages_and_api(panel_client):
+    """
+    Test the dashboard and /api/messages:
+    1. The dashboard shows one page of days with a pager
+    2. The API returns summaries, never the full content
+    3. Invalid API parameters are rejected
+    """
+    print("=" * 60)
+    print("Testing paginated dashboard")
+    print("=" * 60)
+
+    init_db()
+    client = panel_client
+    with get_db() as db:
+        saved = queries.get_message_by_day(db, LONG_DAY).content
+        queries.update_message(db, LONG_DAY, "Ж" * 4000)
+    try:
+        # Step 1: Pages
+        size = config.DASHBOARD_PAGE_SIZE
+        page = client.get("/?page=2").data.decode()
+        print(f"\nStep 1: Page 2 shows days {size + 1}-{2 * size}")
+        assert f"Day {size + 1}<" in page and f"Day {2 * size}<" in page
+        assert f"Day {size}<" not in page and f"Day {2 * size + 1}<" not in page
+        assert "Page 2 of" in page
+        assert client.get("/?page=abc&show=nope").status_code == 200
+
+        # Step 2: API
+        data = client.get(f"/api/messages?offset={LONG_DAY - 1}&limit=1").get_json()
+        item = data["items"][0]
+        print(f"Step 2: {data['total']} days, item {item['day']} "
+              f"preview {len(item['preview'])}/{item['length']}")
+        assert data["total"] == config.TOTAL_DAYS
+        assert item["day"] == LONG_DAY and item["length"] == 4000
+        assert len(item["preview"]) == queries.MESSAGE_PREVIEW_LENGTH
+        assert set(item) == {"day", "send_time", "preview", "length", "updated_at"}
+
+        # Step 3: Validation
+        assert client.get("/api/messages?show=nope").status_code == 400
+        assert client.get("/api/messages?limit=0").status_code == 400
+        assert client.get("/api/messages?offset=-1").status_code == 400
+        print("Step 3: Invalid parameters rejected")
+    finally:
+        with get_db() as db:
+            queries.update_message(db, LONG_DAY, saved)
+
+    print("\n" + "=" * 60)
+    print("TEST PASSED!")
+    print("=" * 60)
+
+
+if __name__ == "__main__":
+    from tests.conftest import logged_in_client
+
+    test_message_summaries()
+    test_dashboard_pages_and_api(logged_in_client())
@@ -67,7 +67,7 @@ def test_day_cycle():
         print(f"   Before: current_day={old_day}")
 
         # This should cycle back to 1
-        queries.update_user_day(db, user)
+        queries.update_user_day(db, user.id)
         print("   update_user_day() called")
 
     # Step 3: Verify current_day is now 1
@@ -90,7 +90,7 @@ def test_day_cycle():
         user.last_message_date = None
         db.commit()
 
-        queries.update_user_day(db, user)
+        queries.update_user_day(db, user.id)
 
         user = queries.get_user_by_telegram_id(db, test_telegram_id)
         print(f"   After another delivery: current_day={user.current_day}")
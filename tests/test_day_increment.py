@@ -67,7 +67,7 @@ def test_day_increment():
         print(f"   Before: current_day={old_day}, last_message_date={old_date}")
 
         # This is what happens after successful message send
-        queries.update_user_day(db, user)
+        queries.update_user_day(db, user.id)
         print("   update_user_day() called")
 
     # Step 3: Verify current_day is now 51
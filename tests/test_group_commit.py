@@ -0,0 +1,193 @@
+"""Unit tests for the group-commit writer."""
+import sys
+import os
+import asyncio
+
+# Add project root to path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# Load environment variables
+from dotenv import load_dotenv
+load_dotenv()
+
+from src.database import init_db, get_db, engine
+from src.database import queries
+from src.database.models import User
+from src.database.writer import GroupCommitWriter
+from src.metrics import metrics
+
+
+def test_group_commit_batches_and_isolates_failures():
+    """
+    Test the group-commit writer:
+    1. Submit 20 concurrent registrations, one of them a duplicate
+    2. Verify every caller gets its own confirmation or error
+    3. Verify the good writes were committed in fewer transactions than writes
+    4. Verify the duplicate did not roll back its neighbours
+    """
+    print("=" * 60)
+    print("Testing group-commit writer")
+    print("=" * 60)
+
+    init_db()
+    base_id = 710000000
+
+    with get_db() as db:
+        db.query(User).filter(User.telegram_id >= base_id, User.telegram_id < base_id + 100).delete()
+        db.commit()
+        queries.create_user(db, telegram_id=base_id)
+
+    writer = GroupCommitWriter(window_ms=50)
+    writer.start()
+    batches_before = metrics.get_counter("db.group_commit.batches")
+
+    async def register(telegram_id):
+        return await writer.run(
+            lambda s: queries.create_user(s, telegram_id=telegram_id, commit=False).telegram_id
+        )
+
+    async def burst():
+        ids = [base_id + i for i in range(20)]  # base_id already exists
+        return await asyncio.gather(*(register(t) for t in ids), return_exceptions=True)
+
+    # Step 1 & 2: Submit burst
+    print("\nStep 1: Submitting 20 concurrent registrations...")
+    results = asyncio.run(burst())
+    writer.stop()
+    errors = [r for r in results if isinstance(r, Exception)]
+    print(f"   Confirmed: {len(results) - len(errors)}, failed: {len(errors)}")
+    assert len(errors) == 1
+    assert results[1:] == [base_id + i for i in range(1, 20)]
+
+    # Step 3: Verify batching
+    batches = metrics.get_counter("db.group_commit.batches") - batches_before
+    print(f"\nStep 3: Committed in {batches} transactions")
+    assert batches < 19
+
+    # Step 4: Verify neighbours were committed
+    with get_db() as db:
+        count = db.query(User).filter(
+            User.telegram_id >= base_id, User.telegram_id < base_id + 20
+        ).count()
+        print(f"\nStep 4: {count} users stored")
+        assert count == 20
+        db.query(User).filter(User.telegram_id >= base_id, User.telegram_id < base_id + 20).delete()
+        db.commit()
+
+    print("\n" + "=" * 60)
+    print("TEST PASSED!")
+    print("=" * 60)
+
+
+def test_ungrouped_writes_are_serialized():
+    """
+    Test single-writer use of the writer:
+    1. Queue grouped writes around one ungrouped write that commits itself
+    2. Verify all of them apply in submission order
+    3. On SQLite, verify the WAL profile is active
+    """
+    print("=" * 60)
+    print("Testing ungrouped writes on the single writer")
+    print("=" * 60)
+
+    init_db()
+    base_id = 711000000
+    with get_db() as db:
+        db.query(User).filter(User.telegram_id >= base_id, User.telegram_id < base_id + 100).delete()
+        db.commit()
+
+    writer = GroupCommitWriter(window_ms=50)
+    writer.start()
+    try:
+        order = []
+
+        def grouped(n):
+            def write(s):
+                queries.create_user(s, telegram_id=base_id + n, commit=False)
+                order.append(n)
+            return write
+
+        def ungrouped(s):
+            # Commits on its own, like most query helpers
+            queries.create_user(s, telegram_id=base_id + 2)
+            order.append(2)
+
+        futures = [
+            writer.submit(grouped(0)),
+            writer.submit(grouped(1)),
+            writer.submit(ungrouped, group=False),
+            writer.submit(grouped(3)),
+        ]
+        for future in futures:
+            future.result(timeout=5)
+    finally:
+        writer.stop()
+
+    print(f"\nStep 1-2: Applied in order {order}")
+    assert order == [0, 1, 2, 3]
+    with get_db() as db:
+        count = db.query(User).filter(User.telegram_id >= base_id, User.telegram_id < base_id + 100).count()
+        assert count == 4
+        db.query(User).filter(User.telegram_id >= base_id, User.telegram_id < base_id + 100).delete()
+        db.commit()
+
+    if engine.dialect.name == "sqlite":
+        with engine.connect() as conn:
+            mode = conn.exec_driver_sql("PRAGMA journal_mode").scalar()
+            timeout = conn.exec_driver_sql("PRAGMA busy_timeout").scalar()
+        print(f"Step 3: journal_mode={mode}, busy_timeout={timeout}")
+        if engine.url.database not in (None, "", ":memory:"):
+            assert mode == "wal"
+        assert timeout > 0
+
+    print("\n" + "=" * 60)
+    print("TEST PASSED!")
+    print("=" * 60)
+
+
+def test_zero_window_does_not_batch():
+    """
+    Test the writer as SQLite runs it without GROUP_COMMIT_ENABLED:
+    1. Submit 10 concurrent registrations to a writer with no window
+    2. Verify each one is committed in its own transaction
+    """
+    print("=" * 60)
+    print("Testing the writer without group commit")
+    print("=" * 60)
+
+    init_db()
+    base_id = 712000000
+    with get_db() as db:
+        db.query(User).filter(User.telegram_id >= base_id, User.telegram_id < base_id + 100).delete()
+        db.commit()
+
+    writer = GroupCommitWriter(window_ms=0)
+    writer.start()
+    batches_before = metrics.get_counter("db.group_commit.batches")
+
+    async def burst():
+        return await asyncio.gather(*(
+            writer.run(lambda s, t=base_id + i: queries.create_user(s, telegram_id=t, commit=False).telegram_id)
+            for i in range(10)
+        ))
+
+    results = asyncio.run(burst())
+    writer.stop()
+    batches = metrics.get_counter("db.group_commit.batches") - batches_before
+    print(f"\nStep 2: {len(results)} writes in {batches} transactions")
+    assert sorted(results) == [base_id + i for i in range(10)]
+    assert batches == 10
+
+    with get_db() as db:
+        db.query(User).filter(User.telegram_id >= base_id, User.telegram_id < base_id + 100).delete()
+        db.commit()
+
+    print("\n" + "=" * 60)
+    print("TEST PASSED!")
+    print("=" * 60)
+
+
+if __name__ == "__main__":
+    test_group_commit_batches_and_isolates_failures()
+    test_ungrouped_writes_are_serialized()
+    test_zero_window_does_not_batch()
@@ -0,0 +1,139 @@
+"""Unit tests for conditional requests and the rendered-fragment cache."""
+import sys
+import os
+
+# Add project root to path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# Load environment variables
+from dotenv import load_dotenv
+load_dotenv()
+
+from src.database import init_db, get_db
+from src.database import queries
+from src.database.profiling import assert_max_queries
+from src.metrics import metrics
+
+DAY = 320
+
+
+def test_unchanged_pages_come_back_as_304(panel_client):
+    """
+    Test conditional requests:
+    1. The dashboard has an ETag and revalidates to a 304 without rendering
+    2. Editing a day changes the ETag and empties the fragment cache
+    3. The edit page and /api/messages also send Last-Modified
+    4. Changing the welcome message changes the welcome page's ETag
+    5. A pending flash message is never answered with a 304
+    """
+    print("=" * 60)
+    print("Testing conditional requests")
+    print("=" * 60)
+
+    from src.web.cache import fragments
+
+    init_db()
+    client = panel_client
+    with get_db() as db:
+        saved_day = queries.get_message_by_day(db, DAY).content
+        saved_welcome = queries.get_welcome_message(db)
+
+    try:
+        # Step 1: Dashboard
+        first = client.get("/")
+        etag = first.headers["ETag"]
+        assert first.status_code == 200 and "no-cache" in first.headers["Cache-Control"]
+        not_modified_before = metrics.get_counter("web.not_modified")
+        with assert_max_queries(2):
+            second = client.get("/", headers={"If-None-Match": etag})
+        print(f"\nStep 1: ETag {etag}, revalidation {second.status_code}")
+        assert second.status_code == 304 and second.data == b""
+        assert metrics.get_counter("web.not_modified") == not_modified_before + 1
+
+        # Step 2: Edit invalidates
+        assert len(fragments) > 0
+        with get_db() as db:
+            queries.update_message(db, DAY, "ETag test content")
+        print(f"Step 2: Fragments after edit: {len(fragments)}")
+        assert len(fragments) == 0
+        third = client.get("/", headers={"If-None-Match": etag})
+        assert third.status_code == 200 and third.headers["ETag"] != etag
+        hits = metrics.get_counter("web.fragment_cache.hits")
+        client.get("/")
+        assert metrics.get_counter("web.fragment_cache.hits") == hits + 1
+
+        # Step 3: Edit page and API
+        for url in (f"/message/{DAY}", "/api/messages?limit=5"):
+            response = client.get(url)
+            assert "Last-Modified" in response.headers
+            revalidated = client.get(url, headers={"If-None-Match": response.headers["ETag"]})
+            since = client.get(
+                url, headers={"If-Modified-Since": response.headers["Last-Modified"]}
+            )
+            print(f"Step 3: {url}: {revalidated.status_code}, {since.status_code}")
+            assert revalidated.status_code == 304 and since.status_code == 304
+        assert b"ETag test content" in client.get(f"/message/{DAY}").data
+
+        # Step 4: Welcome
+        welcome_etag = client.get("/welcome").headers["ETag"]
+        fragments.get_or_render("probe", lambda: "x")
+        with get_db() as db:
+            queries.set_welcome_message(db, "Cached welcome test")
+        response = client.get("/welcome", headers={"If-None-Match": welcome_etag})
+        print(f"Step 4: Welcome after change: {response.status_code}")
+        assert response.status_code == 200 and b"Cached welcome test" in response.data
+        assert len(fragments) == 0
+
+        # Step 5: Flash
+        etag = client.get("/").headers["ETag"]
+        with client.session_transaction() as s:
+            s["_flashes"] = [("success", "Saved!")]
+        response = client.get("/", headers={"If-None-Match": etag})
+        print(f"Step 5: With a pending flash: {response.status_code}")
+        assert response.status_code == 200 and b"Saved!" in response.data
+    finally:
+        with get_db() as db:
+            queries.update_message(db, DAY, saved_day)
+            queries.set_welcome_message(db, saved_welcome)
+
+    print("\n" + "=" * 60)
+    print("TEST PASSED!")
+    print("=" * 60)
+
+
+def test_fragment_cache_is_bounded():
+    """
+    Test that the fragment cache renders once per key and evicts the least
+    recently used entry when full.
+    """
+    print("=" * 60)
+    print("Testing fragment cache")
+    print("=" * 60)
+
+    from src.web.cache import FragmentCache
+
+    cache = FragmentCache(max_entries=2)
+    renders = []
+
+    def render(name):
+        return lambda: renders.append(name) or f"<p>{name}</p>"
+
+    cache.get_or_render("a", render("a"))
+    cache.get_or_render("b", render("b"))
+    assert cache.get_or_render("a", render("a")) == "<p>a</p>"
+    cache.get_or_render("c", render("c"))  # evicts b
+    cache.get_or_render("b", render("b"))
+    print(f"\nRendered: {renders}")
+    assert renders == ["a", "b", "c", "b"]
+    assert len(cache) == 2
+
+    print("\n" + "=" * 60)
+    print("TEST PASSED!")
+    print("=" * 60)
+
+
+if __name__ == "__main__":
+    from tests.conftest import logged_in_client
+
+    test_unchanged_pages_come_back_as_304(logged_in_client())
+    test_fragment_cache_is_bounded()
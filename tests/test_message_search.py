@@ -0,0 +1,134 @@
+"""Unit tests for full-text search over day messages."""
+import sys
+import os
+
+# Add project root to path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# Load environment variables
+from dotenv import load_dotenv
+load_dotenv()
+
+from sqlalchemy import text
+
+from src.database import init_db, engine, get_db
+from src.database import queries
+from src.database.profiling import assert_max_queries
+
+DAYS = (300, 301, 302)
+
+
+def _days(rows) -> list[int]:
+    return [row.day_number for row in rows if row.day_number in DAYS]
+
+
+def test_search_follows_message_edits():
+    """
+    Test message search:
+    1. Edited days are found by word prefix, case-insensitively, best first
+    2. Snippets mark the matched words
+    3. Editing a day away from a phrase removes it from the results
+    4. Imported content is searchable
+    5. Punctuation and search operators in the query are harmless
+    6. On SQLite the search uses the FTS index
+    """
+    print("=" * 60)
+    print("Testing message search")
+    print("=" * 60)
+
+    init_db()
+    with get_db() as db:
+        saved = {day: queries.get_message_by_day(db, day).content for day in DAYS}
+        try:
+            queries.update_message(db, 300, "Сегодня поговорим о зефирном терпении.")
+            queries.update_message(db, 301, "Зефирное терпение и труд. Зефирное ТЕРПЕНИЕ!")
+            queries.update_message(db, 302, "Patience is a zephyrine virtue")
+
+            # Step 1 & 2: Prefix, case and rank
+            with assert_max_queries(1):
+                rows = queries.search_messages(db, "зефирн терпен")
+            print(f"\nStep 1: Found days {_days(rows)}")
+            assert _days(rows) == [301, 300]
+            snippet = next(row.snippet for row in rows if row.day_number == 301)
+            print(f"Step 2: Snippet {snippet!r}")
+            assert f"{queries.SEARCH_MARK_START}ТЕРПЕНИЕ{queries.SEARCH_MARK_STOP}" in snippet
+
+            # Step 3: Edit away
+            queries.update_message(db, 300, "Сегодня о другом.")
+            assert _days(queries.search_messages(db, "зефирн")) == [301]
+            assert _days(queries.search_messages(db, "другом")) == [300]
+            print("Step 3: Edited day left the results")
+
+            # Step 4: Import
+            queries.apply_message_import(db, {302: ("Zephyrine patience, imported", None)})
+            assert _days(queries.search_messages(db, "imported")) == [302]
+            print("Step 4: Imported content found")
+
+            # Step 5: Hostile input
+            for query in ('"zephyrine" OR (*', "NEAR(", "'; --", "...", ""):
+                queries.search_messages(db, query)
+            assert _days(queries.search_messages(db, '"Zephyrine!"')) == [302]
+            print("Step 5: Operators and punctuation ignored")
+
+            # Step 6: Plan
+            if engine.dialect.name == "sqlite":
+                plan = " ".join(
+                    row[-1] for row in db.execute(text(
+                        "EXPLAIN QUERY PLAN SELECT rowid FROM messages_fts "
+                        "WHERE messages_fts MATCH 'zephyrine'"
+                    ))
+                )
+                print(f"Step 6: {plan}")
+                assert "VIRTUAL TABLE INDEX" in plan
+        finally:
+            for day, content in saved.items():
+                queries.update_message(db, day, content)
+
+    print("\n" + "=" * 60)
+    print("TEST PASSED!")
+    print("=" * 60)
+
+
+def test_search_page(panel_client):
+    """
+    Test the web panel search:
+    1. The page lists matching days with highlighted, escaped snippets
+    2. The JSON API returns the same results
+    """
+    print("=" * 60)
+    print("Testing search page")
+    print("=" * 60)
+
+    init_db()
+    client = panel_client
+
+    with get_db() as db:
+        saved = queries.get_message_by_day(db, 300).content
+        queries.update_message(db, 300, "Use <b>bold</b> zephyrine tags")
+    try:
+        # Step 1: Page
+        page = client.get("/search?q=zephyrine").data.decode()
+        print(f"\nStep 1: Highlighted: {'<mark>zephyrine</mark>' in page}")
+        assert "Day 300" in page
+        assert "<mark>zephyrine</mark>" in page
+        assert "&lt;b&gt;bold&lt;/b&gt;" in page
+
+        # Step 2: API
+        data = client.get("/api/search?q=zephyrine").get_json()
+        print(f"Step 2: API found {[r['day'] for r in data['results']]} in {data['took_ms']}ms")
+        assert 300 in [r["day"] for r in data["results"]]
+        assert client.get("/api/search").status_code == 400
+    finally:
+        with get_db() as db:
+            queries.update_message(db, 300, saved)
+
+    print("\n" + "=" * 60)
+    print("TEST PASSED!")
+    print("=" * 60)
+
+
+if __name__ == "__main__":
+    from tests.conftest import logged_in_client
+
+    test_search_follows_message_edits()
+    test_search_page(logged_in_client())
@@ -0,0 +1,249 @@
+"""Unit tests for schema migrations and the delivery indexes."""
+import sys
+import os
+import tempfile
+
+# Add project root to path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# Load environment variables
+from dotenv import load_dotenv
+load_dotenv()
+
+from alembic.runtime.migration import MigrationContext
+from alembic.script import ScriptDirectory
+from sqlalchemy import create_engine, inspect, text
+from sqlalchemy.orm import Session
+
+from src.config import config
+from src.database import init_db, engine, get_db
+from src.database import queries
+from src.database.models import Message
+from src.database.session import (
+    ALEMBIC_INI,
+    SCHEMA_VERSION_KEY,
+    AlembicConfig,
+    seed_messages,
+    upgrade_schema,
+)
+
+# Schema as Base.metadata.create_all made it before migrations existed
+BASELINE_SCHEMA = """
+CREATE TABLE admins (
+    id INTEGER NOT NULL, telegram_id BIGINT NOT NULL, granted_at DATETIME,
+    PRIMARY KEY (id)
+);
+CREATE UNIQUE INDEX ix_admins_telegram_id ON admins (telegram_id);
+CREATE TABLE messages (
+    id INTEGER NOT NULL, day_number INTEGER NOT NULL, content TEXT,
+    send_time TIME, created_at DATETIME, updated_at DATETIME,
+    PRIMARY KEY (id)
+);
+CREATE UNIQUE INDEX ix_messages_day_number ON messages (day_number);
+CREATE TABLE settings (
+    id INTEGER NOT NULL, "key" VARCHAR(100) NOT NULL, value TEXT,
+    updated_at DATETIME, PRIMARY KEY (id)
+);
+CREATE UNIQUE INDEX ix_settings_key ON settings ("key");
+CREATE TABLE users (
+    id INTEGER NOT NULL, telegram_id BIGINT NOT NULL, username VARCHAR(255),
+    timezone VARCHAR(50), current_day INTEGER, started_at DATETIME,
+    last_message_date DATE, is_active BOOLEAN, created_at DATETIME,
+    updated_at DATETIME, PRIMARY KEY (id)
+);
+CREATE UNIQUE INDEX ix_users_telegram_id ON users (telegram_id);
+INSERT INTO users (telegram_id, username, timezone, current_day, is_active)
+VALUES (555000001, 'baseline', 'UTC', 42, 1);
+INSERT INTO messages (day_number, content) VALUES (1, 'Day one');
+"""
+
+
+def test_schema_at_head_with_delivery_indexes():
+    """
+    Test migrations:
+    1. init_db leaves the database at the latest revision
+    2. The partial delivery indexes exist on users
+    3. On SQLite, the broadcast batch and timezone queries use them
+    """
+    print("=" * 60)
+    print("Testing schema migrations")
+    print("=" * 60)
+
+    init_db()
+    head = ScriptDirectory.from_config(AlembicConfig(ALEMBIC_INI)).get_current_head()
+
+    with engine.connect() as conn:
+        # Step 1: Revision
+        revision = conn.execute(text("SELECT version_num FROM alembic_version")).scalar()
+        print(f"\nStep 1: Database at {revision}, head is {head}")
+        assert revision == head
+
+        # Step 2: Indexes
+        indexes = {ix["name"] for ix in inspect(conn).get_indexes("users")}
+        print(f"Step 2: users indexes: {sorted(indexes)}")
+        assert {"ix_users_active_id", "ix_users_active_timezone_day"} <= indexes
+
+        # Step 3: Query plans
+        if engine.dialect.name == "sqlite":
+            plans = {
+                "ix_users_active_id": "SELECT id, telegram_id FROM users "
+                "WHERE is_active = 1 AND id > 0 ORDER BY id LIMIT 200",
+                "ix_users_active_timezone_day": "SELECT id FROM users WHERE is_active = 1 "
+                "AND timezone = 'UTC' AND current_day = 5",
+            }
+            for index, sql in plans.items():
+                plan = " ".join(
+                    row[-1] for row in conn.execute(text(f"EXPLAIN QUERY PLAN {sql}"))
+                )
+                print(f"Step 3: {plan}")
+                assert index in plan
+
+    print("\n" + "=" * 60)
+    print("TEST PASSED!")
+    print("=" * 60)
+
+
+def test_seeding_is_bulk_and_skipped_when_warm():
+    """
+    Test startup seeding:
+    1. init_db records the schema version
+    2. seed_messages inserts exactly the missing days
+    3. A warm init_db does not touch the day rows
+    4. A changed schema version makes init_db seed again
+    """
+    print("=" * 60)
+    print("Testing startup seeding")
+    print("=" * 60)
+
+    init_db()
+    with get_db() as db:
+        # Step 1: Version marker
+        version = queries.get_setting(db, SCHEMA_VERSION_KEY)
+        print(f"\nStep 1: Schema version {version}")
+        assert version and version.endswith(f":{config.TOTAL_DAYS}")
+
+        # Step 2: Fill gaps
+        db.query(Message).filter(Message.day_number.in_([3, 200])).delete()
+        db.commit()
+        inserted = seed_messages(db)
+        db.commit()
+        print(f"Step 2: Inserted {inserted} missing days")
+        assert inserted == 2
+        assert db.query(Message).count() == config.TOTAL_DAYS
+
+        # Step 3: Warm start skips seeding
+        db.query(Message).filter(Message.day_number == 7).delete()
+        db.commit()
+    init_db()
+    with get_db() as db:
+        count = db.query(Message).count()
+        print(f"Step 3: Warm start left {count} days")
+        assert count == config.TOTAL_DAYS - 1
+
+        # Step 4: Stale version triggers a full init
+        queries.set_setting(db, SCHEMA_VERSION_KEY, "stale")
+    init_db()
+    with get_db() as db:
+        count = db.query(Message).count()
+        print(f"Step 4: Re-initialized with {count} days")
+        assert count == config.TOTAL_DAYS
+        assert queries.get_setting(db, SCHEMA_VERSION_KEY) == version
+
+    print("\n" + "=" * 60)
+    print("TEST PASSED!")
+    print("=" * 60)
+
+
+def test_upgrade_from_baseline_database():
+    """
+    Test upgrading a database created before migrations existed:
+    1. It is stamped at the baseline and migrated to the latest revision
+    2. Tables added since the baseline exist and existing rows are kept
+    3. Statistics can be seeded from it
+    """
+    print("=" * 60)
+    print("Testing upgrade from a baseline database")
+    print("=" * 60)
+
+    head = ScriptDirectory.from_config(AlembicConfig(ALEMBIC_INI)).get_current_head()
+    with tempfile.TemporaryDirectory() as tmp:
+        old = create_engine(f"sqlite:///{os.path.join(tmp, 'baseline.db')}")
+        try:
+            raw = old.raw_connection()
+            raw.executescript(BASELINE_SCHEMA)
+            raw.close()
+
+            # Step 1: Revision
+            upgrade_schema(old)
+            with old.connect() as conn:
+                revision = conn.execute(text("SELECT version_num FROM alembic_version")).scalar()
+                tables = set(inspect(conn).get_table_names())
+                day = conn.execute(
+                    text("SELECT current_day FROM users WHERE telegram_id = 555000001")
+                ).scalar()
+            print(f"\nStep 1: Baseline database upgraded to {revision}")
+            assert revision == head
+
+            # Step 2: New tables
+            print(f"Step 2: Tables: {sorted(tables)}")
+            assert {"stat_counters", "broadcasts", "archived_users"} <= tables
+            assert day == 42
+
+            # Step 3: Statistics
+            with Session(old) as db:
+                queries.reconcile_stats(db)
+                stats = queries.get_stats(db)
+            print(f"Step 3: Stats: {stats['total_users']} users")
+            assert stats["total_users"] == 1
+        finally:
+            old.dispose()
+
+    print("\n" + "=" * 60)
+    print("TEST PASSED!")
+    print("=" * 60)
+
+
+def test_migrations_can_leave_the_transaction():
+    """
+    Test that migrations get a connection outside any transaction, so the
+    autocommit blocks used for CREATE INDEX CONCURRENTLY on PostgreSQL work.
+    Every migration run enters one before migrating.
+    """
+    print("=" * 60)
+    print("Testing autocommit blocks during upgrades")
+    print("=" * 60)
+
+    run_migrations = MigrationContext.run_migrations
+    entered = []
+
+    def run_after_autocommit_block(self, **kw):
+        with self.autocommit_block():
+            entered.append(self.connection.get_execution_options()["isolation_level"])
+        return run_migrations(self, **kw)
+
+    MigrationContext.run_migrations = run_after_autocommit_block
+    with tempfile.TemporaryDirectory() as tmp:
+        old = create_engine(f"sqlite:///{os.path.join(tmp, 'baseline.db')}")
+        try:
+            raw = old.raw_connection()
+            raw.executescript(BASELINE_SCHEMA)
+            raw.close()
+            # Stamp, then upgrade
+            upgrade_schema(old)
+        finally:
+            MigrationContext.run_migrations = run_migrations
+            old.dispose()
+
+    print(f"\nAutocommit blocks entered: {entered}")
+    assert entered == ["AUTOCOMMIT", "AUTOCOMMIT"]
+
+    print("\n" + "=" * 60)
+    print("TEST PASSED!")
+    print("=" * 60)
+
+
+if __name__ == "__main__":
+    test_schema_at_head_with_delivery_indexes()
+    test_seeding_is_bulk_and_skipped_when_warm()
+    test_upgrade_from_baseline_database()
+    test_migrations_can_leave_the_transaction()
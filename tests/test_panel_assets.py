@@ -0,0 +1,138 @@
+"""Unit tests for the panel's static assets and response compression."""
+import sys
+import os
+import gzip
+import re
+
+import pytest
+
+# Add project root to path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# Load environment variables
+from dotenv import load_dotenv
+load_dotenv()
+
+from src.config import config
+from src.database import init_db
+from src.web.assets import brotli
+
+
+def test_fingerprinted_stylesheets(panel_client):
+    """
+    Test static assets:
+    1. Pages link their stylesheets by content hash instead of inlining CSS
+    2. The current hash is cached for a year, a stale one is not
+    """
+    print("=" * 60)
+    print("Testing fingerprinted stylesheets")
+    print("=" * 60)
+
+    init_db()
+    client = panel_client
+
+    # Step 1: Links
+    page = client.get("/").data.decode()
+    links = re.findall(r'<link rel="stylesheet" href="([^"]+)">', page)
+    print(f"\nStep 1: {links}")
+    assert "<style>" not in page
+    assert any(link.startswith("/static/css/panel.css?v=") for link in links)
+    assert any(link.startswith("/static/css/dashboard.css?v=") for link in links)
+
+    # Step 2: Cache headers
+    response = client.get(links[0])
+    print(f"Step 2: {response.headers['Cache-Control']}")
+    assert response.status_code == 200
+    assert "max-age=31536000" in response.headers["Cache-Control"]
+    assert "immutable" in response.headers["Cache-Control"]
+    assert "no-cache" not in response.headers["Cache-Control"]
+    response.close()
+    stale = client.get("/static/css/panel.css?v=000000000000")
+    assert "immutable" not in stale.headers.get("Cache-Control", "")
+    stale.close()
+
+    print("\n" + "=" * 60)
+    print("TEST PASSED!")
+    print("=" * 60)
+
+
+def test_response_compression(panel_client):
+    """
+    Test compression:
+    1. A large HTML page is gzipped when accepted and unchanged once decoded
+    2. Its ETag still revalidates to a 304
+    3. Small, streamed and non-accepting responses are sent as is
+    """
+    print("=" * 60)
+    print("Testing response compression")
+    print("=" * 60)
+
+    init_db()
+    client = panel_client
+
+    # Step 1: Gzip
+    plain = client.get("/")
+    compressed = client.get("/", headers={"Accept-Encoding": "gzip"})
+    print(f"\nStep 1: {len(plain.data)} -> {len(compressed.data)} bytes")
+    assert compressed.headers["Content-Encoding"] == "gzip"
+    assert "Accept-Encoding" in compressed.headers["Vary"]
+    assert gzip.decompress(compressed.data) == plain.data
+    assert "Content-Encoding" not in plain.headers
+
+    # Step 2: Revalidation
+    etag = compressed.headers["ETag"]
+    revalidated = client.get("/", headers={"Accept-Encoding": "gzip", "If-None-Match": etag})
+    print(f"Step 2: ETag {etag} -> {revalidated.status_code}")
+    assert etag.startswith("W/")
+    assert revalidated.status_code == 304
+
+    # Step 3: Left alone
+    small = client.get("/message/1/preview?content=hi", headers={"Accept-Encoding": "gzip"})
+    assert len(small.data) < config.COMPRESS_MIN_SIZE
+    assert "Content-Encoding" not in small.headers
+    streamed = client.get("/export/messages.csv", headers={"Accept-Encoding": "gzip"})
+    assert "Content-Encoding" not in streamed.headers
+    print("Step 3: Small and streamed responses not compressed")
+
+    # Without Brotli, clients offering br get gzip
+    if brotli is None:
+        response = client.get("/", headers={"Accept-Encoding": "gzip, br"})
+        assert response.headers["Content-Encoding"] == "gzip"
+
+    print("\n" + "=" * 60)
+    print("TEST PASSED!")
+    print("=" * 60)
+
+
+@pytest.mark.skipif(brotli is None, reason="Brotli is not installed")
+def test_brotli_compression(panel_client):
+    """
+    Test that brotli is preferred over gzip when the optional Brotli package
+    is installed, and decodes to the same page.
+    """
+    print("=" * 60)
+    print("Testing brotli compression")
+    print("=" * 60)
+
+    init_db()
+    client = panel_client
+
+    plain = client.get("/")
+    response = client.get("/", headers={"Accept-Encoding": "gzip, br"})
+    print(f"\n{len(plain.data)} -> {len(response.data)} bytes "
+          f"({response.headers['Content-Encoding']})")
+    assert response.headers["Content-Encoding"] == "br"
+    assert brotli.decompress(response.data) == plain.data
+
+    print("\n" + "=" * 60)
+    print("TEST PASSED!")
+    print("=" * 60)
+
+
+if __name__ == "__main__":
+    from tests.conftest import logged_in_client
+
+    test_fingerprinted_stylesheets(logged_in_client())
+    test_response_compression(logged_in_client())
+    if brotli is not None:
+        test_brotli_compression(logged_in_client())
@@ -0,0 +1,80 @@
+"""Unit tests for connection pool configuration and metrics."""
+import sys
+import os
+import tempfile
+
+# Add project root to path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# Load environment variables
+from dotenv import load_dotenv
+load_dotenv()
+
+from sqlalchemy import create_engine, exc, text
+
+from src.config import config
+from src.database.pool import MeteredQueuePool, engine_options, instrument_pool
+from src.metrics import metrics
+
+
+def test_pool_exhaustion_shows_in_metrics():
+    """
+    Test pool metrics:
+    1. Build a pool of size 1 with 1 overflow from Config
+    2. Check out two connections and verify the overflow is recorded
+    3. Check out a third and verify the timeout is recorded
+    4. Return them and verify the checked-out gauge drops
+    """
+    print("=" * 60)
+    print("Testing connection pool metrics")
+    print("=" * 60)
+
+    saved = (config.DB_POOL_SIZE, config.DB_MAX_OVERFLOW, config.DB_POOL_TIMEOUT)
+    config.DB_POOL_SIZE, config.DB_MAX_OVERFLOW, config.DB_POOL_TIMEOUT = 1, 1, 0.1
+    tmp = tempfile.TemporaryDirectory()
+    try:
+        url = f"sqlite:///{os.path.join(tmp.name, 'pool.db')}"
+        options = engine_options(url)
+        assert options["poolclass"] is MeteredQueuePool
+        engine = create_engine(url, **options)
+        instrument_pool(engine)
+
+        # Step 2: Overflow
+        overflow_before = metrics.get_counter("db.pool.overflow_opened")
+        timeouts_before = metrics.get_counter("db.pool.timeouts")
+        first = engine.connect()
+        second = engine.connect()
+        second.execute(text("SELECT 1"))
+        snapshot = metrics.snapshot()
+        print(f"\nStep 2: checked_out={snapshot['gauges']['db.pool.checked_out']}")
+        assert metrics.get_counter("db.pool.overflow_opened") == overflow_before + 1
+        assert snapshot["gauges"]["db.pool.checked_out"] == 2
+
+        # Step 3: Timeout
+        try:
+            engine.connect()
+            assert False, "pool should be exhausted"
+        except exc.TimeoutError:
+            pass
+        print(f"Step 3: timeouts={metrics.get_counter('db.pool.timeouts')}")
+        assert metrics.get_counter("db.pool.timeouts") == timeouts_before + 1
+        assert metrics.snapshot()["timings"]["db.pool.checkout_wait"]["max_ms"] >= 100
+
+        # Step 4: Check in
+        first.close()
+        second.close()
+        snapshot = metrics.snapshot()
+        print(f"Step 4: checked_out={snapshot['gauges']['db.pool.checked_out']}")
+        assert snapshot["gauges"]["db.pool.checked_out"] == 0
+        engine.dispose()
+    finally:
+        config.DB_POOL_SIZE, config.DB_MAX_OVERFLOW, config.DB_POOL_TIMEOUT = saved
+        tmp.cleanup()
+
+    print("\n" + "=" * 60)
+    print("TEST PASSED!")
+    print("=" * 60)
+
+
+if __name__ == "__main__":
+    test_pool_exhaustion_shows_in_metrics()
@@ -0,0 +1,162 @@
+"""Unit tests for per-scope query counting and N+1 detection."""
+import sys
+import os
+import asyncio
+
+# Add project root to path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# Load environment variables
+from dotenv import load_dotenv
+load_dotenv()
+
+from src.config import config
+from src.database import init_db, get_db
+from src.database import queries
+from src.database.models import User
+from src.database.profiling import QueryScope, assert_max_queries, query_scoped
+from src.database.writer import GroupCommitWriter, writer
+from src.metrics import metrics
+
+TEST_ID = 666000001
+
+
+def test_assert_max_queries_on_hot_paths():
+    """
+    Test the statement budget of hot query paths:
+    1. A scheduler tick's reads take one statement each
+    2. Registering a user stays within its budget
+    3. A per-day message lookup in a loop exceeds the budget and is reported
+    """
+    print("=" * 60)
+    print("Testing statement budgets")
+    print("=" * 60)
+
+    init_db()
+    with get_db() as db:
+        db.query(User).filter(User.telegram_id == TEST_ID).delete()
+        db.commit()
+
+        # Step 1: Scheduler tick reads
+        with assert_max_queries(2) as scope:
+            queries.get_delivery_rows(db)
+            queries.get_message_schedule(db)
+        print(f"\nStep 1: Tick reads ran {scope.statements} statements")
+
+        # Step 2: Registration
+        with assert_max_queries(2) as scope:
+            queries.create_user(db, telegram_id=TEST_ID, username="scope_test")
+        print(f"Step 2: create_user ran {scope.statements} statements")
+
+        # Step 3: N+1
+        try:
+            with assert_max_queries(2):
+                for day in range(1, 6):
+                    queries.get_message_by_day(db, day)
+            assert False, "the loop should exceed its budget"
+        except AssertionError as e:
+            print(f"Step 3: Budget exceeded:\n{str(e).splitlines()[0]}")
+            assert "5 ran" in str(e)
+            assert "messages" in str(e)
+
+        db.query(User).filter(User.telegram_id == TEST_ID).delete()
+        db.commit()
+        queries.reconcile_stats(db)
+
+    print("\n" + "=" * 60)
+    print("TEST PASSED!")
+    print("=" * 60)
+
+
+def test_scope_thresholds_and_nesting():
+    """
+    Test scope reporting:
+    1. The same SELECT repeated past the threshold is flagged as N+1
+    2. Nested scopes count statements in both
+    3. A scope under every threshold is not flagged
+    4. Writes queued on the writer thread count against the caller's scope
+    """
+    print("=" * 60)
+    print("Testing scope thresholds")
+    print("=" * 60)
+
+    init_db()
+    saved = config.QUERY_SCOPE_REPEAT_THRESHOLD
+    config.QUERY_SCOPE_REPEAT_THRESHOLD = 3
+    try:
+        flagged_before = metrics.get_counter("db.scope.scheduler.flagged")
+
+        # Step 1 & 2: N+1 inside a nested scope
+        @query_scoped("scheduler")
+        async def tick():
+            with QueryScope("test", "inner") as inner, get_db() as db:
+                for day in range(1, 4):
+                    queries.get_message_by_day(db, day)
+            return inner
+
+        outer = QueryScope("test", "outer")
+        with outer:
+            inner = asyncio.run(tick())
+        print(f"\nStep 1: Flagged: {inner.problems}")
+        assert any("possible N+1, ran 3 times" in p for p in inner.problems)
+        assert metrics.get_counter("db.scope.scheduler.flagged") == flagged_before + 1
+        print(f"Step 2: inner={inner.statements}, outer={outer.statements}")
+        assert inner.statements == 3 and outer.statements == 3
+
+        # Step 3: Not flagged
+        with QueryScope("test", "quiet") as quiet, get_db() as db:
+            queries.get_message_schedule(db)
+        print(f"Step 3: Quiet scope problems: {quiet.problems}")
+        assert quiet.statements == 1 and not quiet.problems
+    finally:
+        config.QUERY_SCOPE_REPEAT_THRESHOLD = saved
+
+    # Step 4: Writer thread
+    test_writer = GroupCommitWriter(window_ms=1)
+    test_writer.start()
+    try:
+        with QueryScope("test", "writer") as scope:
+            test_writer.submit(lambda s: queries.get_setting(s, "welcome_message")).result()
+        print(f"Step 4: Writer statements counted: {scope.statements}")
+        assert scope.statements == 1
+    finally:
+        test_writer.stop()
+    assert not writer.running
+
+    print("\n" + "=" * 60)
+    print("TEST PASSED!")
+    print("=" * 60)
+
+
+def test_web_request_scope(panel_client):
+    """
+    Test that each web panel request runs in its own scope.
+    """
+    print("=" * 60)
+    print("Testing web request scopes")
+    print("=" * 60)
+
+    init_db()
+    client = panel_client
+
+    before = metrics.snapshot()["timings"].get("db.scope.web", {}).get("count", 0)
+    statements = metrics.get_counter("db.scope.web.statements")
+    assert client.get("/").status_code == 200
+    assert client.get("/export/messages.csv").status_code == 200
+    after = metrics.snapshot()["timings"]["db.scope.web"]["count"]
+    counted = metrics.get_counter("db.scope.web.statements") - statements
+    print(f"\nScopes finished: {after - before}, statements counted: {counted}")
+    assert after == before + 2
+    assert counted >= 2
+
+    print("\n" + "=" * 60)
+    print("TEST PASSED!")
+    print("=" * 60)
+
+
+if __name__ == "__main__":
+    from tests.conftest import logged_in_client
+
+    test_assert_max_queries_on_hot_paths()
+    test_scope_thresholds_and_nesting()
+    test_web_request_scope(logged_in_client())
@@ -0,0 +1,132 @@
+"""Unit tests for read-replica routing, using two SQLite files."""
+import sys
+import os
+import tempfile
+
+# Add project root to path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# Load environment variables
+from dotenv import load_dotenv
+load_dotenv()
+
+from sqlalchemy import create_engine, event
+from sqlalchemy.orm import sessionmaker
+
+from src.database import init_db, get_db, engine
+from src.database import queries
+from src.database.models import Base, Setting
+from src.database.session import ReadSessionLocal, RoutingSession
+
+
+def _make_replica(path: str):
+    """Create a read-only SQLite 'replica' with a different welcome message."""
+    replica = create_engine(f"sqlite:///{path}", connect_args={"check_same_thread": False})
+    Base.metadata.create_all(replica)
+    with sessionmaker(bind=replica)() as db:
+        db.add(Setting(key="welcome_message", value="from replica"))
+        db.commit()
+
+    @event.listens_for(replica, "connect")
+    def _query_only(dbapi_connection, connection_record):
+        dbapi_connection.execute("PRAGMA query_only=1")
+
+    replica.dispose()
+    return replica
+
+
+def test_routing_session():
+    """
+    Test the routing session:
+    1. Reads go to the replica
+    2. A session pinned to the primary reads the primary
+    3. Writes from a routing session land on the primary
+    """
+    print("=" * 60)
+    print("Testing read-replica routing")
+    print("=" * 60)
+
+    init_db()
+    with get_db() as db:
+        queries.set_welcome_message(db, "from primary")
+        db.query(Setting).filter(Setting.key == "replica_test").delete()
+        db.commit()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        replica = _make_replica(os.path.join(tmp, "replica.db"))
+        factory = sessionmaker(class_=RoutingSession, bind=engine, replica=replica)
+
+        # Step 1: Replica read
+        with factory() as db:
+            welcome = queries.get_welcome_message(db)
+        print(f"\nStep 1: Routed read -> {welcome}")
+        assert welcome == "from replica"
+
+        # Step 2: Pinned read
+        with factory(info={"primary": True}) as db:
+            welcome = queries.get_welcome_message(db)
+        print(f"Step 2: Pinned read -> {welcome}")
+        assert welcome == "from primary"
+
+        # Step 3: Write
+        with factory() as db:
+            queries.set_setting(db, "replica_test", "written")
+        with get_db() as db:
+            assert queries.get_setting(db, "replica_test") == "written"
+            db.query(Setting).filter(Setting.key == "replica_test").delete()
+            db.commit()
+        print("Step 3: Write landed on the primary")
+        replica.dispose()
+
+    print("\n" + "=" * 60)
+    print("TEST PASSED!")
+    print("=" * 60)
+
+
+def test_panel_reads_your_writes():
+    """
+    Test the web panel with a replica:
+    1. A fresh panel session reads the welcome message from the replica
+    2. After saving, the same session reads it back from the primary
+    """
+    print("=" * 60)
+    print("Testing read-your-writes in the web panel")
+    print("=" * 60)
+
+    from src.web import create_app
+
+    init_db()
+    with tempfile.TemporaryDirectory() as tmp:
+        replica = _make_replica(os.path.join(tmp, "replica.db"))
+        saved = ReadSessionLocal.kw.get("replica")
+        ReadSessionLocal.kw["replica"] = replica
+        try:
+            app = create_app()
+            app.testing = True
+            client = app.test_client()
+            with client.session_transaction() as s:
+                s["logged_in"] = True
+
+            # Step 1: Replica
+            page = client.get("/welcome").data.decode()
+            print(f"\nStep 1: Replica content shown: {'from replica' in page}")
+            assert "from replica" in page
+
+            # Step 2: Edit, then read back
+            response = client.post("/welcome", data={"content": "edited on primary"})
+            assert response.status_code == 302
+            page = client.get("/welcome").data.decode()
+            print(f"Step 2: Edit visible right away: {'edited on primary' in page}")
+            assert "edited on primary" in page
+        finally:
+            ReadSessionLocal.kw["replica"] = saved
+            replica.dispose()
+
+    print("\n" + "=" * 60)
+    print("TEST PASSED!")
+    print("=" * 60)
+
+
+if __name__ == "__main__":
+    test_routing_session()
+    test_panel_reads_your_writes()
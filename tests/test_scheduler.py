@@ -158,7 +158,7 @@ def test_scheduler_logic():
         print(f"   Current day before: {old_day}")
 
         # Simulate what happens after message is sent
-        queries.update_user_day(db, user)
+        queries.update_user_day(db, user.id)
 
         user = queries.get_user_by_telegram_id(db, test_telegram_id)
         new_day = user.current_day
@@ -191,7 +191,49 @@ def test_scheduler_logic():
     return True
 
 
+def test_delivery_rows_match_users():
+    """
+    Test the scheduler's compact projections:
+    1. get_delivery_rows returns the same active users as the ORM query
+    2. Rows carry only the delivery columns
+    3. get_message_schedule covers every day with content and send time
+    """
+    print("=" * 60)
+    print("Testing delivery row projections")
+    print("=" * 60)
+
+    init_db()
+    with get_db() as db:
+        columns = ("id", "telegram_id", "timezone", "current_day", "last_message_date")
+        # Step 1: Same users
+        expected = {
+            tuple(getattr(user, name) for name in columns)
+            for user in queries.get_users_for_delivery(db)
+        }
+        rows = queries.get_delivery_rows(db)
+        print(f"\nStep 1: {len(rows)} rows, {len(expected)} users")
+        assert {tuple(row) for row in rows} == expected
+
+        # Step 2: Columns
+        if rows:
+            print(f"Step 2: Row fields {rows[0]._fields}")
+            assert rows[0]._fields == columns
+
+        # Step 3: Schedule
+        schedule = queries.get_message_schedule(db)
+        day_one = queries.get_message_by_day(db, 1)
+        print(f"Step 3: {len(schedule)} days scheduled")
+        assert len(schedule) == db.query(Message).count()
+        assert schedule[1].content == day_one.content
+        assert schedule[1].send_time == day_one.send_time
+
+    print("\n" + "=" * 60)
+    print("TEST PASSED!")
+    print("=" * 60)
+
+
 if __name__ == "__main__":
+    test_delivery_rows_match_users()
     result = test_scheduler_logic()
     if result:
         print("\nFEATURE #5: PASSED")
@@ -0,0 +1,115 @@
+"""Unit tests for the slow-query log."""
+import sys
+import os
+
+# Add project root to path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# Load environment variables
+from dotenv import load_dotenv
+load_dotenv()
+
+from src.config import config
+from src.database import init_db, get_db
+from src.database import queries
+from src.database.profiling import QueryScope
+from src.database.slow_queries import SlowQueryLog, parameter_shape, slow_queries
+
+
+def test_parameter_shape():
+    """
+    Test that parameters are described by type, never by value.
+    """
+    print("=" * 60)
+    print("Testing parameter shapes")
+    print("=" * 60)
+
+    shapes = [
+        parameter_shape({"day_number_1": 5, "content": "secret"}),
+        parameter_shape((5, "secret", None)),
+        parameter_shape([(1, "a"), (2, "b")], executemany=True),
+        parameter_shape(tuple(range(15))),
+    ]
+    for shape in shapes:
+        print(shape)
+    assert shapes[0] == "{day_number_1: int, content: str}"
+    assert shapes[1] == "(int, str, NoneType)"
+    assert shapes[2] == "2 x (int, str)"
+    assert shapes[3].endswith("... 5 more)")
+    assert not any("secret" in shape for shape in shapes)
+
+    print("\n" + "=" * 60)
+    print("TEST PASSED!")
+    print("=" * 60)
+
+
+def test_slow_queries_recorded_with_plan(panel_client):
+    """
+    Test the slow-query log:
+    1. Statements over the threshold are recorded with caller and plan
+    2. Nothing is recorded while the log is off
+    3. The buffer keeps only the most recent entries
+    4. The web panel lists entries and clears them
+    """
+    print("=" * 60)
+    print("Testing slow-query log")
+    print("=" * 60)
+
+    init_db()
+    saved = (config.SLOW_QUERY_MS, config.SLOW_QUERY_EXPLAIN)
+    slow_queries.clear()
+    try:
+        # Step 1: Everything counts as slow
+        config.SLOW_QUERY_MS, config.SLOW_QUERY_EXPLAIN = 0.000001, True
+        with QueryScope("test", "lookup"), get_db() as db:
+            queries.get_message_by_day(db, 7)
+        entries = slow_queries.entries()
+        entry = next(e for e in entries if "FROM messages" in e["statement"])
+        print(f"\nStep 1: {entry['duration_ms']}ms in {entry['caller']}, "
+              f"parameters {entry['parameters']}\n{entry['plan']}")
+        assert entry["caller"] == "test lookup"
+        assert "int" in entry["parameters"]
+        assert entry["plan"] and "messages" in entry["plan"]
+
+        # Step 2: Off
+        slow_queries.clear()
+        config.SLOW_QUERY_MS = 0
+        with get_db() as db:
+            queries.get_message_by_day(db, 7)
+        print(f"Step 2: Recorded while off: {len(slow_queries.entries())}")
+        assert slow_queries.entries() == []
+    finally:
+        config.SLOW_QUERY_MS, config.SLOW_QUERY_EXPLAIN = saved
+
+    # Step 3: Bounded
+    log = SlowQueryLog(3)
+    for i in range(5):
+        log.record(None, f"UPDATE t SET x = {i}", (), False, i / 1000, "test")
+    durations = [e["duration_ms"] for e in log.entries()]
+    print(f"Step 3: Kept {durations}")
+    assert durations == [4.0, 3.0, 2.0]
+
+    # Step 4: Web panel
+    slow_queries.record(None, "SELECT 42 AS answer", (), False, 1.5, "test panel")
+    client = panel_client
+    config.SLOW_QUERY_MS = 100
+    try:
+        page = client.get("/slow-queries").data.decode()
+        assert "SELECT 42 AS answer" in page and "test panel" in page
+        client.post("/slow-queries")
+        page = client.get("/slow-queries").data.decode()
+        print(f"Step 4: Listed, then cleared: {'SELECT 42' not in page}")
+        assert "SELECT 42" not in page
+    finally:
+        config.SLOW_QUERY_MS = saved[0]
+
+    print("\n" + "=" * 60)
+    print("TEST PASSED!")
+    print("=" * 60)
+
+
+if __name__ == "__main__":
+    from tests.conftest import logged_in_client
+
+    test_parameter_shape()
+    test_slow_queries_recorded_with_plan(logged_in_client())
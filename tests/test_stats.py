@@ -0,0 +1,133 @@
+"""Unit tests for incrementally maintained admin statistics."""
+import sys
+import os
+import asyncio
+from datetime import date
+
+# Add project root to path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# Load environment variables
+from dotenv import load_dotenv
+load_dotenv()
+
+# Importing src.bot creates the Bot instance, which needs a well-formed token
+from src.config import config
+if not config.TELEGRAM_BOT_TOKEN:
+    config.TELEGRAM_BOT_TOKEN = "123456:TEST_TOKEN"
+
+from src.database import init_db, get_db
+from src.database import queries
+from src.database.models import StatCounter
+from src.database.profiling import assert_max_queries
+from src.database.writer import writer
+from src.metrics import metrics
+
+
+def test_stats_follow_user_lifecycle():
+    """
+    Test statistics counters:
+    1. Reconcile to a clean baseline
+    2. Register a user and verify total/active/day 1 go up
+    3. Deliver a message in two statements and verify the user moves to day 2
+    4. Deactivate the user and verify active counts go down
+    5. Introduce drift and verify reconciliation corrects it
+    """
+    print("=" * 60)
+    print("Testing incrementally maintained statistics")
+    print("=" * 60)
+
+    init_db()
+    test_telegram_id = 730000001
+
+    with get_db() as db:
+        existing = queries.get_user_by_telegram_id(db, test_telegram_id)
+        if existing:
+            db.delete(existing)
+            db.commit()
+
+        # Step 1: Baseline
+        queries.reconcile_stats(db)
+        before = queries.get_stats(db)
+        print(f"\nStep 1: Baseline {before['total_users']} total, {before['active_users']} active")
+
+        # Step 2: Register
+        user = queries.create_user(db, telegram_id=test_telegram_id)
+        stats = queries.get_stats(db)
+        print(f"Step 2: After register {stats['total_users']} total, {stats['active_users']} active")
+        assert stats["total_users"] == before["total_users"] + 1
+        assert stats["active_users"] == before["active_users"] + 1
+        assert stats["active_by_day"].get(1, 0) == before["active_by_day"].get(1, 0) + 1
+
+        # Step 3: Deliver
+        with assert_max_queries(2):
+            queries.update_user_day(db, user.id, date.today())
+        stats = queries.get_stats(db)
+        print(f"Step 3: After delivery, delivered today = {stats['delivered_today']}")
+        assert stats["delivered_today"] == before["delivered_today"] + 1
+        assert stats["active_by_day"].get(1, 0) == before["active_by_day"].get(1, 0)
+        assert stats["active_by_day"].get(2, 0) == before["active_by_day"].get(2, 0) + 1
+
+        # Step 4: Deactivate
+        queries.set_user_active(db, user, False)
+        stats = queries.get_stats(db)
+        print(f"Step 4: After deactivation {stats['active_users']} active")
+        assert stats["active_users"] == before["active_users"]
+        assert stats["active_by_day"].get(2, 0) == before["active_by_day"].get(2, 0)
+
+        # Step 5: Drift and reconcile
+        db.delete(user)
+        db.commit()
+        corrected = queries.reconcile_stats(db)
+        stats = queries.get_stats(db)
+        print(f"Step 5: Reconciliation corrected {corrected} counters")
+        assert corrected == 1
+        assert stats["total_users"] == before["total_users"]
+
+    print("\n" + "=" * 60)
+    print("TEST PASSED!")
+    print("=" * 60)
+
+
+def test_reconcile_job_runs_on_the_writer():
+    """
+    Test that the scheduled reconciliation writes through the writer thread,
+    alone in its own transaction, and corrects drift.
+    """
+    print("=" * 60)
+    print("Testing the reconciliation job")
+    print("=" * 60)
+
+    from src.scheduler.jobs import reconcile_stats
+
+    init_db()
+    with get_db() as db:
+        queries.reconcile_stats(db)
+        before = queries.get_stats(db)
+        db.query(StatCounter).filter(StatCounter.name == queries.USERS_TOTAL).update(
+            {StatCounter.value: StatCounter.value + 5}
+        )
+        db.commit()
+
+    writes = metrics.get_counter("db.group_commit.writes")
+    writer.start()
+    try:
+        asyncio.run(reconcile_stats())
+    finally:
+        writer.stop()
+
+    with get_db() as db:
+        stats = queries.get_stats(db)
+    applied = metrics.get_counter("db.group_commit.writes") - writes
+    print(f"\nWrites on the writer: {applied}, total users {stats['total_users']}")
+    assert applied == 1
+    assert stats["total_users"] == before["total_users"]
+
+    print("\n" + "=" * 60)
+    print("TEST PASSED!")
+    print("=" * 60)
+
+
+if __name__ == "__main__":
+    test_stats_follow_user_lifecycle()
+    test_reconcile_job_runs_on_the_writer()
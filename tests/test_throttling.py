@@ -0,0 +1,134 @@
+"""Unit tests for the per-user anti-flood middleware."""
+import sys
+import os
+import asyncio
+from types import SimpleNamespace
+
+# Add project root to path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# Load environment variables
+from dotenv import load_dotenv
+load_dotenv()
+
+# Importing src.bot creates the Bot instance, which needs a well-formed token
+from src.config import config
+if not config.TELEGRAM_BOT_TOKEN:
+    config.TELEGRAM_BOT_TOKEN = "123456:TEST_TOKEN"
+
+from src.bot.middlewares import ThrottlingMiddleware
+from src.metrics import metrics
+
+
+def test_throttling_drops_floods():
+    """
+    Test per-user anti-flood:
+    1. Send a burst of 10 updates from one user (burst 3)
+    2. Verify only 3 reach the handler and 7 are counted as dropped
+    3. Verify another user is not affected
+    4. Verify the user is allowed again after the bucket refills
+    """
+    print("=" * 60)
+    print("Testing per-user anti-flood middleware")
+    print("=" * 60)
+
+    throttle = ThrottlingMiddleware(rate=1.0, burst=3)
+    handled = []
+
+    async def handler(event, data):
+        handled.append(event)
+
+    async def feed(user_id, event):
+        await throttle(handler, event, {"event_from_user": SimpleNamespace(id=user_id)})
+
+    dropped_before = metrics.get_counter("bot.throttle.dropped")
+
+    # Step 1 & 2: Burst from one user
+    print("\nStep 1: Sending 10 updates from user 1...")
+    for i in range(10):
+        asyncio.run(feed(1, i))
+    dropped = metrics.get_counter("bot.throttle.dropped") - dropped_before
+    print(f"   Handled: {handled}, dropped: {dropped}")
+    assert handled == [0, 1, 2]
+    assert dropped == 7
+
+    # Step 3: Another user
+    print("\nStep 3: Sending 1 update from user 2...")
+    asyncio.run(feed(2, "other"))
+    assert handled[-1] == "other"
+
+    # Step 4: Refill
+    print("\nStep 4: Checking the bucket refills over time...")
+    now = throttle._tat[1] + 1
+    assert throttle.allow(1, now)
+
+    print("\n" + "=" * 60)
+    print("TEST PASSED!")
+    print("=" * 60)
+
+
+def test_throttling_memory_is_bounded():
+    """
+    Test that tracked users stay bounded:
+    1. Throttle 50,000 distinct senders with a cap of 1,000
+    2. Verify the structure never grows past the cap
+    3. Verify refilled buckets are pruned completely
+    """
+    print("\n" + "=" * 60)
+    print("Testing throttling memory bound")
+    print("=" * 60)
+
+    throttle = ThrottlingMiddleware(rate=0.1, burst=1, max_tracked=1000)
+    now = 1000.0
+    peak = 0
+    for user_id in range(50000):
+        if len(throttle._tat) >= throttle.max_tracked:
+            throttle.prune(now)
+        throttle.allow(user_id, now)
+        peak = max(peak, len(throttle._tat))
+    print(f"   Peak tracked users: {peak}")
+    assert peak <= 1000
+
+    throttle.prune(now + 3600)
+    print(f"   Tracked after refill: {len(throttle._tat)}")
+    assert len(throttle._tat) == 0
+
+    print("\n" + "=" * 60)
+    print("TEST PASSED!")
+    print("=" * 60)
+
+
+def test_throttling_prunes_rarely_under_flood():
+    """
+    Test that a flood of distinct senders does not prune on every update:
+    1. Stream 20,000 distinct senders with a cap of 1,000, most of them
+       still inside their window at each prune
+    2. Verify each prune frees room for at least 10% new senders
+    """
+    print("\n" + "=" * 60)
+    print("Testing throttling prune frequency")
+    print("=" * 60)
+
+    throttle = ThrottlingMiddleware(rate=0.1, burst=1, max_tracked=1000)
+    now = 1000.0
+    prunes = 0
+    for user_id in range(20000):
+        # About 990 senders fit in the 10 s window at this arrival rate
+        now += 0.0101
+        if len(throttle._tat) >= throttle.max_tracked:
+            throttle.prune(now)
+            prunes += 1
+        throttle.allow(user_id, now)
+    print(f"   Prunes for 20,000 senders: {prunes}")
+    assert len(throttle._tat) <= throttle.max_tracked
+    assert prunes <= 20000 // 100
+
+    print("\n" + "=" * 60)
+    print("TEST PASSED!")
+    print("=" * 60)
+
+
+if __name__ == "__main__":
+    test_throttling_drops_floods()
+    test_throttling_memory_is_bounded()
+    test_throttling_prunes_rarely_under_flood()
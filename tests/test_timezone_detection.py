@@ -0,0 +1,294 @@
+"""Unit tests for offline timezone detection from shared locations."""
+import sys
+import os
+import asyncio
+import tempfile
+import time
+from datetime import datetime, timedelta
+from types import SimpleNamespace
+
+# Add project root to path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# Load environment variables
+from dotenv import load_dotenv
+load_dotenv()
+
+import pytz
+
+# Importing src.bot creates the Bot instance, which needs a well-formed token
+from src.config import config
+if not config.TELEGRAM_BOT_TOKEN:
+    config.TELEGRAM_BOT_TOKEN = "123456:TEST_TOKEN"
+
+from aiogram.types import InlineKeyboardMarkup
+
+from src.bot.handlers import cmd_start, handle_location
+from src.bot.onboarding import TIMEZONE_PROMPT
+from src.database import init_db, get_db
+from src.database import queries
+from src.database.models import ArchivedUser, User
+import src.timezone_index as timezone_index
+
+
+def _use_grid(path):
+    """Point the index at a grid file (or none) and drop the mapped one."""
+    config.TIMEZONE_GRID_PATH = path
+    timezone_index._grid = None
+    timezone_index._grid_loaded = False
+
+
+def test_reference_lookup():
+    """
+    Test lookups without a grid file:
+    1. Points near reference cities resolve to their zones
+    2. Points far out at sea get the nautical Etc/GMT zone
+    3. Every offset keyboard zone is a valid pytz zone
+    """
+    print("=" * 60)
+    print("Testing reference-city timezone lookup")
+    print("=" * 60)
+
+    original = config.TIMEZONE_GRID_PATH
+    _use_grid("")
+    try:
+        cases = [
+            ((52.4, 13.1), "Europe/Berlin"),
+            ((40.8, -73.9), "America/New_York"),
+            ((35.7, 139.7), "Asia/Tokyo"),
+            ((-33.9, 151.2), "Australia/Sydney"),
+            ((0.0, -140.0), "Etc/GMT+9"),
+        ]
+        for (lat, lon), expected in cases:
+            zone = timezone_index.lookup_timezone(lat, lon)
+            print(f"  ({lat}, {lon}) -> {zone}")
+            assert zone == expected
+
+        for offset, zone in timezone_index.OFFSET_ZONES.items():
+            pytz.timezone(zone)
+        assert timezone_index.OFFSET_ZONES["+3"] == "Etc/GMT-3"
+    finally:
+        _use_grid(original)
+
+    print("\n" + "=" * 60)
+    print("TEST PASSED!")
+    print("=" * 60)
+
+
+def test_grid_lookup():
+    """
+    Test the memory-mapped grid:
+    1. Build a grid from two rectangular zones
+    2. Points inside each rectangle resolve to that zone
+    3. Points outside both fall back to the nautical zone
+    4. Lookups take microseconds
+    """
+    print("=" * 60)
+    print("Testing memory-mapped grid timezone lookup")
+    print("=" * 60)
+
+    features = [
+        ("Europe/Berlin", [[[(5, 47), (15, 47), (15, 55), (5, 55), (5, 47)]]]),
+        (
+            "America/Chicago",
+            [[[(-100, 30), (-85, 30), (-85, 45), (-100, 45), (-100, 30)]]],
+        ),
+    ]
+    data = timezone_index.build_grid(features, resolution=0.5)
+
+    original = config.TIMEZONE_GRID_PATH
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "timezones.grid")
+        with open(path, "wb") as f:
+            f.write(data)
+        _use_grid(path)
+        try:
+            assert timezone_index.lookup_timezone(52.5, 13.4) == "Europe/Berlin"
+            assert timezone_index.lookup_timezone(41.9, -87.6) == "America/Chicago"
+            assert timezone_index.lookup_timezone(0.0, 0.0) == "UTC"
+            assert timezone_index.lookup_timezone(0.0, 170.0) == "Etc/GMT-11"
+
+            iterations = 100000
+            started = time.perf_counter()
+            for _ in range(iterations):
+                timezone_index.lookup_timezone(52.5, 13.4)
+            per_lookup = (time.perf_counter() - started) / iterations * 1e6
+            print(f"  {per_lookup:.2f}us per lookup")
+            assert per_lookup < 100
+        finally:
+            timezone_index._grid._mmap.close()
+            _use_grid(original)
+
+    print("\n" + "=" * 60)
+    print("TEST PASSED!")
+    print("=" * 60)
+
+
+def test_set_user_timezone_keeps_delivery():
+    """
+    Test that changing timezone does not repeat or skip today's delivery:
+    1. A user delivered today in UTC moves to a zone already on tomorrow
+    2. last_message_date follows, so the next day is not sent early
+    3. A user not yet delivered today keeps their last_message_date
+    """
+    print("=" * 60)
+    print("Testing timezone change and delivery schedule")
+    print("=" * 60)
+
+    init_db()
+    test_telegram_id = 740000001
+
+    with get_db() as db:
+        existing = queries.get_user_by_telegram_id(db, test_telegram_id)
+        if existing:
+            db.delete(existing)
+            db.commit()
+
+        user = queries.create_user(db, telegram_id=test_telegram_id)
+        utc_today = datetime.now(pytz.UTC).date()
+        user.last_message_date = utc_today
+        db.commit()
+
+        queries.set_user_timezone(db, user, "Pacific/Kiritimati")
+        kiritimati_today = datetime.now(pytz.timezone("Pacific/Kiritimati")).date()
+        print(f"  Delivered user: {utc_today} -> {user.last_message_date}")
+        assert user.timezone == "Pacific/Kiritimati"
+        assert user.last_message_date == kiritimati_today
+
+        yesterday = kiritimati_today - timedelta(days=1)
+        user.last_message_date = yesterday
+        db.commit()
+        queries.set_user_timezone(db, user, "Europe/Berlin")
+        print(f"  Pending user keeps {user.last_message_date}")
+        assert user.last_message_date == yesterday
+
+        db.delete(user)
+        db.commit()
+
+    print("\n" + "=" * 60)
+    print("TEST PASSED!")
+    print("=" * 60)
+
+
+def _fake_message(telegram_id, sent, **fields):
+    """Message stand-in whose answer() records (text, reply_markup)."""
+    async def answer(text, reply_markup=None, **kwargs):
+        sent.append((text, reply_markup))
+
+    return SimpleNamespace(
+        from_user=SimpleNamespace(id=telegram_id, username="tz_test"),
+        answer=answer,
+        **fields,
+    )
+
+
+def test_reference_lookup_asks_for_confirmation():
+    """
+    Test a shared location without a grid file:
+    1. The estimated zone is saved and reported
+    2. A second message names it as an estimate and offers the offset keyboard
+    3. With a grid installed, only the confirmation is sent
+    """
+    print("=" * 60)
+    print("Testing confirmation of estimated timezones")
+    print("=" * 60)
+
+    init_db()
+    test_telegram_id = 740000002
+    with get_db() as db:
+        db.query(User).filter(User.telegram_id == test_telegram_id).delete()
+        db.commit()
+        queries.create_user(db, telegram_id=test_telegram_id)
+
+    location = SimpleNamespace(latitude=52.4, longitude=13.1)
+    original = config.TIMEZONE_GRID_PATH
+    _use_grid("")
+    try:
+        # Step 1-2: Reference cities
+        sent = []
+        asyncio.run(handle_location(_fake_message(test_telegram_id, sent, location=location)))
+        print(f"\nStep 1: {[text for text, _ in sent]}")
+        assert len(sent) == 2
+        assert sent[0][0].startswith("Timezone set to Europe/Berlin")
+        assert "Europe/Berlin" in sent[1][0]
+        assert isinstance(sent[1][1], InlineKeyboardMarkup)
+        with get_db() as db:
+            assert queries.get_user_by_telegram_id(db, test_telegram_id).timezone == "Europe/Berlin"
+
+        # Step 3: Grid
+        features = [("Europe/Berlin", [[[(5, 47), (15, 47), (15, 55), (5, 55), (5, 47)]]])]
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "timezones.grid")
+            with open(path, "wb") as f:
+                f.write(timezone_index.build_grid(features, resolution=0.5))
+            _use_grid(path)
+            try:
+                sent = []
+                asyncio.run(handle_location(_fake_message(test_telegram_id, sent, location=location)))
+                print(f"Step 3: {[text for text, _ in sent]}")
+                assert len(sent) == 1
+            finally:
+                timezone_index._grid._mmap.close()
+    finally:
+        _use_grid(original)
+        with get_db() as db:
+            db.query(User).filter(User.telegram_id == test_telegram_id).delete()
+            db.commit()
+
+    print("\n" + "=" * 60)
+    print("TEST PASSED!")
+    print("=" * 60)
+
+
+def test_start_prompts_revived_users():
+    """
+    Test that /start asks for the timezone again:
+    1. A reactivated user gets the welcome and the timezone prompt
+    2. A user restored from the archive gets both too
+    3. An active user only gets the welcome
+    """
+    print("=" * 60)
+    print("Testing timezone prompt for returning users")
+    print("=" * 60)
+
+    init_db()
+    inactive_id, archived_id, active_id = 740000003, 740000004, 740000005
+    test_ids = [inactive_id, archived_id, active_id]
+
+    def cleanup(db):
+        db.query(User).filter(User.telegram_id.in_(test_ids)).delete()
+        db.query(ArchivedUser).filter(ArchivedUser.telegram_id.in_(test_ids)).delete()
+        db.commit()
+
+    with get_db() as db:
+        cleanup(db)
+        user = queries.create_user(db, telegram_id=inactive_id)
+        queries.set_user_active(db, user, False)
+        queries.create_user(db, telegram_id=active_id)
+        db.add(ArchivedUser(telegram_id=archived_id, current_day=12))
+        db.commit()
+
+    try:
+        for telegram_id, prompted in ((inactive_id, True), (archived_id, True), (active_id, False)):
+            sent = []
+            with get_db() as db:
+                asyncio.run(cmd_start(_fake_message(telegram_id, sent), db))
+            texts = [text for text, _ in sent]
+            print(f"  {telegram_id}: {len(texts)} messages")
+            assert (texts[-1] == TIMEZONE_PROMPT) == prompted
+            assert len(texts) == (2 if prompted else 1)
+    finally:
+        with get_db() as db:
+            cleanup(db)
+
+    print("\n" + "=" * 60)
+    print("TEST PASSED!")
+    print("=" * 60)
+
+
+if __name__ == "__main__":
+    test_reference_lookup()
+    test_grid_lookup()
+    test_set_user_timezone_keeps_delivery()
+    test_reference_lookup_asks_for_confirmation()
+    test_start_prompts_revived_users()
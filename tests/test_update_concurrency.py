@@ -0,0 +1,82 @@
+"""Unit tests for bounded concurrent update processing."""
+import sys
+import os
+import asyncio
+from types import SimpleNamespace
+
+# Add project root to path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# Load environment variables
+from dotenv import load_dotenv
+load_dotenv()
+
+# Importing src.bot creates the Bot instance, which needs a well-formed token
+from src.config import config
+if not config.TELEGRAM_BOT_TOKEN:
+    config.TELEGRAM_BOT_TOKEN = "123456:TEST_TOKEN"
+
+from src.bot.middlewares import UpdateConcurrencyMiddleware
+
+
+def test_per_user_order_and_global_limit():
+    """
+    Test bounded concurrency with per-user ordering:
+    1. Feed 3 updates each for 4 users through a middleware with limit 2
+    2. Verify no more than 2 handlers run at the same time
+    3. Verify each user's updates ran in arrival order
+    4. Verify per-user locks are cleaned up afterwards
+    """
+    print("=" * 60)
+    print("Testing bounded concurrent update processing")
+    print("=" * 60)
+
+    middleware = UpdateConcurrencyMiddleware(limit=2)
+    running = 0
+    peak = 0
+    order: dict[int, list[int]] = {}
+
+    async def handler(event, data):
+        nonlocal running, peak
+        running += 1
+        peak = max(peak, running)
+        await asyncio.sleep(0.01)
+        order.setdefault(data["event_from_user"].id, []).append(event)
+        running -= 1
+
+    async def run():
+        tasks = []
+        for seq in range(3):
+            for user_id in range(4):
+                data = {"event_from_user": SimpleNamespace(id=user_id)}
+                tasks.append(asyncio.create_task(middleware(handler, seq, data)))
+        await asyncio.sleep(0)
+        print(f"   Queue depth after feeding: {middleware.queued}")
+        await asyncio.gather(*tasks)
+
+    # Step 1: Feed updates
+    print("\nStep 1: Feeding 12 updates from 4 users (limit 2)...")
+    asyncio.run(run())
+
+    # Step 2: Verify global limit
+    print(f"\nStep 2: Peak concurrency = {peak}")
+    assert peak == 2, f"Expected peak concurrency 2, got {peak}"
+
+    # Step 3: Verify per-user order
+    print("\nStep 3: Verifying per-user ordering...")
+    for user_id, seen in order.items():
+        print(f"   User {user_id}: {seen}")
+        assert seen == [0, 1, 2], f"User {user_id} updates out of order: {seen}"
+
+    # Step 4: Verify cleanup
+    print("\nStep 4: Verifying per-user locks were released...")
+    assert middleware._user_locks == {}
+    assert middleware.queued == 0 and middleware.in_flight == 0
+
+    print("\n" + "=" * 60)
+    print("TEST PASSED!")
+    print("=" * 60)
+
+
+if __name__ == "__main__":
+    test_per_user_order_and_global_limit()
@@ -0,0 +1,114 @@
+"""Unit tests for per-update database sessions."""
+import sys
+import os
+import asyncio
+from types import SimpleNamespace
+
+# Add project root to path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# Load environment variables
+from dotenv import load_dotenv
+load_dotenv()
+
+# Importing src.bot creates the Bot instance, which needs a well-formed token
+from src.config import config
+if not config.TELEGRAM_BOT_TOKEN:
+    config.TELEGRAM_BOT_TOKEN = "123456:TEST_TOKEN"
+
+from sqlalchemy import text
+
+from src.bot.handlers import cmd_timezone
+from src.bot.middlewares import DbSessionMiddleware
+from src.database import init_db, engine
+from src.metrics import metrics
+
+TEST_ID = 667000001
+
+
+def _checkout_waits() -> int:
+    return metrics.snapshot()["timings"].get("bot.update.checkout_wait", {}).get("count", 0)
+
+
+def test_connection_released_before_telegram():
+    """
+    Test the update session:
+    1. A handler's connection is back in the pool before message.answer awaits
+    2. The wait for the connection is recorded as bot.update.checkout_wait
+    """
+    print("=" * 60)
+    print("Testing connection release before network I/O")
+    print("=" * 60)
+
+    init_db()
+    middleware = DbSessionMiddleware()
+    checked_out = []
+
+    async def answer(text, **kwargs):
+        checked_out.append(engine.pool.checkedout())
+
+    message = SimpleNamespace(from_user=SimpleNamespace(id=TEST_ID), answer=answer)
+
+    async def handler(event, data):
+        return await cmd_timezone(event, data["db"])
+
+    idle = engine.pool.checkedout()
+    waits = _checkout_waits()
+    asyncio.run(middleware(handler, message, {}))
+
+    # Step 1: Released
+    print(f"\nStep 1: Connections checked out: {idle} idle, {checked_out} in answer")
+    assert checked_out == [idle]
+
+    # Step 2: Metric
+    print(f"Step 2: Checkout waits recorded: {_checkout_waits() - waits}")
+    assert _checkout_waits() == waits + 1
+
+    print("\n" + "=" * 60)
+    print("TEST PASSED!")
+    print("=" * 60)
+
+
+def test_session_closed_when_handler_raises():
+    """
+    Test that the update session is closed and its connection returned when
+    the handler raises.
+    """
+    print("=" * 60)
+    print("Testing session cleanup on errors")
+    print("=" * 60)
+
+    init_db()
+    middleware = DbSessionMiddleware()
+    sessions = []
+    holding = []
+
+    async def handler(event, data):
+        db = data["db"]
+        sessions.append(db)
+        db.execute(text("SELECT 1"))
+        holding.append(engine.pool.checkedout())
+        raise RuntimeError("handler failed")
+
+    idle = engine.pool.checkedout()
+    try:
+        asyncio.run(middleware(handler, SimpleNamespace(), {}))
+        assert False, "the handler's error should propagate"
+    except RuntimeError as e:
+        print(f"\nHandler raised: {e}")
+
+    db = sessions[0]
+    print(f"Session in transaction: {db.in_transaction()}, "
+          f"connections checked out: {engine.pool.checkedout()}")
+    assert holding == [idle + 1]
+    assert not db.in_transaction()
+    assert engine.pool.checkedout() == idle
+
+    print("\n" + "=" * 60)
+    print("TEST PASSED!")
+    print("=" * 60)
+
+
+if __name__ == "__main__":
+    test_connection_released_before_telegram()
+    test_session_closed_when_handler_raises()
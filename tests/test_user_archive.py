@@ -0,0 +1,116 @@
+"""Unit tests for archiving inactive users and restoring them on /start."""
+import sys
+import os
+from datetime import datetime, timedelta
+
+# Add project root to path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# Load environment variables
+from dotenv import load_dotenv
+load_dotenv()
+
+from sqlalchemy import update
+
+from src.database import init_db, get_db
+from src.database import queries
+from src.database.models import ArchivedUser, User
+
+TEST_IDS = [888000001, 888000002, 888000003]
+
+
+def _cleanup(db) -> None:
+    db.query(User).filter(User.telegram_id.in_(TEST_IDS)).delete()
+    db.query(ArchivedUser).filter(ArchivedUser.telegram_id.in_(TEST_IDS)).delete()
+    db.commit()
+
+
+def test_archive_and_restore():
+    """
+    Test user archiving:
+    1. Create two long-inactive users and one recently inactive user
+    2. Archive: only the long-inactive users leave the users table
+    3. Counters still match a full recount
+    4. /start restores an archived user at the same day
+    5. Catch-up registration restores the other as reactivated
+    """
+    print("=" * 60)
+    print("Testing user archiving")
+    print("=" * 60)
+
+    init_db()
+    long_ago = datetime.utcnow() - timedelta(days=90)
+    with get_db() as db:
+        _cleanup(db)
+        # Step 1: Users
+        for telegram_id, day in zip(TEST_IDS, (120, 7, 30)):
+            user = queries.create_user(db, telegram_id=telegram_id, username="archive_test")
+            user.current_day = day
+            db.commit()
+            queries.set_user_active(db, user, False)
+        db.execute(
+            update(User)
+            .where(User.telegram_id.in_(TEST_IDS[:2]))
+            .values(updated_at=long_ago)
+        )
+        db.commit()
+        queries.reconcile_stats(db)
+        total_before = queries.get_stats(db)["total_users"]
+
+        # Step 2: Archive
+        cutoff = datetime.utcnow() - timedelta(days=30)
+        archived = 0
+        while True:
+            moved = queries.archive_inactive_users(db, cutoff, limit=1)
+            archived += moved
+            if not moved:
+                break
+        remaining = [
+            u.telegram_id
+            for u in db.query(User).filter(User.telegram_id.in_(TEST_IDS)).all()
+        ]
+        cold = {
+            a.telegram_id: a
+            for a in db.query(ArchivedUser).filter(ArchivedUser.telegram_id.in_(TEST_IDS))
+        }
+        print(f"\nStep 2: Archived {archived}, still in users: {remaining}")
+        assert remaining == [TEST_IDS[2]]
+        assert set(cold) == set(TEST_IDS[:2])
+        assert cold[TEST_IDS[0]].current_day == 120
+        assert cold[TEST_IDS[0]].deactivated_at == long_ago
+        archived_id = cold[TEST_IDS[0]].id
+
+        # Step 3: Counters
+        stats = queries.get_stats(db)
+        corrected = queries.reconcile_stats(db)
+        print(f"Step 3: total_users={stats['total_users']}, corrected={corrected}")
+        assert stats["total_users"] == total_before
+        assert corrected == 0
+
+    # Step 4: /start (the write cmd_start runs for an unknown telegram id)
+    with get_db() as db:
+        assert queries.get_user_by_telegram_id(db, TEST_IDS[0]) is None
+        user = queries.restore_archived_user(db, TEST_IDS[0], "back_again")
+        print(f"Step 4: Restored at day {user.current_day}, active={user.is_active}")
+        assert user.current_day == 120 and user.is_active
+        assert user.username == "back_again"
+        assert db.get(ArchivedUser, archived_id) is None
+        assert queries.restore_archived_user(db, TEST_IDS[0]) is None
+
+        # Step 5: Catch-up registration
+        created, reactivated = queries.register_users_bulk(db, {TEST_IDS[1]: None})
+        user = queries.get_user_by_telegram_id(db, TEST_IDS[1])
+        print(f"Step 5: created={created}, reactivated={reactivated}, day={user.current_day}")
+        assert created == [] and reactivated == [TEST_IDS[1]]
+        assert user.current_day == 7 and user.username == "archive_test"
+        assert queries.reconcile_stats(db) == 0
+        _cleanup(db)
+        queries.reconcile_stats(db)
+
+    print("\n" + "=" * 60)
+    print("TEST PASSED!")
+    print("=" * 60)
+
+
+if __name__ == "__main__":
+    test_archive_and_restore()
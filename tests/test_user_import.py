@@ -0,0 +1,184 @@
+"""Unit tests for bulk subscriber import."""
+import sys
+import os
+import io
+
+# Add project root to path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# Load environment variables
+from dotenv import load_dotenv
+load_dotenv()
+
+from src.database import init_db, get_db
+from src.database import queries
+from src.database.models import ArchivedUser, User
+from src.importers import users as user_import
+
+BASE_ID = 444000000
+
+
+def _cleanup(db) -> None:
+    db.query(User).filter(User.telegram_id.between(BASE_ID, BASE_ID + 999)).delete()
+    db.query(ArchivedUser).filter(ArchivedUser.telegram_id.between(BASE_ID, BASE_ID + 999)).delete()
+    db.commit()
+    queries.reconcile_stats(db)
+
+
+def test_import_users():
+    """
+    Test bulk user import:
+    1. Import new users in several batches, rejecting invalid rows
+    2. Re-import skips known and archived users
+    3. Re-import with update_existing overwrites only the given values
+    4. Counters match a full recount after each import
+    """
+    print("=" * 60)
+    print("Testing bulk user import")
+    print("=" * 60)
+
+    init_db()
+    with get_db() as db:
+        _cleanup(db)
+        db.add(ArchivedUser(telegram_id=BASE_ID + 999, current_day=12))
+        db.commit()
+        queries.reconcile_stats(db)
+
+    lines = ["telegram_id,username,timezone,current_day"]
+    lines += [f"{BASE_ID + i},@user{i},Europe/Berlin,{i + 1}" for i in range(25)]
+    lines += [
+        f"{BASE_ID + 100},,,",
+        f"{BASE_ID + 999},archived,,",
+        "not-a-number,x,,",
+        f"{BASE_ID + 101},x,Mars/Base,",
+        f"{BASE_ID + 102},x,,366",
+        f"{BASE_ID + 1},duplicate,,",
+    ]
+    document = "\n".join(lines).encode()
+
+    # Step 1: First import
+    report = user_import.import_users(io.BytesIO(document), batch_size=10)
+    print("\nStep 1:\n" + user_import.format_report(report))
+    assert report["rows"] == 31
+    assert report["inserted"] == 26
+    assert report["skipped"] == 2  # the archived user and the later duplicate
+    assert report["rejected"] == 3
+    with get_db() as db:
+        user = queries.get_user_by_telegram_id(db, BASE_ID + 4)
+        assert (user.username, user.timezone, user.current_day) == ("user4", "Europe/Berlin", 5)
+        plain = queries.get_user_by_telegram_id(db, BASE_ID + 100)
+        assert (plain.timezone, plain.current_day, plain.is_active) == ("UTC", 1, True)
+        # Duplicate id in a later batch: the first row wins, the second is known
+        assert queries.get_user_by_telegram_id(db, BASE_ID + 1).username == "user1"
+        assert queries.get_user_by_telegram_id(db, BASE_ID + 999) is None
+        assert queries.reconcile_stats(db) == 0
+
+    # Step 2: Same file again
+    report = user_import.import_users(io.BytesIO(document), batch_size=10)
+    print(f"Step 2: inserted={report['inserted']}, skipped={report['skipped']}")
+    assert report["inserted"] == 0 and report["skipped"] == 28
+
+    # Step 3: Update existing
+    update = f"telegram_id,current_day\n{BASE_ID + 4},200\n{BASE_ID + 100},\n".encode()
+    report = user_import.import_users(io.BytesIO(update), update_existing=True)
+    print(f"Step 3: updated={report['updated']}")
+    assert report["updated"] == 2
+    with get_db() as db:
+        user = queries.get_user_by_telegram_id(db, BASE_ID + 4)
+        assert (user.username, user.timezone, user.current_day) == ("user4", "Europe/Berlin", 200)
+        assert queries.get_user_by_telegram_id(db, BASE_ID + 100).current_day == 1
+
+        # Step 4: Counters
+        corrected = queries.reconcile_stats(db)
+        print(f"Step 4: Counters corrected by recount: {corrected}")
+        assert corrected == 0
+        _cleanup(db)
+
+    print("\n" + "=" * 60)
+    print("TEST PASSED!")
+    print("=" * 60)
+
+
+def test_import_users_web_upload(panel_client):
+    """
+    Test the web upload:
+    1. Uploading a CSV imports it and shows the report
+    2. A file without a telegram_id column is refused
+    """
+    print("=" * 60)
+    print("Testing user import upload")
+    print("=" * 60)
+
+    init_db()
+    client = panel_client
+
+    # Step 1: Upload
+    document = f"telegram_id,username\n{BASE_ID + 500},uploaded\n".encode()
+    response = client.post(
+        "/import/users",
+        data={"file": (io.BytesIO(document), "users.csv")},
+        content_type="multipart/form-data",
+    )
+    page = response.data.decode()
+    print(f"\nStep 1: Report shown: {'New: 1' in page}")
+    assert response.status_code == 200 and "New: 1" in page
+    with get_db() as db:
+        assert queries.get_user_by_telegram_id(db, BASE_ID + 500).username == "uploaded"
+
+    # Step 2: Bad header
+    response = client.post(
+        "/import/users",
+        data={"file": (io.BytesIO(b"id,name\n1,x\n"), "users.csv")},
+        content_type="multipart/form-data",
+        follow_redirects=True,
+    )
+    print(f"Step 2: Refused: {'Import failed' in response.data.decode()}")
+    assert "Import failed" in response.data.decode()
+
+    with get_db() as db:
+        _cleanup(db)
+
+    print("\n" + "=" * 60)
+    print("TEST PASSED!")
+    print("=" * 60)
+
+
+def test_import_counts_only_inserted_rows():
+    """
+    Test that conflicting inserts are not counted:
+    1. Import a batch where one new id appears twice, standing in for a user
+       who registers between the existence check and the insert
+    2. Verify the second row is reported as skipped
+    3. Verify counters match a full recount
+    """
+    print("=" * 60)
+    print("Testing import counters under insert conflicts")
+    print("=" * 60)
+
+    init_db()
+    row = {"telegram_id": BASE_ID + 600, "username": "racer", "timezone": None, "current_day": 3}
+    with get_db() as db:
+        _cleanup(db)
+
+        # Step 1 & 2: Conflicting rows
+        inserted, updated, skipped = queries.import_users_bulk(db, [row, dict(row)])
+        print(f"\nStep 2: inserted={inserted}, updated={updated}, skipped={skipped}")
+        assert (inserted, updated, skipped) == (1, 0, 1)
+
+        # Step 3: Counters
+        corrected = queries.reconcile_stats(db)
+        print(f"Step 3: Counters corrected by recount: {corrected}")
+        assert corrected == 0
+        _cleanup(db)
+
+    print("\n" + "=" * 60)
+    print("TEST PASSED!")
+    print("=" * 60)
+
+
+if __name__ == "__main__":
+    from tests.conftest import logged_in_client
+
+    test_import_users()
+    test_import_users_web_upload(logged_in_client())
+    test_import_counts_only_inserted_rows()
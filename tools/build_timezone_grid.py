@@ -0,0 +1,94 @@
+#!/usr/bin/env python3
+"""Build the offline timezone grid from timezone boundary polygons.
+
+Input is the GeoJSON release of timezone-boundary-builder
+(https://github.com/evansiroky/timezone-boundary-builder), e.g.
+``timezones-with-oceans.geojson`` or the release zip as published; each
+feature has a ``tzid`` property. With ``--download`` the pinned release is
+fetched instead (setup runs it this way).
+
+Usage:
+    python tools/build_timezone_grid.py --download data/timezones.grid
+    python tools/build_timezone_grid.py timezones.geojson data/timezones.grid
+    python tools/build_timezone_grid.py timezones.geojson.zip data/timezones.grid --resolution 0.1
+
+At the default 0.25 degree resolution (about 28 km at the equator) the grid
+is about 2 MB; 0.1 degrees gives about 13 MB.
+"""
+import argparse
+import json
+import os
+import sys
+import tempfile
+import time
+import urllib.request
+import zipfile
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.timezone_index import build_grid  # noqa: E402
+
+RELEASE = "2024a"
+RELEASE_URL = (
+    "https://github.com/evansiroky/timezone-boundary-builder/releases/download/"
+    f"{RELEASE}/timezones-with-oceans.geojson.zip"
+)
+
+
+def load_collection(path: str) -> dict:
+    """Read a boundary GeoJSON file, or the single GeoJSON inside a zip."""
+    if zipfile.is_zipfile(path):
+        with zipfile.ZipFile(path) as archive:
+            name = next(n for n in archive.namelist() if n.endswith((".json", ".geojson")))
+            with archive.open(name) as f:
+                return json.load(f)
+    with open(path, encoding="utf-8") as f:
+        return json.load(f)
+
+
+def iter_features(path: str):
+    """Yield (tzid, polygons) pairs from a boundary GeoJSON file or zip."""
+    collection = load_collection(path)
+    for feature in collection["features"]:
+        geometry = feature["geometry"]
+        if geometry["type"] == "Polygon":
+            polygons = [geometry["coordinates"]]
+        elif geometry["type"] == "MultiPolygon":
+            polygons = geometry["coordinates"]
+        else:
+            continue
+        yield feature["properties"]["tzid"], polygons
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("geojson", nargs="?", help="GeoJSON file or release zip")
+    parser.add_argument("output")
+    parser.add_argument("--resolution", type=float, default=0.25)
+    parser.add_argument(
+        "--download", action="store_true", help=f"fetch the {RELEASE} release instead"
+    )
+    args = parser.parse_args()
+    if (args.geojson is None) != args.download:
+        parser.error("give either a GeoJSON file or --download")
+
+    started = time.perf_counter()
+    if args.download:
+        with tempfile.TemporaryDirectory() as tmp:
+            source = os.path.join(tmp, "timezones.geojson.zip")
+            print(f"Downloading {RELEASE_URL}")
+            urllib.request.urlretrieve(RELEASE_URL, source)
+            data = build_grid(iter_features(source), args.resolution)
+    else:
+        data = build_grid(iter_features(args.geojson), args.resolution)
+    os.makedirs(os.path.dirname(os.path.abspath(args.output)), exist_ok=True)
+    with open(args.output, "wb") as f:
+        f.write(data)
+    print(
+        f"Wrote {args.output}: {len(data) / 1024 / 1024:.1f} MB "
+        f"in {time.perf_counter() - started:.1f}s"
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,44 @@
+#!/usr/bin/env python3
+"""Import subscribers from a CSV file, e.g. another bot's user list.
+
+The CSV needs a header row ``telegram_id,username,timezone,current_day``;
+only telegram_id is required. See src/importers/users.py for the details.
+
+Usage:
+    python tools/import_users.py subscribers.csv
+    python tools/import_users.py subscribers.csv --update-existing --batch-size 10000
+"""
+import argparse
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.database import init_db  # noqa: E402
+from src.importers import users as user_import  # noqa: E402
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("csv")
+    parser.add_argument(
+        "--update-existing",
+        action="store_true",
+        help="overwrite known users' username, timezone and day with the file's",
+    )
+    parser.add_argument("--batch-size", type=int, default=user_import.DEFAULT_BATCH_SIZE)
+    args = parser.parse_args()
+
+    init_db()
+    try:
+        with open(args.csv, "rb") as f:
+            report = user_import.import_users(
+                f, update_existing=args.update_existing, batch_size=args.batch_size
+            )
+    except user_import.UserImportError as e:
+        sys.exit(f"Import failed: {e}")
+    print(user_import.format_report(report))
+
+
+if __name__ == "__main__":
+    main()